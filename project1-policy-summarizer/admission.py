@@ -0,0 +1,188 @@
+import os
+import time
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+
+
+# ─────────────────────────────────────────
+# LLM ADMISSION CONTROL
+# Every LLM call asks for a slot before it is sent. Calls past the global
+# or per-user concurrency limit wait in a bounded queue for at most
+# queue_timeout seconds; a full queue, a timed-out wait or an exhausted
+# per-user token budget raises Busy straight away, so callers can serve a
+# cached / heuristic answer or tell the user to retry instead of spinning.
+# ─────────────────────────────────────────
+class Busy(RuntimeError):
+
+    def __init__(self, reason, retry_after):
+        self.reason = reason
+        self.retry_after = max(1, int(retry_after))
+        messages = {
+            "queue_full": "The AI service is at capacity right now.",
+            "timeout": "The AI service is responding slowly right now.",
+            "user_queue_full": "You already have several AI requests running.",
+            "token_budget": "You have used your AI allowance for now.",
+        }
+        super().__init__(
+            f"{messages.get(reason, 'The AI service is busy.')} "
+            f"Please try again in about {self.retry_after} seconds."
+        )
+
+    def __reduce__(self):
+        # Rebuild from (reason, retry_after) — the default pickles args,
+        # which only hold the message, so a Busy raised in a job_server
+        # worker could not be unpickled and broke the whole process pool
+        return type(self), (self.reason, self.retry_after)
+
+
+_current_user = contextvars.ContextVar("policylens_user", default="anonymous")
+
+
+def set_user(user_id):
+    # Bind the caller's identity for LLM calls made from this thread
+    _current_user.set(user_id or "anonymous")
+
+
+def current_user():
+    return _current_user.get()
+
+
+def estimate_tokens(messages, max_tokens=None):
+    # ~4 characters per token, plus room for the reply
+    chars = sum(len(message.get("content") or "") for message in messages)
+    return chars // 4 + (max_tokens or 1024)
+
+
+class AdmissionController:
+
+    def __init__(self, global_limit=8, per_user_limit=2, max_queue=32,
+                 per_user_queue=4, queue_timeout=20.0,
+                 token_budget=0, budget_window=3600.0):
+        self.global_limit = global_limit
+        self.per_user_limit = per_user_limit
+        self.max_queue = max_queue
+        self.per_user_queue = per_user_queue
+        self.queue_timeout = queue_timeout
+        self.token_budget = token_budget        # 0 = unlimited
+        self.budget_window = budget_window
+
+        self._cond = threading.Condition()
+        self._active = 0
+        self._waiting = 0
+        self._user_active = {}
+        self._user_waiting = {}
+        self._usage = {}                        # user -> deque[(time, tokens)]
+        self._metrics = {
+            "admitted": 0,
+            "queued": 0,
+            "peak_waiting": 0,
+            "wait_s": 0.0,
+            "max_wait_s": 0.0,
+            "shed": {"queue_full": 0, "user_queue_full": 0,
+                     "timeout": 0, "token_budget": 0},
+        }
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            global_limit=int(os.getenv("POLICYLENS_LLM_CONCURRENCY", "8")),
+            per_user_limit=int(os.getenv("POLICYLENS_LLM_PER_USER", "2")),
+            max_queue=int(os.getenv("POLICYLENS_LLM_QUEUE", "32")),
+            per_user_queue=int(os.getenv("POLICYLENS_LLM_USER_QUEUE", "4")),
+            queue_timeout=float(os.getenv("POLICYLENS_LLM_QUEUE_TIMEOUT", "20")),
+            token_budget=int(os.getenv("POLICYLENS_USER_TOKEN_BUDGET", "0")),
+            budget_window=float(os.getenv("POLICYLENS_TOKEN_WINDOW_S", "3600")),
+        )
+
+    # ── token budget ──
+    def _used(self, user, now):
+        usage = self._usage.get(user)
+        if not usage:
+            return 0
+        while usage and now - usage[0][0] > self.budget_window:
+            usage.popleft()
+        return sum(tokens for _, tokens in usage)
+
+    def _shed(self, reason, retry_after):
+        self._metrics["shed"][reason] += 1
+        raise Busy(reason, retry_after)
+
+    # ── admission ──
+    def _can_run(self, user):
+        return (self._active < self.global_limit and
+                self._user_active.get(user, 0) < self.per_user_limit)
+
+    def acquire(self, user, estimate=0):
+        with self._cond:
+            now = time.monotonic()
+            if self.token_budget and self._used(user, now) + estimate > self.token_budget:
+                oldest = self._usage[user][0][0] if self._usage.get(user) else now
+                self._shed("token_budget", oldest + self.budget_window - now)
+
+            if not self._can_run(user):
+                if self._waiting >= self.max_queue:
+                    self._shed("queue_full", self.queue_timeout / 2)
+                if self._user_waiting.get(user, 0) >= self.per_user_queue:
+                    self._shed("user_queue_full", self.queue_timeout / 2)
+
+                self._waiting += 1
+                self._user_waiting[user] = self._user_waiting.get(user, 0) + 1
+                self._metrics["queued"] += 1
+                self._metrics["peak_waiting"] = max(self._metrics["peak_waiting"],
+                                                    self._waiting)
+                try:
+                    admitted = self._cond.wait_for(lambda: self._can_run(user),
+                                                   self.queue_timeout)
+                finally:
+                    self._waiting -= 1
+                    self._user_waiting[user] -= 1
+                    if not self._user_waiting[user]:
+                        del self._user_waiting[user]
+                waited = time.monotonic() - now
+                self._metrics["wait_s"] += waited
+                self._metrics["max_wait_s"] = max(self._metrics["max_wait_s"], waited)
+                if not admitted:
+                    self._shed("timeout", self.queue_timeout)
+
+            self._active += 1
+            self._user_active[user] = self._user_active.get(user, 0) + 1
+            self._metrics["admitted"] += 1
+
+    def release(self, user, tokens=0):
+        with self._cond:
+            self._active -= 1
+            self._user_active[user] -= 1
+            if not self._user_active[user]:
+                del self._user_active[user]
+            if self.token_budget and tokens:
+                self._usage.setdefault(user, deque()).append((time.monotonic(), tokens))
+            self._cond.notify_all()
+
+    @contextmanager
+    def admit(self, user=None, estimate=0):
+        # Yields a dict; set ticket["tokens"] to the real usage before exit
+        user = user or current_user()
+        self.acquire(user, estimate)
+        ticket = {"user": user, "tokens": estimate}
+        try:
+            yield ticket
+        finally:
+            self.release(user, ticket["tokens"])
+
+    def stats(self):
+        with self._cond:
+            return {
+                "active": self._active,
+                "waiting": self._waiting,
+                "users_active": len(self._user_active),
+                "global_limit": self.global_limit,
+                "max_queue": self.max_queue,
+                **{k: v for k, v in self._metrics.items() if k != "shed"},
+                "shed": dict(self._metrics["shed"]),
+                "shed_total": sum(self._metrics["shed"].values()),
+            }
+
+
+controller = AdmissionController.from_env()
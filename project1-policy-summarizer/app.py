@@ -1,17 +1,44 @@
-from dotenv import load_dotenv
-import os
-import json
+import gc
 import re
-from groq import Groq
+import time
+import uuid
+import hashlib
+import functools
+import threading
 import streamlit as st
-import fitz
-import smtplib
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-from email.mime.base import MIMEBase
-from email import encoders
+import streamlit.components.v1 as components
+
+from admission import Busy, set_user, controller as llm_admission
+from artifact_store import ArtifactStore
+from history_store import HistoryStore, HISTORY_SHARED
+from llm_backends import LocalBackendError
+from pdf_tables import table_fields
+from policy_engine import (
+    UploadRejected,
+    read_uploaded_pdf,
+    validate_policy_text,
+    summarize_with_reuse,
+    similar_policies,
+    analyses_in_flight,
+    create_summary_pdf,
+    send_email,
+    recommend_alternatives,
+    parse_chat_reply,
+    chat_reply,
+    recommend_for_profile_cached,
+    reco_cache,
+    generate_quote,
+    explain_renewal,
+    prewarm,
+)
+from renewal_diff import word_diff
+
+_page_cpu_start = time.thread_time()
 
-load_dotenv()
+# Shown when POLICYLENS_BACKEND(_<TASK>)=local and the local server is down
+LOCAL_MODEL_UNAVAILABLE = ("⚠️ The local AI model is unavailable right now. "
+                           "Please check that the local LLM server is running "
+                           "and try again.")
 
 # ─────────────────────────────────────────
 # PAGE CONFIG
@@ -147,261 +174,154 @@ st.markdown("""
 
 
 # ─────────────────────────────────────────
-# GROQ CLIENT
+# SESSION ARTIFACTS — large values live in the shared store,
+# st.session_state only keeps their handles
 # ─────────────────────────────────────────
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-
-
-# ─────────────────────────────────────────
-# FUNCTION 1 — Extract text from PDF
-# ─────────────────────────────────────────
-def extract_text_from_pdf(uploaded_file):
-    pdf_document = fitz.open(stream=uploaded_file.read(), filetype="pdf")
-    text = ""
-    for page in pdf_document:
-        text += page.get_text()
-    return text
-
-
-# ─────────────────────────────────────────
-# FUNCTION 2 — Validate insurance document
-# ─────────────────────────────────────────
-def validate_policy_text(text):
-    if len(text.strip()) < 100:
-        return False, "The text is too short to be an insurance policy."
-
-    validation_prompt = f"""
-    You are an insurance document validator.
-    Look at the following text and determine if it is a genuine insurance
-    policy document or insurance-related content.
-
-    Answer ONLY in this exact format:
-    VALID: [YES or NO]
-    REASON: [one line explanation]
-
-    Text to validate:
-    {text[:1000]}
-    """
-
-    response = client.chat.completions.create(
-        model="llama-3.3-70b-versatile",
-        messages=[
-            {"role": "system", "content": "You are a strict insurance document validator."},
-            {"role": "user", "content": validation_prompt}
-        ],
-        temperature=0.1
-    )
-
-    result = response.choices[0].message.content.strip()
-
-    if "VALID: YES" in result:
-        return True, "Valid insurance document"
-    else:
-        reason = "Document does not appear to be an insurance policy"
-        for line in result.split('\n'):
-            if line.startswith("REASON:"):
-                reason = line.replace("REASON:", "").strip()
-                break
-        return False, reason
-
+@st.cache_resource
+def get_artifact_store():
+    return ArtifactStore()
 
-# ─────────────────────────────────────────
-# FUNCTION 3 — Summarize policy
-# ─────────────────────────────────────────
-def summarize_policy(policy_text):
-    prompt = f"""
-    You are an expert insurance advisor. Analyze the following insurance policy
-    and provide a clear, simple summary any common person can understand.
 
-    Structure your response exactly like this:
+artifacts = get_artifact_store()
+if 'artifact_session' not in st.session_state:
+    st.session_state['artifact_session'] = uuid.uuid4().hex
+# LLM admission limits and token budgets are per browser session
+set_user(st.session_state['artifact_session'])
 
-    📋 POLICY OVERVIEW
-    [2-3 lines about what this policy is]
 
-    ✅ WHAT YOU ARE COVERED FOR
-    [List key coverages in simple language]
+def save_artifact(key, value):
+    st.session_state[key] = artifacts.put(
+        st.session_state['artifact_session'], key, value)
 
-    ❌ WHAT IS NOT COVERED
-    [List exclusions in simple language]
 
-    💰 COSTS YOU SHOULD KNOW
-    [Premium, deductible, copayment explained simply]
+def load_artifact(key):
+    handle = st.session_state.get(key)
+    if handle is None:
+        return None
+    value = artifacts.get(handle)
+    if value is None:
+        # Evicted (idle timeout or quota) — forget the stale handle
+        del st.session_state[key]
+    return value
 
-    🏥 HOW TO MAKE A CLAIM
-    [Simple step by step claim process]
 
-    ⚠️ IMPORTANT DATES & LIMITS
-    [Key limits and waiting periods]
+def drop_artifact(key):
+    handle = st.session_state.pop(key, None)
+    if handle is not None:
+        artifacts.delete(handle)
 
-    Keep language simple. Avoid jargon.
-    Write as if explaining to someone who never read a policy before.
 
-    POLICY TEXT:
-    {policy_text}
-    """
-    response = client.chat.completions.create(
-        model="llama-3.3-70b-versatile",
-        messages=[
-            {"role": "system", "content": "You are a helpful insurance expert."},
-            {"role": "user", "content": prompt}
-        ]
-    )
-    return response.choices[0].message.content
+# ─────────────────────────────────────────
+# ANALYSIS HISTORY — past analyses reopen from SQLite without LLM calls
+# ─────────────────────────────────────────
+@st.cache_resource
+def get_history_store():
+    return HistoryStore()
+
+
+history = get_history_store()
+HISTORY_COOKIE = "policylens_history"
+HISTORY_COOKIE_MAX_AGE = 400 * 24 * 3600    # browsers cap cookies at 400 days
+
+
+def browser_identity():
+    # (owner, is_new): the signed-in user when st.login is configured,
+    # otherwise a random token kept in a cookie, so history survives a
+    # refresh or a later visit from the same browser
+    user = getattr(st, "user", None)
+    if getattr(user, "is_logged_in", False):
+        return f"user:{user.get('email') or user.get('sub')}", False
+    context = getattr(st, "context", None)
+    token = context.cookies.get(HISTORY_COOKIE, "") if context is not None else ""
+    if re.fullmatch(r"[0-9a-f]{32}", token):
+        return f"browser:{token}", False
+    return f"browser:{uuid.uuid4().hex}", True
+
+
+if 'history_owner' not in st.session_state:
+    owner, is_new = browser_identity()
+    st.session_state['history_owner'] = owner
+    if is_new and owner.startswith("browser:"):
+        # Components run same-origin, so the cookie lands on the app's host
+        components.html(
+            f"<script>document.cookie = '{HISTORY_COOKIE}={owner[8:]}; "
+            f"max-age={HISTORY_COOKIE_MAX_AGE}; path=/; SameSite=Strict';"
+            f"</script>", height=0)
+
+
+def history_owner():
+    # Each browser (or signed-in user) only sees what it saved; an operator
+    # deployment can share one history with POLICYLENS_HISTORY_SHARED=1
+    return None if HISTORY_SHARED else st.session_state['history_owner']
+
+
+def open_analysis(record):
+    save_artifact('summary', record['summary'])
+    save_artifact('pdf_bytes', create_summary_pdf(record['summary']))
+    save_artifact('policy_text', record['policy_text'] or '')
+    save_artifact('policy_tables', [])
+    st.session_state['history_id'] = record['id']
+
+    if record.get('recommendations'):
+        save_artifact('recommendations', record['recommendations'])
+    else:
+        drop_artifact('recommendations')
+
+    if record.get('quotes'):
+        last_quote = record['quotes'][-1]
+        save_artifact('quote_text', last_quote['quote'])
+        save_artifact('quote_pdf', create_summary_pdf(
+            last_quote['quote'], f"Quote — {last_quote['insurer']}"))
+        st.session_state['quote_insurer'] = last_quote['insurer']
+    else:
+        drop_artifact('quote_text')
+        drop_artifact('quote_pdf')
 
 
 # ─────────────────────────────────────────
-# FUNCTION 4 — Create PDF from summary
+# CPU TIMING — server CPU seconds per page run and per fragment rerun
 # ─────────────────────────────────────────
-def create_summary_pdf(summary_text, title="Insurance Policy Summary"):
-    from reportlab.lib.pagesizes import letter
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, HRFlowable
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib import colors
-    import io
-
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter,
-                            rightMargin=60, leftMargin=60,
-                            topMargin=60, bottomMargin=60)
-    styles = getSampleStyleSheet()
-
-    title_style = ParagraphStyle('Title', parent=styles['Title'],
-        fontSize=20, textColor=colors.HexColor('#1a3a5c'), spaceAfter=6)
-    normal_style = ParagraphStyle('Normal', parent=styles['Normal'],
-        fontSize=11, leading=18, spaceAfter=6)
-    footer_style = ParagraphStyle('Footer', parent=styles['Normal'],
-        fontSize=8, textColor=colors.grey, alignment=1)
-
-    story = []
-    story.append(Paragraph(title, title_style))
-    story.append(HRFlowable(width="100%", thickness=2,
-                            color=colors.HexColor('#1a3a5c'), spaceAfter=12))
-
-    for line in summary_text.split('\n'):
-        if line.strip() == "":
-            story.append(Spacer(1, 6))
-        else:
-            story.append(Paragraph(line, normal_style))
+@st.cache_resource
+def get_cpu_stats():
+    return {}
 
-    story.append(Spacer(1, 20))
-    story.append(HRFlowable(width="100%", thickness=1,
-                            color=colors.grey, spaceAfter=8))
-    story.append(Paragraph(
-        "Generated by PolicyLens AI | For reference only",
-        footer_style))
 
-    doc.build(story)
-    buffer.seek(0)
-    return buffer.getvalue()
+@st.cache_resource
+def get_cpu_lock():
+    return threading.Lock()
 
 
-# ─────────────────────────────────────────
-# FUNCTION 5 — Send email via Gmail SMTP
-# ─────────────────────────────────────────
-def send_email(recipient_email, summary_text, pdf_bytes):
-    sender_email = os.getenv("GMAIL_ADDRESS")
-    app_password = os.getenv("GMAIL_APP_PASSWORD")
-
-    msg = MIMEMultipart()
-    msg['From'] = sender_email
-    msg['To'] = recipient_email
-    msg['Subject'] = "Your Insurance Policy Summary — PolicyLens AI"
-
-    body = f"""
-    <html>
-    <body style="font-family:Arial,sans-serif;padding:20px;background:#f5f5f5;">
-        <div style="max-width:600px;margin:0 auto;background:white;
-                    border-radius:16px;padding:30px;">
-            <h2 style="color:#1a3a5c;">Your Insurance Policy Summary</h2>
-            <p>Hello,</p>
-            <p>Your AI-generated insurance policy summary is attached as PDF.</p>
-            <div style="background:#f0f7ff;border-radius:10px;
-                        padding:20px;margin:20px 0;border-left:4px solid #4fc3f7;">
-                <h3 style="color:#1a3a5c;margin-top:0;">Quick Preview:</h3>
-                <pre style="font-size:13px;white-space:pre-wrap;color:#333;">
-{summary_text[:600]}...
-                </pre>
-            </div>
-            <p style="color:#888;font-size:12px;border-top:1px solid #eee;padding-top:15px;">
-                Generated by PolicyLens AI | For reference only.
-            </p>
-        </div>
-    </body>
-    </html>
-    """
-    msg.attach(MIMEText(body, 'html'))
+_cpu_state = threading.local()
 
-    attachment = MIMEBase('application', 'octet-stream')
-    attachment.set_payload(pdf_bytes)
-    encoders.encode_base64(attachment)
-    attachment.add_header('Content-Disposition', 'attachment',
-                          filename='policy_summary.pdf')
-    msg.attach(attachment)
 
-    with smtplib.SMTP_SSL('smtp.gmail.com', 465) as server:
-        server.login(sender_email, app_password)
-        server.sendmail(sender_email, recipient_email, msg.as_string())
+def record_cpu(region, seconds):
+    stats = get_cpu_stats()
+    with get_cpu_lock():
+        values = stats.setdefault(region, {"runs": 0, "cpu_s": 0.0})
+        values["runs"] += 1
+        values["cpu_s"] += seconds
 
 
-# ─────────────────────────────────────────
-# FUNCTION 6 — Recommend alternatives
-# ─────────────────────────────────────────
-def recommend_alternatives(policy_text):
-    prompt = f"""
-    You are an expert Indian insurance advisor.
-
-    Analyze this insurance policy and:
-
-    STEP 1 — Extract:
-    - Policy type (Health/Life/Vehicle/Home)
-    - Current sum insured
-    - Current annual premium
-    - Policyholder age (if mentioned)
-    - Key coverages
-
-    STEP 2 — Recommend exactly 4 alternatives from:
-    Star Health, HDFC Ergo, Niva Bupa, Care Health,
-    Bajaj Allianz, ICICI Lombard, Tata AIG, Aditya Birla Health
-
-    Respond in valid JSON only:
-    {{
-        "extracted": {{
-            "policy_type": "",
-            "current_sum_insured": "",
-            "current_premium": "",
-            "policyholder_age": "",
-            "key_coverages": []
-        }},
-        "alternatives": [
-            {{
-                "insurer": "",
-                "product": "",
-                "estimated_premium": "",
-                "sum_insured": "",
-                "advantages": [],
-                "weakness": "",
-                "rating": 0.0,
-                "claim_settlement_ratio": ""
-            }}
-        ]
-    }}
-
-    POLICY TEXT:
-    {policy_text[:3000]}
-    """
-
-    response = client.chat.completions.create(
-        model="llama-3.3-70b-versatile",
-        messages=[
-            {"role": "system", "content": "Expert Indian insurance advisor. Respond with valid JSON only."},
-            {"role": "user", "content": prompt}
-        ],
-        temperature=0.2
-    )
+def cpu_timed(region):
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            # Fragment reruns skip the page top, so bind the LLM user here too
+            set_user(st.session_state['artifact_session'])
+            # Fragments also run inside a full page run — only count
+            # the partial reruns here, the full run is counted as a whole
+            if getattr(_cpu_state, "page_run", False):
+                return fn(*args, **kwargs)
+            start = time.thread_time()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record_cpu(region, time.thread_time() - start)
+        return wrapper
+    return decorator
+
 
-    raw = response.choices[0].message.content.strip()
-    raw = raw.replace("```json", "").replace("```", "").strip()
-    return json.loads(raw)
+_cpu_state.page_run = True
 
 
 # ─────────────────────────────────────────
@@ -471,6 +391,9 @@ def build_alt_cards(alternatives, show_why=False):
 
 # ═════════════════════════════════════════
 # STREAMLIT UI
+# Each interactive region is an st.fragment, so a chat message, an email
+# keystroke or a quote request only re-executes its own region. Only the
+# Analyze button reruns the whole page.
 # ═════════════════════════════════════════
 
 # ── HERO ──
@@ -510,41 +433,62 @@ st.markdown("<br>", unsafe_allow_html=True)
 st.markdown('<div class="card">', unsafe_allow_html=True)
 st.markdown('<div class="section-header">📂 Get Started</div>', unsafe_allow_html=True)
 
-tab1, tab2, tab3 = st.tabs(["📄 Upload PDF", "📝 Paste Text", "💬 Chat with AI Agent"])
+tab1, tab2, tab3, tab4, tab5 = st.tabs(["📄 Upload PDF", "📝 Paste Text",
+                                        "💬 Chat with AI Agent", "🗂️ History",
+                                        "🔁 Compare Renewal"])
 
-policy_text = ""
 
 # ── TAB 1: PDF Upload ──
-with tab1:
+@st.fragment
+@cpu_timed("upload")
+def upload_section():
     uploaded_file = st.file_uploader(
         "Drop your insurance policy PDF here",
         type="pdf",
         help="Supports health, life, vehicle, home insurance PDFs"
     )
-    if uploaded_file is not None:
+    if uploaded_file is None:
+        st.session_state.pop('upload_id', None)
+        st.session_state.pop('upload_hash', None)
+        drop_artifact('uploaded_text')
+        drop_artifact('uploaded_tables')
+        return
+
+    # Extract once per upload, not on every rerun
+    if st.session_state.get('upload_id') != uploaded_file.file_id:
         with st.spinner("📖 Reading your PDF..."):
-            policy_text = extract_text_from_pdf(uploaded_file)
-        st.success(f"✅ PDF loaded — {len(policy_text):,} characters extracted")
+            try:
+                uploaded_text, content_hash, tables = read_uploaded_pdf(uploaded_file)
+            except UploadRejected as e:
+                drop_artifact('uploaded_text')
+                drop_artifact('uploaded_tables')
+                st.session_state.pop('upload_id', None)
+                st.error(f"❌ {str(e)}")
+                return
+        save_artifact('uploaded_text', uploaded_text)
+        save_artifact('uploaded_tables', tables)
+        st.session_state['upload_id'] = uploaded_file.file_id
+        st.session_state['upload_hash'] = content_hash
+        st.session_state['uploaded_chars'] = len(uploaded_text)
+    st.success(f"✅ PDF loaded — {st.session_state['uploaded_chars']:,} characters extracted")
+
 
 # ── TAB 2: Paste Text ──
-with tab2:
-    pasted_text = st.text_area(
+@st.fragment
+@cpu_timed("paste")
+def paste_section():
+    st.text_area(
         "Paste your policy text here",
         height=250,
-        placeholder="Copy and paste your insurance policy document text here..."
+        placeholder="Copy and paste your insurance policy document text here...",
+        key="pasted_text"
     )
-    if pasted_text:
-        policy_text = pasted_text
 
-# ── TAB 3: Chat Agent ──
-with tab3:
-    st.markdown("""
-    <p style="color:#90caf9;">
-        Don't have a policy document? No problem. Chat with our AI agent —
-        it'll ask the right questions and find the best policy for you.
-    </p>
-    """, unsafe_allow_html=True)
 
+# ── TAB 3: Chat Agent ──
+@st.fragment
+@cpu_timed("chat")
+def chat_section():
     if 'chat_messages' not in st.session_state:
         st.session_state['chat_messages'] = []
         st.session_state['chat_profile'] = {}
@@ -565,202 +509,254 @@ with tab3:
                     "Let's start! **What is your name?**"
                 )
             })
-            st.rerun()
+            st.rerun(scope="fragment")
 
-    if st.session_state['chat_started']:
+    if not st.session_state['chat_started']:
+        return
 
-        for msg in st.session_state['chat_messages']:
-            with st.chat_message(msg['role']):
-                st.markdown(msg['content'])
+    # Messages are drawn after the new turn is handled, into a container
+    # above the input, so a turn needs one fragment run instead of two
+    history = st.container()
+    user_input = st.chat_input("Type your answer here...")
 
-        user_input = st.chat_input("Type your answer here...")
+    if user_input:
+        st.session_state['chat_messages'].append({
+            "role": "user",
+            "content": user_input
+        })
+
+        with st.spinner("Agent is typing..."):
+            try:
+                ai_reply = chat_reply(st.session_state['chat_messages'])
+            except Busy as e:
+                ai_reply = None
+                st.session_state['chat_messages'].pop()
+                st.warning(f"⏳ {str(e)}")
+            except LocalBackendError:
+                ai_reply = None
+                st.session_state['chat_messages'].pop()
+                st.error(LOCAL_MODEL_UNAVAILABLE)
+
+        if ai_reply is not None and "PROFILE_COMPLETE" in ai_reply:
+            display_message, profile = parse_chat_reply(ai_reply)
+            if profile is not None:
+                st.session_state['chat_profile'] = profile
+                st.session_state['profile_ready'] = True
 
-        if user_input:
             st.session_state['chat_messages'].append({
-                "role": "user",
-                "content": user_input
+                "role": "assistant",
+                "content": (
+                    (display_message + "\n\n" if display_message else "") +
+                    "✅ **Perfect! I have all the information I need.**\n\n"
+                    "Click **Find Best Policies** below to see your "
+                    "personalized recommendations!"
+                )
+            })
+        elif ai_reply is not None:
+            st.session_state['chat_messages'].append({
+                "role": "assistant",
+                "content": ai_reply
             })
 
-            conversation_history = [
-                {
-                    "role": "system",
-                    "content": """You are a friendly, professional Indian insurance advisor chatbot.
-
-Your job is to collect information from users to recommend the best insurance policy.
-
-Collect these details one or two questions at a time (never more than 2 at once):
-1. Full name
-2. Age
-3. City in India
-4. Occupation
-5. Annual income range
-6. Marital status and dependents
-7. Pre-existing health conditions
-8. Type of insurance needed (Health/Life/Vehicle/Home)
-9. Coverage amount needed
-10. Monthly/annual budget
-11. Specific requirements (maternity, OPD, etc.)
-
-Rules:
-- Be conversational, warm and friendly
-- Ask maximum 2 questions at a time
-- Acknowledge previous answer before asking next
-- Use simple English, avoid jargon
-- Once you have all details, say exactly: "PROFILE_COMPLETE" on a new line,
-  then provide JSON:
-  {
-    "name": "",
-    "age": "",
-    "city": "",
-    "occupation": "",
-    "income": "",
-    "dependents": "",
-    "health_conditions": "",
-    "insurance_type": "",
-    "coverage_needed": "",
-    "budget": "",
-    "special_requirements": ""
-  }"""
-                }
-            ]
-
-            for msg in st.session_state['chat_messages']:
-                conversation_history.append({
-                    "role": msg['role'],
-                    "content": msg['content']
-                })
-
-            with st.spinner("Agent is typing..."):
-                response = client.chat.completions.create(
-                    model="llama-3.3-70b-versatile",
-                    messages=conversation_history,
-                    temperature=0.7
-                )
+    with history:
+        for msg in st.session_state['chat_messages']:
+            with st.chat_message(msg['role']):
+                st.markdown(msg['content'])
 
-            ai_reply = response.choices[0].message.content
+    if st.button("🔄 Start Over", key="reset_chat"):
+        for key in ['chat_messages', 'chat_profile']:
+            if key in st.session_state:
+                del st.session_state[key]
+        drop_artifact('chat_recommendations')
+        st.session_state['chat_started'] = False
+        st.session_state['profile_ready'] = False
+        st.rerun(scope="fragment")
 
-            if "PROFILE_COMPLETE" in ai_reply:
-                parts = ai_reply.split("PROFILE_COMPLETE")
-                display_message = parts[0].strip()
-                json_match = re.search(r'\{.*\}', parts[1], re.DOTALL)
-                if json_match:
-                    try:
-                        profile = json.loads(json_match.group())
-                        st.session_state['chat_profile'] = profile
-                        st.session_state['profile_ready'] = True
-                    except:
-                        pass
-
-                st.session_state['chat_messages'].append({
-                    "role": "assistant",
-                    "content": (
-                        (display_message + "\n\n" if display_message else "") +
-                        "✅ **Perfect! I have all the information I need.**\n\n"
-                        "Click **Find Best Policies** below to see your "
-                        "personalized recommendations!"
-                    )
-                })
-            else:
-                st.session_state['chat_messages'].append({
-                    "role": "assistant",
-                    "content": ai_reply
-                })
-
-            st.rerun()
-
-        if st.button("🔄 Start Over", key="reset_chat"):
-            for key in ['chat_messages', 'chat_profile', 'chat_recommendations']:
-                if key in st.session_state:
-                    del st.session_state[key]
-            st.session_state['chat_started'] = False
-            st.session_state['profile_ready'] = False
-            st.rerun()
-
-        if st.session_state.get('profile_ready'):
-            st.divider()
-            if st.button("🏆 Find Best Policies For Me",
-                         type="primary", use_container_width=True,
-                         key="chat_recommend"):
-
-                profile = st.session_state['chat_profile']
-                chat_reco_prompt = f"""
-                You are an expert Indian insurance advisor.
-
-                Based on this customer profile, recommend exactly 4 best
-                insurance products from: Star Health, HDFC Ergo, Niva Bupa,
-                Care Health, Bajaj Allianz, ICICI Lombard, Tata AIG, Aditya Birla Health
-
-                Customer Profile:
-                - Name: {profile.get('name', 'Customer')}
-                - Age: {profile.get('age', 'N/A')}
-                - City: {profile.get('city', 'India')}
-                - Occupation: {profile.get('occupation', 'N/A')}
-                - Income: {profile.get('income', 'N/A')}
-                - Dependents: {profile.get('dependents', 'N/A')}
-                - Health Conditions: {profile.get('health_conditions', 'None')}
-                - Insurance Type: {profile.get('insurance_type', 'Health')}
-                - Coverage Needed: {profile.get('coverage_needed', 'N/A')}
-                - Budget: {profile.get('budget', 'N/A')}
-                - Special Requirements: {profile.get('special_requirements', 'None')}
-
-                Respond in valid JSON only:
-                {{
-                    "customer_name": "",
-                    "insurance_type": "",
-                    "alternatives": [
-                        {{
-                            "insurer": "",
-                            "product": "",
-                            "why_perfect": "",
-                            "estimated_premium": "",
-                            "sum_insured": "",
-                            "advantages": [],
-                            "weakness": "",
-                            "rating": 0.0,
-                            "claim_settlement_ratio": ""
-                        }}
-                    ]
-                }}
-                """
-
-                with st.spinner("🤖 Finding best policies for you..."):
-                    reco_response = client.chat.completions.create(
-                        model="llama-3.3-70b-versatile",
-                        messages=[
-                            {"role": "system", "content": "Expert Indian insurance advisor. Respond with valid JSON only."},
-                            {"role": "user", "content": chat_reco_prompt}
-                        ],
-                        temperature=0.2
-                    )
-
-                raw = reco_response.choices[0].message.content.strip()
-                raw = raw.replace("```json", "").replace("```", "").strip()
+    if st.session_state.get('profile_ready'):
+        st.divider()
+        if st.button("🏆 Find Best Policies For Me",
+                     type="primary", use_container_width=True,
+                     key="chat_recommend"):
 
+            profile = st.session_state['chat_profile']
+            with st.spinner("🤖 Finding best policies for you..."):
                 try:
-                    reco_data = json.loads(raw)
-                    st.session_state['chat_recommendations'] = reco_data
-                except:
+                    reco_data = recommend_for_profile_cached(profile)
+                    save_artifact('chat_recommendations', reco_data)
+                except Busy as e:
+                    st.warning(f"⏳ {str(e)}")
+                except LocalBackendError:
+                    st.error(LOCAL_MODEL_UNAVAILABLE)
+                except ValueError:
                     st.error("Could not parse recommendations. Please try again.")
 
-            if 'chat_recommendations' in st.session_state:
-                reco = st.session_state['chat_recommendations']
-                customer_name = reco.get('customer_name', 'You')
-                alternatives = reco.get('alternatives', [])
-
-                st.markdown(f"""
-                <div style="background:rgba(79,195,247,0.08);
-                            border:1px solid rgba(79,195,247,0.3);
-                            border-radius:14px;padding:20px;margin:16px 0;">
-                    <h3 style="color:#4fc3f7;margin:0;">
-                        🎯 Personalized Recommendations for {customer_name}
-                    </h3>
-                </div>
-                """, unsafe_allow_html=True)
-
-                st.markdown(
-                    build_alt_cards(alternatives, show_why=True),
-                    unsafe_allow_html=True
-                )
+        reco = load_artifact('chat_recommendations')
+        if reco is not None:
+            customer_name = reco.get('customer_name', 'You')
+            alternatives = reco.get('alternatives', [])
+
+            st.markdown(f"""
+            <div style="background:rgba(79,195,247,0.08);
+                        border:1px solid rgba(79,195,247,0.3);
+                        border-radius:14px;padding:20px;margin:16px 0;">
+                <h3 style="color:#4fc3f7;margin:0;">
+                    🎯 Personalized Recommendations for {customer_name}
+                </h3>
+            </div>
+            """, unsafe_allow_html=True)
+
+            st.markdown(
+                build_alt_cards(alternatives, show_why=True),
+                unsafe_allow_html=True
+            )
+
+
+# ── TAB 4: History ──
+@st.fragment
+@cpu_timed("history")
+def history_section():
+    insurers, policy_types = history.facets(history_owner())
+    query = st.text_input("Search past analyses",
+                          placeholder="e.g. maternity waiting period",
+                          key="history_query")
+    f1, f2, f3, f4 = st.columns(4)
+    with f1:
+        insurer = st.selectbox("Insurer", ["Any"] + insurers, key="history_insurer")
+    with f2:
+        policy_type = st.selectbox("Policy type", ["Any"] + policy_types,
+                                   key="history_type")
+    with f3:
+        min_lakhs = st.number_input("Min sum insured (₹ lakhs)", min_value=0.0,
+                                    value=0.0, step=1.0, key="history_min")
+    with f4:
+        max_lakhs = st.number_input("Max sum insured (₹ lakhs)", min_value=0.0,
+                                    value=0.0, step=1.0, key="history_max",
+                                    help="0 = no upper limit")
+
+    start = time.perf_counter()
+    results = history.search(
+        text=query or None,
+        insurer=None if insurer == "Any" else insurer,
+        policy_type=None if policy_type == "Any" else policy_type,
+        min_sum=min_lakhs * 100000 if min_lakhs else None,
+        max_sum=max_lakhs * 100000 if max_lakhs else None,
+        owner=history_owner(),
+    )
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    st.caption(f"{len(results)} of {history.count(history_owner()):,} analyses · {elapsed_ms:.1f} ms")
+
+    for row in results:
+        h1, h2 = st.columns([5, 1])
+        with h1:
+            st.markdown(
+                f"**{row['insurer'] or 'Unknown insurer'}** · "
+                f"{row['policy_type'] or 'Unknown type'} · "
+                f"{row['sum_insured'] or 'sum insured N/A'} · "
+                f"{time.strftime('%d %b %Y', time.localtime(row['updated']))}"
+            )
+            st.caption(row['preview'].replace("\n", " ") + "…")
+        with h2:
+            if st.button("Open", key=f"history_open_{row['id']}",
+                         use_container_width=True):
+                open_analysis(history.get(row['id'], history_owner()))
+                st.rerun()
+
+
+# ── TAB 5: Renewal comparison ──
+@st.fragment
+@cpu_timed("renewal")
+def renewal_section():
+    r1, r2 = st.columns(2)
+    with r1:
+        old_file = st.file_uploader("Last year's policy", type="pdf", key="renewal_old")
+    with r2:
+        new_file = st.file_uploader("This year's renewal", type="pdf", key="renewal_new")
+
+    if st.button("🔁 Compare Versions", use_container_width=True,
+                 key="renewal_compare", disabled=not (old_file and new_file)):
+        try:
+            with st.spinner("📖 Reading both versions..."):
+                old_text = read_uploaded_pdf(old_file)[0]
+                new_text = read_uploaded_pdf(new_file)[0]
+            with st.spinner("🤖 Explaining what changed..."):
+                diff, explanation = explain_renewal(old_text, new_text)
+            save_artifact('renewal_report', {"diff": diff, "explanation": explanation})
+        except UploadRejected as e:
+            st.error(f"❌ {str(e)}")
+        except Busy as e:
+            st.warning(f"⏳ {str(e)}")
+        except LocalBackendError:
+            st.error(LOCAL_MODEL_UNAVAILABLE)
+
+    report = load_artifact('renewal_report')
+    if report is None:
+        return
+    diff = report['diff']
+
+    m1, m2, m3 = st.columns(3)
+    with m1:
+        st.markdown(f"""<div class="metric-card">
+            <div class="metric-number" style="font-size:1.2rem;">
+                {diff['unchanged_ratio']:.0%}
+            </div>
+            <div class="metric-label">Clauses Unchanged</div>
+        </div>""", unsafe_allow_html=True)
+    with m2:
+        st.markdown(f"""<div class="metric-card">
+            <div class="metric-number" style="font-size:1.2rem;">
+                {len(diff['changes'])}
+            </div>
+            <div class="metric-label">Clauses Changed</div>
+        </div>""", unsafe_allow_html=True)
+    with m3:
+        st.markdown(f"""<div class="metric-card">
+            <div class="metric-number" style="font-size:1.2rem;">
+                {diff.get('sent_chars', 0) / max(diff['total_chars'], 1):.0%}
+            </div>
+            <div class="metric-label">Text Sent to AI</div>
+        </div>""", unsafe_allow_html=True)
+
+    st.markdown("<br>", unsafe_allow_html=True)
+    st.markdown(
+        f'<div class="summary-box">{report["explanation"]}</div>',
+        unsafe_allow_html=True
+    )
+
+    if diff['changes']:
+        with st.expander(f"📑 Changed clauses ({len(diff['changes'])})"):
+            st.caption("[-removed words-] {+added words+}")
+            for change in diff['changes']:
+                st.markdown(f"**{change['type'].title()} · {change['category']}** — "
+                            f"{change['heading'][:80]}")
+                st.text(word_diff(change['old'], change['new']))
+
+
+with tab1:
+    upload_section()
+
+with tab2:
+    paste_section()
+
+with tab3:
+    st.markdown("""
+    <p style="color:#90caf9;">
+        Don't have a policy document? No problem. Chat with our AI agent —
+        it'll ask the right questions and find the best policy for you.
+    </p>
+    """, unsafe_allow_html=True)
+    chat_section()
+
+with tab4:
+    history_section()
+
+with tab5:
+    st.markdown("""
+    <p style="color:#90caf9;">
+        Renewing? Upload last year's and this year's policy wording — we match
+        them clause by clause and explain only what changed.
+    </p>
+    """, unsafe_allow_html=True)
+    renewal_section()
 
 st.markdown('</div>', unsafe_allow_html=True)
 st.markdown("<br>", unsafe_allow_html=True)
@@ -770,16 +766,25 @@ st.markdown("<br>", unsafe_allow_html=True)
 # ══════════════════════════════════════════
 if st.button("🔍 Analyze & Summarize Policy",
              type="primary", use_container_width=True):
+    # Pasted text wins over an uploaded PDF
+    pasted_text = st.session_state.get('pasted_text')
+    policy_text = pasted_text or load_artifact('uploaded_text') or ""
+    policy_tables = [] if pasted_text else load_artifact('uploaded_tables') or []
+    text_hash = hashlib.sha256(policy_text.encode("utf-8")).hexdigest()
+    past = history.find_by_hash(text_hash, history_owner()) if policy_text else None
     if policy_text == "":
         st.error("⚠️ Please upload a PDF or paste policy text first!")
+    elif past is not None:
+        # Same document analyzed before — reopen it, no LLM calls
+        open_analysis(past)
+        st.toast("✅ Reopened from history", icon="🗂️")
     else:
         with st.spinner("🔎 Validating document..."):
             is_valid, validation_message = validate_policy_text(policy_text)
 
         if not is_valid:
             for key in ['summary', 'pdf_bytes']:
-                if key in st.session_state:
-                    del st.session_state[key]
+                drop_artifact(key)
 
             st.markdown("""
             <div style="background:rgba(255,82,82,0.1);
@@ -801,40 +806,41 @@ if st.button("🔍 Analyze & Summarize Policy",
             """.format(reason=validation_message), unsafe_allow_html=True)
 
         else:
-            with st.spinner("🤖 AI is reading your policy... 10-15 seconds..."):
-                summary = summarize_policy(policy_text)
-
-            pdf_bytes = create_summary_pdf(summary)
-            st.session_state['summary'] = summary
-            st.session_state['pdf_bytes'] = pdf_bytes
-            st.session_state['policy_text'] = policy_text
-            st.toast("✅ Analysis complete!", icon="🎉")
-
-# ── RESULTS ──
-if 'summary' in st.session_state:
-
-    st.markdown("<br>", unsafe_allow_html=True)
-    st.markdown('<div class="card">', unsafe_allow_html=True)
-    st.markdown('<div class="section-header">📊 Your Policy Summary</div>',
-                unsafe_allow_html=True)
-    st.markdown(
-        f'<div class="summary-box">{st.session_state["summary"]}</div>',
-        unsafe_allow_html=True
-    )
-    st.markdown('</div>', unsafe_allow_html=True)
-
-    st.markdown("<br>", unsafe_allow_html=True)
-    st.markdown('<div class="card">', unsafe_allow_html=True)
-    st.markdown('<div class="section-header">🚀 What would you like to do?</div>',
-                unsafe_allow_html=True)
-
+            try:
+                with st.spinner("🤖 AI is reading your policy... 10-15 seconds..."):
+                    summary = summarize_with_reuse(policy_text)
+            except Busy as e:
+                summary = None
+                st.warning(f"⏳ {str(e)}")
+            except LocalBackendError:
+                summary = None
+                st.error(LOCAL_MODEL_UNAVAILABLE)
+
+            if summary is not None:
+                save_artifact('summary', summary)
+                save_artifact('pdf_bytes', create_summary_pdf(summary))
+                save_artifact('policy_text', policy_text)
+                save_artifact('policy_tables', policy_tables)
+                drop_artifact('recommendations')
+                drop_artifact('quote_text')
+                drop_artifact('quote_pdf')
+                st.session_state['history_id'] = history.save_analysis(
+                    text_hash, policy_text, summary, table_fields(policy_tables),
+                    owner=st.session_state['history_owner'])
+                st.toast("✅ Analysis complete!", icon="🎉")
+
+
+# ── DOWNLOAD + EMAIL ──
+@st.fragment
+@cpu_timed("email")
+def delivery_section():
     act1, act2 = st.columns(2)
 
     with act1:
         st.markdown("**⬇️ Download Summary**")
         st.download_button(
             label="Download as PDF",
-            data=st.session_state['pdf_bytes'],
+            data=load_artifact('pdf_bytes') or b"",
             file_name="policy_summary.pdf",
             mime="application/pdf",
             use_container_width=True
@@ -857,143 +863,225 @@ if 'summary' in st.session_state:
                     try:
                         send_email(
                             recipient_email,
-                            st.session_state['summary'],
-                            st.session_state['pdf_bytes']
+                            load_artifact('summary') or "",
+                            load_artifact('pdf_bytes') or b""
                         )
                         st.toast("✅ Email sent!", icon="📧")
                     except Exception as e:
                         st.error(f"❌ {str(e)}")
 
-    st.markdown('</div>', unsafe_allow_html=True)
 
-    # ── ALTERNATIVES ──
+# ── GENERATE QUOTE ──
+@st.fragment
+@cpu_timed("quote")
+def quote_section():
+    reco = load_artifact('recommendations') or {}
+    extracted = reco.get('extracted', {})
+    alternatives = reco.get('alternatives', [])
+
     st.markdown("<br>", unsafe_allow_html=True)
-    st.markdown('<div class="card">', unsafe_allow_html=True)
-    st.markdown("""
-    <div class="section-header">🏆 Better Alternatives in the Market</div>
-    <p style="color:#90caf9;margin-bottom:16px;">
-        Based on your current policy, our AI found better options
-        available in the Indian market right now.
-    </p>
-    """, unsafe_allow_html=True)
+    st.markdown("**📝 Want a detailed quote?**")
+
+    selected_insurer = st.selectbox(
+        "Select insurer",
+        [alt.get('insurer', '') for alt in alternatives],
+        label_visibility="collapsed"
+    )
+
+    if st.button("📄 Generate Detailed Quote", use_container_width=True):
+        with st.spinner(f"Generating quote from {selected_insurer}..."):
+            try:
+                quote_text = generate_quote(selected_insurer, extracted)
+            except Busy as e:
+                quote_text = None
+                st.warning(f"⏳ {str(e)}")
+            except LocalBackendError:
+                quote_text = None
+                st.error(LOCAL_MODEL_UNAVAILABLE)
+
+            if quote_text is not None:
+                save_artifact('quote_text', quote_text)
+                save_artifact('quote_pdf', create_summary_pdf(
+                    quote_text, f"Quote — {selected_insurer}"))
+                st.session_state['quote_insurer'] = selected_insurer
+                if 'history_id' in st.session_state:
+                    history.add_quote(st.session_state['history_id'],
+                                      selected_insurer, quote_text)
+
+    quote_text = load_artifact('quote_text')
+    if quote_text is not None:
+        st.markdown(f"""
+        <div style="background:rgba(255,213,79,0.06);
+                    border:1px solid rgba(255,213,79,0.3);
+                    border-radius:14px;padding:24px;margin-top:16px;">
+            <h3 style="color:#ffd54f;">
+                📄 Quote from {st.session_state['quote_insurer']}
+            </h3>
+            <div style="color:#fff3e0;line-height:1.8;white-space:pre-wrap;">
+{quote_text}
+            </div>
+        </div>
+        """, unsafe_allow_html=True)
+
+        st.download_button(
+            label=f"⬇️ Download {st.session_state['quote_insurer']} Quote as PDF",
+            data=load_artifact('quote_pdf') or b"",
+            file_name=f"quote_{st.session_state['quote_insurer'].lower().replace(' ', '_')}.pdf",
+            mime="application/pdf",
+            use_container_width=True
+        )
 
+
+# ── ALTERNATIVES ──
+@st.fragment
+@cpu_timed("alternatives")
+def alternatives_section():
     if st.button("🔍 Find Better Alternatives", use_container_width=True):
         with st.spinner("🤖 Analyzing Indian insurance market..."):
             try:
                 reco_data = recommend_alternatives(
-                    st.session_state.get('policy_text', '')
+                    load_artifact('policy_text') or '',
+                    load_artifact('policy_tables')
                 )
-                st.session_state['recommendations'] = reco_data
+                save_artifact('recommendations', reco_data)
+                if 'history_id' in st.session_state:
+                    history.save_recommendations(st.session_state['history_id'],
+                                                 reco_data)
+            except Busy as e:
+                st.warning(f"⏳ {str(e)}")
+            except LocalBackendError:
+                st.error(LOCAL_MODEL_UNAVAILABLE)
             except Exception as e:
                 st.error(f"❌ Could not fetch recommendations: {str(e)}")
 
-    if 'recommendations' in st.session_state:
-        reco = st.session_state['recommendations']
-        extracted = reco.get('extracted', {})
-        alternatives = reco.get('alternatives', [])
-
-        st.markdown("<br>", unsafe_allow_html=True)
-        st.markdown("**📋 Your Current Policy Details:**")
-
-        sc1, sc2, sc3 = st.columns(3)
-        with sc1:
-            st.markdown(f"""<div class="metric-card">
-                <div class="metric-number" style="font-size:1.2rem;">
-                    {extracted.get('policy_type', 'N/A')}
-                </div>
-                <div class="metric-label">Policy Type</div>
-            </div>""", unsafe_allow_html=True)
-        with sc2:
-            st.markdown(f"""<div class="metric-card">
-                <div class="metric-number" style="font-size:1.2rem;">
-                    {extracted.get('current_sum_insured', 'N/A')}
-                </div>
-                <div class="metric-label">Sum Insured</div>
-            </div>""", unsafe_allow_html=True)
-        with sc3:
-            st.markdown(f"""<div class="metric-card">
-                <div class="metric-number" style="font-size:1.2rem;">
-                    {extracted.get('current_premium', 'N/A')}
-                </div>
-                <div class="metric-label">Current Premium</div>
-            </div>""", unsafe_allow_html=True)
-
-        st.markdown("<br>", unsafe_allow_html=True)
-        st.markdown("**🏆 Recommended Alternatives:**")
-        st.markdown("<br>", unsafe_allow_html=True)
-        st.markdown(build_alt_cards(alternatives), unsafe_allow_html=True)
-
-        # ── GENERATE QUOTE ──
-        st.markdown("<br>", unsafe_allow_html=True)
-        st.markdown("**📝 Want a detailed quote?**")
-
-        selected_insurer = st.selectbox(
-            "Select insurer",
-            [alt.get('insurer', '') for alt in alternatives],
-            label_visibility="collapsed"
-        )
+    reco = load_artifact('recommendations')
+    if reco is None:
+        return
+    extracted = reco.get('extracted', {})
+    alternatives = reco.get('alternatives', [])
 
-        if st.button("📄 Generate Detailed Quote", use_container_width=True):
-            with st.spinner(f"Generating quote from {selected_insurer}..."):
-                quote_prompt = f"""
-                Generate a detailed insurance quote for:
-                - Insurer: {selected_insurer}
-                - Policy Type: {extracted.get('policy_type', 'Health')}
-                - Sum Insured: {extracted.get('current_sum_insured', '5 Lakhs')}
-                - Age: {extracted.get('policyholder_age', '35 years')}
-
-                Include:
-                - Base premium breakdown
-                - Add-on covers with costs
-                - Applicable discounts
-                - Final premium calculation
-                - Payment options (monthly/quarterly/annual)
-                - Key policy terms
-                - How to apply
-
-                Use realistic Indian market pricing in Rs.
-                Make it look like an actual insurance quote document.
-                """
-
-                quote_response = client.chat.completions.create(
-                    model="llama-3.3-70b-versatile",
-                    messages=[
-                        {"role": "system", "content": "Expert Indian insurance agent generating detailed quotes."},
-                        {"role": "user", "content": quote_prompt}
-                    ]
-                )
-
-                st.session_state['quote_text'] = quote_response.choices[0].message.content
-                st.session_state['quote_insurer'] = selected_insurer
+    st.markdown("<br>", unsafe_allow_html=True)
+    st.markdown("**📋 Your Current Policy Details:**")
 
-        if 'quote_text' in st.session_state:
-            st.markdown(f"""
-            <div style="background:rgba(255,213,79,0.06);
-                        border:1px solid rgba(255,213,79,0.3);
-                        border-radius:14px;padding:24px;margin-top:16px;">
-                <h3 style="color:#ffd54f;">
-                    📄 Quote from {st.session_state['quote_insurer']}
-                </h3>
-                <div style="color:#fff3e0;line-height:1.8;white-space:pre-wrap;">
-{st.session_state['quote_text']}
-                </div>
+    sc1, sc2, sc3 = st.columns(3)
+    with sc1:
+        st.markdown(f"""<div class="metric-card">
+            <div class="metric-number" style="font-size:1.2rem;">
+                {extracted.get('policy_type', 'N/A')}
             </div>
-            """, unsafe_allow_html=True)
+            <div class="metric-label">Policy Type</div>
+        </div>""", unsafe_allow_html=True)
+    with sc2:
+        st.markdown(f"""<div class="metric-card">
+            <div class="metric-number" style="font-size:1.2rem;">
+                {extracted.get('current_sum_insured', 'N/A')}
+            </div>
+            <div class="metric-label">Sum Insured</div>
+        </div>""", unsafe_allow_html=True)
+    with sc3:
+        st.markdown(f"""<div class="metric-card">
+            <div class="metric-number" style="font-size:1.2rem;">
+                {extracted.get('current_premium', 'N/A')}
+            </div>
+            <div class="metric-label">Current Premium</div>
+        </div>""", unsafe_allow_html=True)
 
-            quote_pdf = create_summary_pdf(
-                st.session_state['quote_text'],
-                f"Quote — {st.session_state['quote_insurer']}"
-            )
-            st.download_button(
-                label=f"⬇️ Download {st.session_state['quote_insurer']} Quote as PDF",
-                data=quote_pdf,
-                file_name=f"quote_{st.session_state['quote_insurer'].lower().replace(' ', '_')}.pdf",
-                mime="application/pdf",
-                use_container_width=True
-            )
+    st.markdown("<br>", unsafe_allow_html=True)
+    st.markdown("**🏆 Recommended Alternatives:**")
+    st.markdown("<br>", unsafe_allow_html=True)
+    st.markdown(build_alt_cards(alternatives), unsafe_allow_html=True)
+
+    quote_section()
+
+
+# ── RESULTS ──
+summary = load_artifact('summary')
+if summary is not None and 'pdf_bytes' in st.session_state:
+
+    st.markdown("<br>", unsafe_allow_html=True)
+    st.markdown('<div class="card">', unsafe_allow_html=True)
+    st.markdown('<div class="section-header">📊 Your Policy Summary</div>',
+                unsafe_allow_html=True)
+    st.markdown(
+        f'<div class="summary-box">{summary}</div>',
+        unsafe_allow_html=True
+    )
+    st.markdown('</div>', unsafe_allow_html=True)
 
+    st.markdown("<br>", unsafe_allow_html=True)
+    st.markdown('<div class="card">', unsafe_allow_html=True)
+    st.markdown('<div class="section-header">🚀 What would you like to do?</div>',
+                unsafe_allow_html=True)
+    delivery_section()
     st.markdown('</div>', unsafe_allow_html=True)
 
+    st.markdown("<br>", unsafe_allow_html=True)
+    st.markdown('<div class="card">', unsafe_allow_html=True)
+    st.markdown("""
+    <div class="section-header">🏆 Better Alternatives in the Market</div>
+    <p style="color:#90caf9;margin-bottom:16px;">
+        Based on your current policy, our AI found better options
+        available in the Indian market right now.
+    </p>
+    """, unsafe_allow_html=True)
+    alternatives_section()
+    st.markdown('</div>', unsafe_allow_html=True)
+
+# ── STORAGE + CPU STATS (sidebar) ──
+with st.sidebar:
+    store_stats = artifacts.stats()
+    st.markdown("**🗄️ Session Storage**")
+    st.caption(
+        f"Sessions: {store_stats['sessions']} · "
+        f"Artifacts: {store_stats['items']}\n\n"
+        f"In memory: {store_stats['memory_bytes'] / 1e6:.1f} MB · "
+        f"On disk: {store_stats['disk_bytes'] / 1e6:.1f} MB\n\n"
+        f"Largest session: {store_stats['largest_session_bytes'] / 1e6:.1f} MB\n\n"
+        f"Evicted — idle: {store_stats['idle_evictions']}, "
+        f"quota: {store_stats['quota_evictions']}"
+    )
+
+    index_stats = similar_policies.stats()
+    flight_stats = analyses_in_flight.stats()
+    st.markdown("**♻️ Near-Duplicate Reuse**")
+    st.caption(
+        f"Indexed policies: {index_stats['entries']} · "
+        f"Hits: {index_stats['hits']}/{index_stats['lookups']}\n\n"
+        f"Coalesced in flight: {flight_stats['coalesced']}/{flight_stats['calls']}"
+    )
+
+    cache_stats = reco_cache.stats()
+    st.markdown("**🎯 Recommendation Cache**")
+    st.caption(
+        f"Buckets cached: {cache_stats['entries']} · "
+        f"Hit rate: {cache_stats['hit_rate']:.0%} "
+        f"({cache_stats['hits']}/{cache_stats['hits'] + cache_stats['misses']})"
+    )
+
+    st.markdown("**🗂️ Analysis History**")
+    st.caption(f"Saved analyses: {history.count(history_owner()):,}"
+               + ("" if history.has_fts else " · full-text index unavailable"))
+
+    llm_stats = llm_admission.stats()
+    st.markdown("**🚦 LLM Admission**")
+    st.caption(
+        f"Running: {llm_stats['active']}/{llm_stats['global_limit']} · "
+        f"Queued: {llm_stats['waiting']}/{llm_stats['max_queue']} "
+        f"(peak {llm_stats['peak_waiting']})\n\n"
+        f"Admitted: {llm_stats['admitted']} · "
+        f"Max wait: {llm_stats['max_wait_s']:.1f}s\n\n"
+        f"Shed: {llm_stats['shed_total']} — "
+        + ", ".join(f"{reason.replace('_', ' ')}: {count}"
+                    for reason, count in llm_stats['shed'].items())
+    )
+
+    st.markdown("**⏱️ Server CPU per Run**")
+    st.caption("\n\n".join(
+        f"{region}: {values['cpu_s'] / values['runs'] * 1000:.1f} ms "
+        f"avg over {values['runs']} runs"
+        for region, values in sorted(get_cpu_stats().items())
+    ) or "No runs recorded yet")
+
 # ── FOOTER ──
 st.markdown("<br><br>", unsafe_allow_html=True)
 st.markdown("""
@@ -1002,3 +1090,27 @@ st.markdown("""
     For reference only. Consult your insurer for official policy details.
 </div>
 """, unsafe_allow_html=True)
+
+record_cpu("full page", time.thread_time() - _page_cpu_start)
+_cpu_state.page_run = False
+
+
+# ── PRE-WARM — once per server process, after the first page is painted ──
+def prewarm_and_freeze():
+    prewarm()
+    # Streamlit runs a full gc.collect() after every page and fragment run;
+    # with groq, PyMuPDF and ReportLab loaded that scan dominated a chat
+    # turn. Imported modules live as long as the process, so move them out
+    # of the collector's reach.
+    gc.freeze()
+
+
+@st.cache_resource
+def start_prewarm():
+    thread = threading.Thread(target=prewarm_and_freeze, name="policylens-prewarm",
+                              daemon=True)
+    thread.start()
+    return thread
+
+
+start_prewarm()
@@ -0,0 +1,200 @@
+import os
+import json
+import time
+import shutil
+import tempfile
+import threading
+
+
+# ─────────────────────────────────────────
+# SESSION ARTIFACT STORE
+# Keeps large per-session data (policy text, summaries, PDFs, quotes) out of
+# st.session_state. Session state only holds a short handle string; values
+# above SPILL_BYTES live on disk under one folder per session.
+# ─────────────────────────────────────────
+SPILL_BYTES = int(os.getenv("POLICYLENS_SPILL_BYTES", 32 * 1024))
+SESSION_QUOTA_BYTES = int(os.getenv("POLICYLENS_SESSION_QUOTA_BYTES", 32 * 1024 * 1024))
+IDLE_SECONDS = int(os.getenv("POLICYLENS_SESSION_IDLE_SECONDS", 30 * 60))
+SWEEP_EVERY_SECONDS = 60
+
+
+def _encode(value):
+    if isinstance(value, bytes):
+        return "bytes", value
+    if isinstance(value, str):
+        return "str", value.encode("utf-8")
+    return "json", json.dumps(value).encode("utf-8")
+
+
+def _decode(kind, data):
+    if kind == "bytes":
+        return data
+    if kind == "str":
+        return data.decode("utf-8")
+    return json.loads(data.decode("utf-8"))
+
+
+class ArtifactStore:
+
+    def __init__(self, root=None, spill_bytes=SPILL_BYTES,
+                 session_quota=SESSION_QUOTA_BYTES, idle_seconds=IDLE_SECONDS):
+        self.root = root or os.getenv("POLICYLENS_ARTIFACT_DIR") or \
+            tempfile.mkdtemp(prefix="policylens-artifacts-")
+        os.makedirs(self.root, exist_ok=True)
+        self.spill_bytes = spill_bytes
+        self.session_quota = session_quota
+        self.idle_seconds = idle_seconds
+
+        # session_id -> {"last_access": t, "items": {key: entry}}
+        # entry = {"kind", "size", "data" (in memory) or "path" (spilled), "t"}
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+        self._counters = {"spilled": 0, "quota_evictions": 0, "idle_evictions": 0}
+
+    # ── handles ──
+    @staticmethod
+    def handle(session_id, key):
+        return f"{session_id}/{key}"
+
+    @staticmethod
+    def _split(handle):
+        session_id, _, key = handle.partition("/")
+        return session_id, key
+
+    # ── public API ──
+    def put(self, session_id, key, value):
+        kind, data = _encode(value)
+        size = len(data)
+        if size > self.session_quota:
+            raise ValueError(
+                f"Artifact '{key}' is {size:,} bytes, over the "
+                f"{self.session_quota:,} byte session quota")
+
+        entry = {"kind": kind, "size": size, "t": time.monotonic()}
+        if size > self.spill_bytes:
+            path = self._path(session_id, key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(data)
+            entry["path"] = path
+        else:
+            entry["data"] = data
+
+        with self._lock:
+            session = self._session(session_id)
+            old = session["items"].pop(key, None)
+            if old is not None and "path" in old and "path" not in entry:
+                self._remove_file(old["path"])
+            session["items"][key] = entry
+            if "path" in entry:
+                self._counters["spilled"] += 1
+            self._enforce_quota(session_id, session, keep=key)
+        self._maybe_sweep()
+        return self.handle(session_id, key)
+
+    def get(self, handle, default=None):
+        session_id, key = self._split(handle)
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None or key not in session["items"]:
+                return default
+            session["last_access"] = time.monotonic()
+            entry = session["items"][key]
+            entry["t"] = session["last_access"]
+        if "path" in entry:
+            try:
+                with open(entry["path"], "rb") as f:
+                    data = f.read()
+            except FileNotFoundError:
+                return default
+        else:
+            data = entry["data"]
+        self._maybe_sweep()
+        return _decode(entry["kind"], data)
+
+    def delete(self, handle):
+        session_id, key = self._split(handle)
+        with self._lock:
+            session = self._sessions.get(session_id)
+            entry = session["items"].pop(key, None) if session else None
+        if entry is not None and "path" in entry:
+            self._remove_file(entry["path"])
+
+    def drop_session(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+        shutil.rmtree(os.path.join(self.root, session_id), ignore_errors=True)
+
+    def sweep(self):
+        now = time.monotonic()
+        with self._lock:
+            idle = [sid for sid, s in self._sessions.items()
+                    if now - s["last_access"] > self.idle_seconds]
+            self._last_sweep = now
+        for session_id in idle:
+            self.drop_session(session_id)
+        with self._lock:
+            self._counters["idle_evictions"] += len(idle)
+        return len(idle)
+
+    def stats(self):
+        with self._lock:
+            memory_bytes = 0
+            disk_bytes = 0
+            items = 0
+            largest_session = 0
+            for session in self._sessions.values():
+                session_bytes = 0
+                for entry in session["items"].values():
+                    items += 1
+                    session_bytes += entry["size"]
+                    if "path" in entry:
+                        disk_bytes += entry["size"]
+                    else:
+                        memory_bytes += entry["size"]
+                largest_session = max(largest_session, session_bytes)
+            return {
+                "sessions": len(self._sessions),
+                "items": items,
+                "memory_bytes": memory_bytes,
+                "disk_bytes": disk_bytes,
+                "largest_session_bytes": largest_session,
+                **self._counters,
+            }
+
+    # ── internals ──
+    def _path(self, session_id, key):
+        return os.path.join(self.root, session_id, key)
+
+    def _session(self, session_id):
+        session = self._sessions.setdefault(
+            session_id, {"last_access": time.monotonic(), "items": {}})
+        session["last_access"] = time.monotonic()
+        return session
+
+    def _enforce_quota(self, session_id, session, keep):
+        # Evict least recently used artifacts until the session fits its quota
+        items = session["items"]
+        used = sum(e["size"] for e in items.values())
+        for key in sorted(items, key=lambda k: items[k]["t"]):
+            if used <= self.session_quota:
+                break
+            if key == keep:
+                continue
+            entry = items.pop(key)
+            used -= entry["size"]
+            self._counters["quota_evictions"] += 1
+            if "path" in entry:
+                self._remove_file(entry["path"])
+
+    def _maybe_sweep(self):
+        if time.monotonic() - self._last_sweep > SWEEP_EVERY_SECONDS:
+            self.sweep()
+
+    @staticmethod
+    def _remove_file(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,162 @@
+import json
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from llm_backends import OpenAICompatClient, get_backend
+from llm_router import SMALL_MODEL
+
+
+# ─────────────────────────────────────────
+# Backend benchmark — latency and throughput of one backend at rising
+# concurrency, using the validation prompt (the cheapest routed task).
+#
+# Local CPU model with llama.cpp (4 parallel slots, continuous batching):
+#   llama-server -m qwen2.5-1.5b-instruct-q4_k_m.gguf -c 8192 \
+#       --parallel 4 --cont-batching --port 8080
+#   python bench_backends.py --backend local --levels 1,2,4,8
+#
+#   python bench_backends.py --backend groq --levels 1,4
+#   python bench_backends.py --fake-server   (checks the HTTP path offline)
+# ─────────────────────────────────────────
+POLICY_SNIPPET = """
+HEALTH GUARD FAMILY FLOATER POLICY — Policy Schedule
+Sum Insured: Rs. 10,00,000 | Annual Premium: Rs. 18,450 (incl. GST)
+Section 2. Coverage: in-patient hospitalisation, pre and post hospitalisation
+for 60/180 days, day care procedures, ambulance up to Rs. 2,000.
+Section 4. Exclusions: pre-existing diseases for 36 months, cosmetic surgery.
+"""
+
+
+def validation_messages(text):
+    prompt = f"""
+    You are an insurance document validator.
+    Look at the following text and determine if it is a genuine insurance
+    policy document or insurance-related content.
+
+    Answer ONLY in this exact format:
+    VALID: [YES or NO]
+    CONFIDENCE: [HIGH or LOW]
+    REASON: [one line explanation]
+
+    Text to validate:
+    {text}
+    """
+    return [
+        {"role": "system", "content": "You are a strict insurance document validator."},
+        {"role": "user", "content": prompt},
+    ]
+
+
+# ─────────────────────────────────────────
+# FAKE OPENAI-COMPATIBLE SERVER — stub answers behind real HTTP
+# ─────────────────────────────────────────
+def start_fake_server(latency_ms):
+    from llm_stub import stub_reply
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            time.sleep(latency_ms / 1000)
+            content = stub_reply(body["messages"])
+            prompt_chars = sum(len(m["content"]) for m in body["messages"])
+            data = json.dumps({
+                "choices": [{"message": {"role": "assistant", "content": content}}],
+                "usage": {"prompt_tokens": prompt_chars // 4,
+                          "completion_tokens": len(content) // 4,
+                          "total_tokens": (prompt_chars + len(content)) // 4},
+            }).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def run_level(client, model, concurrency, requests, max_tokens):
+    messages = validation_messages(POLICY_SNIPPET)
+    latencies = []
+    completion_tokens = []
+
+    def one(_):
+        start = time.perf_counter()
+        response = client.chat.completions.create(
+            model=model, messages=messages,
+            temperature=0.1, max_tokens=max_tokens,
+        )
+        latencies.append(time.perf_counter() - start)
+        completion_tokens.append(response.usage.completion_tokens or 0)
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(requests)))
+    wall = time.perf_counter() - wall_start
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "p50_s": percentile(latencies, 50),
+        "p95_s": percentile(latencies, 95),
+        "requests_per_s": requests / wall,
+        "completion_tokens_per_s": sum(completion_tokens) / wall,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark an LLM backend")
+    parser.add_argument("--backend", default="local", choices=["local", "groq", "stub"])
+    parser.add_argument("--url", help="OpenAI-compatible base URL (local backend)")
+    parser.add_argument("--model", default="", help="model name for the local server")
+    parser.add_argument("--slots", type=int, default=4,
+                        help="parallel slots of the local server")
+    parser.add_argument("--levels", default="1,2,4,8")
+    parser.add_argument("--requests", type=int, default=16,
+                        help="requests per concurrency level")
+    parser.add_argument("--max-tokens", type=int, default=64)
+    parser.add_argument("--fake-server", action="store_true",
+                        help="serve stub answers over HTTP instead of a real model")
+    parser.add_argument("--fake-latency-ms", type=float, default=200)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    if args.fake_server:
+        args.backend = "local"
+        args.url = start_fake_server(args.fake_latency_ms)
+    if args.backend == "local":
+        client = OpenAICompatClient(args.url or get_backend("local").base_url,
+                                    model=args.model, slots=args.slots)
+    else:
+        client = get_backend(args.backend)
+    model = getattr(client, "model_override", None) or SMALL_MODEL
+
+    print(f"backend {args.backend} · model {model} · {args.requests} requests per level")
+    print(f"  {'concurrency':<13}{'p50':>9}{'p95':>9}{'req/s':>9}{'tok/s':>9}")
+    results = []
+    for concurrency in [int(level) for level in args.levels.split(",")]:
+        result = run_level(client, model, concurrency, args.requests, args.max_tokens)
+        results.append(result)
+        print(f"  {concurrency:<13}{result['p50_s']:>8.2f}s{result['p95_s']:>8.2f}s"
+              f"{result['requests_per_s']:>9.2f}{result['completion_tokens_per_s']:>9.1f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import io
+import os
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# The stub LLM must be selected before policy_engine is imported
+os.environ.setdefault("POLICYLENS_LLM_STUB", "1")
+
+
+# ─────────────────────────────────────────
+# Burst test for in-flight coalescing. N sessions upload the same brochure
+# PDF at the same instant and each runs validate → summarize → alternatives,
+# once with coalescing off and once on. Reports the LLM calls made, the
+# calls coalesced into another session's run, and per-session latency.
+#
+#   python bench_burst.py --users 40 --llm-latency-ms 800
+# ─────────────────────────────────────────
+def run_burst(engine, pdf_bytes, users, coalescing):
+    import admission
+    import llm_router
+    from similarity_index import SimilarityIndex
+
+    # Fresh caches so every burst starts cold
+    engine.similar_policies = SimilarityIndex()
+    engine.analyses_in_flight.enabled = coalescing
+    flight_before = engine.analyses_in_flight.stats()
+    shed_before = admission.controller.stats()["shed_total"]
+    llm_router.reset_stats()
+
+    barrier = threading.Barrier(users)
+    latencies = []
+    failures = []
+
+    def session(user_id):
+        admission.set_user(f"burst-{user_id}")
+        barrier.wait()
+        start = time.perf_counter()
+        try:
+            text, _, tables = engine.read_uploaded_pdf(io.BytesIO(pdf_bytes))
+            is_valid, _ = engine.validate_policy_text(text)
+            if is_valid:
+                engine.summarize_with_reuse(text)
+                engine.recommend_alternatives(text, tables)
+        except Exception as e:
+            failures.append(type(e).__name__)
+        latencies.append(time.perf_counter() - start)
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users) as pool:
+        list(pool.map(session, range(users)))
+    wall = time.perf_counter() - wall_start
+
+    flight = engine.analyses_in_flight.stats()
+    latencies.sort()
+    return {
+        "coalescing": coalescing,
+        "users": users,
+        "wall_s": wall,
+        "llm_calls": sum(task["calls"] for task in llm_router.get_stats().values()),
+        "coalesced": flight["coalesced"] - flight_before["coalesced"],
+        "shed": admission.controller.stats()["shed_total"] - shed_before,
+        "failures": len(failures),
+        "p50_s": latencies[len(latencies) // 2],
+        "p95_s": latencies[int(len(latencies) * 0.95) - 1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Burst test for in-flight coalescing")
+    parser.add_argument("--users", type=int, default=40)
+    parser.add_argument("--llm-latency-ms", type=float, default=500)
+    parser.add_argument("--pdf-pages", type=int, default=8)
+    args = parser.parse_args()
+
+    os.environ["POLICYLENS_STUB_LATENCY_MS"] = str(args.llm_latency_ms)
+    import policy_engine as engine
+    import llm_stub
+    from loadtest import make_policy_pdf
+    llm_stub.STUB_LATENCY_MS = args.llm_latency_ms
+    pdf_bytes = make_policy_pdf(args.pdf_pages)
+
+    print(f"{args.users} sessions upload the same PDF at once "
+          f"(stub LLM latency {args.llm_latency_ms:.0f} ms)")
+    print(f"  {'coalescing':<12}{'LLM calls':>10}{'coalesced':>11}{'shed':>6}"
+          f"{'failed':>8}{'p50':>9}{'p95':>9}{'wall':>9}")
+    for coalescing in (False, True):
+        r = run_burst(engine, pdf_bytes, args.users, coalescing)
+        print(f"  {'on' if coalescing else 'off':<12}{r['llm_calls']:>10}"
+              f"{r['coalesced']:>11}{r['shed']:>6}{r['failures']:>8}"
+              f"{r['p50_s']:>8.2f}s{r['p95_s']:>8.2f}s{r['wall_s']:>8.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import os
+import time
+import random
+import hashlib
+import argparse
+import tempfile
+
+from history_store import HistoryStore, KNOWN_INSURERS
+
+
+# ─────────────────────────────────────────
+# Analysis history benchmark. Fills a fresh SQLite store with synthetic
+# analyses spread over --owners sessions and times the searches the History
+# tab runs for one session: free text, each structured filter, and free text
+# combined with filters, plus the shared (all sessions) view.
+#
+#   python bench_history.py --records 50000 --owners 2000
+# ─────────────────────────────────────────
+POLICY_TYPES = ["Health", "Life", "Vehicle", "Home"]
+CLAUSES = [
+    "maternity benefit after a waiting period of {n} months",
+    "room rent capped at {n}% of sum insured",
+    "co-payment of {n}% for insured persons above 60",
+    "pre-existing diseases covered after {n} years",
+    "no claim bonus of {n}% per claim-free year",
+    "cataract surgery sub-limit of Rs. {n},000 per eye",
+    "ambulance charges up to Rs. {n},000 per hospitalisation",
+    "day care procedures covered up to {n} listed treatments",
+    "personal accident cover of {n} lakhs for the owner-driver",
+    "critical illness rider covering {n} listed conditions",
+]
+
+
+def make_record(rng):
+    insurer = rng.choice(KNOWN_INSURERS)
+    policy_type = rng.choice(POLICY_TYPES)
+    clauses = [c.format(n=rng.randint(1, 60)) for c in rng.sample(CLAUSES, 5)]
+    summary = (f"📋 POLICY TYPE: {policy_type} insurance from {insurer}.\n"
+               f"✅ WHAT IS COVERED: " + "; ".join(clauses[:3]) + ".\n"
+               f"❌ WHAT IS NOT COVERED: " + "; ".join(clauses[3:]) + ".")
+    policy_text = f"{insurer} {policy_type} Insurance Policy\n" + "\n".join(clauses) * 20
+    fields = {
+        "policy_type": policy_type,
+        "current_sum_insured": f"Rs. {rng.choice([3, 5, 10, 15, 25, 50, 100])} lakhs",
+        "current_premium": f"Rs. {rng.randint(50, 600) * 100}",
+    }
+    return policy_text, summary, fields
+
+
+def timed(fn, repeats):
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2], samples[int(len(samples) * 0.95)], len(result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark analysis history search")
+    parser.add_argument("--records", type=int, default=20000)
+    parser.add_argument("--owners", type=int, default=1000)
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = HistoryStore(os.path.join(tmp, "history.db"))
+
+        start = time.perf_counter()
+        for i in range(args.records):
+            policy_text, summary, fields = make_record(rng)
+            content_hash = hashlib.sha256(f"{i}{policy_text}".encode()).hexdigest()
+            store.save_analysis(content_hash, policy_text, summary, fields,
+                                owner=f"session{i % args.owners}")
+        insert_s = time.perf_counter() - start
+        db_mb = os.path.getsize(store.path) / 1e6
+
+        owner = "session7"
+        queries = {
+            "recent (no filter)": lambda: store.search(owner=owner),
+            "text 'maternity'": lambda: store.search(text="maternity", owner=owner),
+            "text 'room rent capped'": lambda: store.search(text="room rent capped",
+                                                            owner=owner),
+            "insurer filter": lambda: store.search(insurer="Star Health", owner=owner),
+            "type + sum range": lambda: store.search(policy_type="Health",
+                                                     min_sum=1e6, max_sum=2.5e6,
+                                                     owner=owner),
+            "text + all filters": lambda: store.search(
+                text="co-payment", insurer="HDFC Ergo", policy_type="Health",
+                min_sum=5e5, max_sum=5e6, owner=owner),
+            "facets + count": lambda: [store.facets(owner), store.count(owner)],
+            "reopen by id": lambda: [store.get(rng.randint(1, args.records))],
+            "shared: recent": lambda: store.search(),
+            "shared: text 'maternity'": lambda: store.search(text="maternity"),
+            "shared: text + filters": lambda: store.search(
+                text="co-payment", insurer="HDFC Ergo", policy_type="Health",
+                min_sum=5e5, max_sum=5e6),
+        }
+
+        print(f"records               {args.records:,} over {args.owners:,} sessions "
+              f"(inserted in {insert_s:.1f}s, {db_mb:.0f} MB, FTS5: {store.has_fts})")
+        print(f"  {'query':<28}{'rows':>6}{'p50':>10}{'p95':>10}")
+        for name, fn in queries.items():
+            p50, p95, rows = timed(fn, args.repeats)
+            print(f"  {name:<28}{rows:>6}{p50:>8.2f}ms{p95:>8.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+import re
+import time
+import random
+import argparse
+import textwrap
+
+from renewal_diff import align_clauses
+
+
+# ─────────────────────────────────────────
+# Renewal diff benchmark. Builds synthetic policy wordings, derives a
+# renewal with a few edited / added / removed clauses, a new premium in the
+# schedule (an amount on its own line, as PDF tables extract) and re-wrapped
+# lines and page numbers (as a re-typeset PDF would have), and measures how
+# well the changed clauses are found, alignment time, and the text sent to
+# the LLM against two full analyses.
+#
+#   python bench_renewal.py --pairs 20 --sections 20 --edits 6
+# ─────────────────────────────────────────
+SECTIONS = ["Definitions", "Hospitalisation Benefits", "Day Care Treatment",
+            "Pre and Post Hospitalisation", "Room Rent and ICU", "Ambulance",
+            "Maternity Benefit", "Organ Donor Expenses", "AYUSH Treatment",
+            "Waiting Periods", "Permanent Exclusions", "Co-payment",
+            "Claims Procedure", "Cashless Facility", "Cumulative Bonus",
+            "Premium and Payment", "Renewal Terms", "Cancellation",
+            "Grievance Redressal", "Free Look Period", "Portability",
+            "Moratorium Period", "Territorial Limits", "Nomination"]
+CLAUSES = [
+    "The Company shall indemnify medical expenses up to Rs. {n},000 per "
+    "policy year for treatment taken on the advice of a medical practitioner.",
+    "Expenses incurred within {n} days of the date of admission are payable "
+    "subject to the claim being admissible under this section.",
+    "This benefit is subject to a waiting period of {n} months from the "
+    "first policy inception date.",
+    "A co-payment of {n}% applies to every admissible claim where the insured "
+    "person is aged 61 years or more at entry.",
+    "The premium payable is Rs. {n},450 per annum inclusive of applicable "
+    "taxes and may be paid in monthly or quarterly instalments.",
+    "Claims must be intimated within {n} hours of emergency admission and "
+    "within {n} days of discharge for reimbursement.",
+    "Treatment related to {n} listed conditions is excluded unless the "
+    "condition is declared and accepted by the Company.",
+]
+
+
+PAGE_FOOTERS = ["Page {n}", "{n}", "{n} of {total}"]
+
+
+def make_policy(rng, sections):
+    clauses = ["SECTION 0. POLICY SCHEDULE",
+               f"0.1 Annual premium payable (Rs.)\n{rng.randint(80, 400) * 100}",
+               f"0.2 Sum insured (Rs.)\n{rng.choice([3, 5, 10, 25]) * 100000}"]
+    for s, name in enumerate(rng.sample(SECTIONS, sections), start=1):
+        clauses.append(f"SECTION {s}. {name.upper()}")
+        for c in range(1, rng.randint(4, 8)):
+            clauses.append(f"{s}.{c} " + rng.choice(CLAUSES).format(n=rng.randint(2, 90)))
+    return clauses
+
+
+def render(clauses, rng):
+    # Re-wrap every clause at a random width and number the pages in one
+    # of the usual styles, like a re-typeset PDF
+    width = rng.randint(60, 95)
+    footer = rng.choice(PAGE_FOOTERS)
+    total = len(clauses) // 12
+    lines = []
+    for page, clause in enumerate(clauses):
+        for part in clause.split("\n"):
+            lines.extend(textwrap.wrap(part, width))
+        if page % 12 == 11:
+            lines.append(footer.format(n=page // 12 + 1, total=total))
+    return "\n".join(lines)
+
+
+def make_renewal(rng, clauses, edits):
+    new = list(clauses)
+    # New premium: only the amount line differs
+    label, amount = new[1].split("\n")
+    new[1] = f"{label}\n{int(amount) + rng.randint(5, 40) * 100}"
+    changed = {"0.1"}
+    body = [i for i, c in enumerate(new)
+            if not c.startswith("SECTION") and "\n" not in c]
+    for i in rng.sample(body, edits):
+        number, text = new[i].split(" ", 1)
+        new[i] = f"{number} " + re.sub(r"\d+", str(rng.randint(91, 99)), text, count=1)
+        changed.add(number)
+    # One clause added at the end of a section, one removed
+    insert_at = rng.choice(body)
+    number = new[insert_at].split(" ", 1)[0] + ".1"
+    new.insert(insert_at + 1, f"{number} " + rng.choice(CLAUSES).format(n=77))
+    changed.add(number)
+    removed = rng.choice([i for i in body if i != insert_at and
+                          new[i].split(" ", 1)[0] not in changed])
+    changed.add(new[removed].split(" ", 1)[0])
+    del new[removed]
+    return new, changed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark clause-level renewal diff")
+    parser.add_argument("--pairs", type=int, default=20)
+    parser.add_argument("--sections", type=int, default=20)
+    parser.add_argument("--edits", type=int, default=6)
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    hits = found = truth = 0
+    sent = full = 0
+    align_ms = []
+    unchanged = []
+    for _ in range(args.pairs):
+        old_clauses = make_policy(rng, args.sections)
+        new_clauses, changed = make_renewal(rng, old_clauses, args.edits)
+        old_text, new_text = render(old_clauses, rng), render(new_clauses, rng)
+
+        start = time.perf_counter()
+        diff = align_clauses(old_text, new_text)
+        align_ms.append((time.perf_counter() - start) * 1000)
+
+        detected = {change["heading"].split(" ", 1)[0] for change in diff["changes"]}
+        hits += len(detected & changed)
+        found += len(detected)
+        truth += len(changed)
+        sent += diff["changed_chars"]
+        full += diff["total_chars"]
+        unchanged.append(diff["unchanged_ratio"])
+
+    align_ms.sort()
+    print(f"renewal pairs         {args.pairs} ({args.sections} sections, "
+          f"{args.edits} edits + 1 added + 1 removed clause + new premium each)")
+    print(f"unchanged clauses     {sum(unchanged) / len(unchanged):.1%}")
+    print(f"changed-clause recall {hits / truth:.3f}   precision {hits / max(found, 1):.3f}")
+    print(f"alignment time        p50 {align_ms[len(align_ms) // 2]:.1f} ms, "
+          f"max {align_ms[-1]:.1f} ms")
+    print(f"text sent to the LLM  {sent:,} chars vs {full:,} for two full analyses "
+          f"({sent / full:.1%})")
+
+
+if __name__ == "__main__":
+    main()
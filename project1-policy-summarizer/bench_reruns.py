@@ -0,0 +1,172 @@
+import os
+import sys
+import time
+import socket
+import asyncio
+import argparse
+import subprocess
+import urllib.request
+
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+from loadtest import make_policy_pdf
+
+
+# ─────────────────────────────────────────
+# Rerun CPU benchmark. Starts `streamlit run app.py` with the stub LLM and
+# drives it over the browser websocket: upload a PDF, analyze it, start the
+# chat, then answer N chat turns. Reports server-process CPU (all threads,
+# including Streamlit's own messaging and garbage collection) per chat turn,
+# per chat fragment rerun and per full page run.
+#
+#   python bench_reruns.py --turns 30
+#   python bench_reruns.py --app /path/to/other/checkout/app.py
+# ─────────────────────────────────────────
+ANSWERS = ["My name is Test User", "I am 34 and live in Pune", "Engineer, 12 lakhs"]
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+
+
+def process_cpu(pid):
+    # utime + stime of the whole process, exited threads included
+    fields = open(f"/proc/{pid}/stat").read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+
+
+class Browser:
+
+    def __init__(self, ws):
+        self.ws = ws
+        self.widgets = {}
+        self.states = {}
+        self.session_id = None
+
+    async def receive(self):
+        while True:
+            msg = ForwardMsg()
+            msg.ParseFromString(await self.ws.recv())
+            kind = msg.WhichOneof("type")
+            if kind == "new_session":
+                self.session_id = msg.new_session.initialize.session_id
+            elif kind == "delta" and msg.delta.WhichOneof("type") == "new_element":
+                element = getattr(msg.delta.new_element, msg.delta.new_element.WhichOneof("type"))
+                if getattr(element, "id", ""):
+                    label = getattr(element, "label", "") or getattr(element, "placeholder", "")
+                    self.widgets[element.id] = (msg.delta.new_element.WhichOneof("type"),
+                                                label, msg.delta.fragment_id)
+            elif kind == "file_urls_response":
+                return msg.file_urls_response
+            elif kind == "script_finished":
+                if msg.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    return msg.script_finished
+
+    def find(self, kind, label=""):
+        for widget_id, (widget_kind, widget_label, fragment_id) in self.widgets.items():
+            if widget_kind == kind and label in widget_label:
+                return widget_id, fragment_id
+        raise LookupError(f"No {kind} widget labelled {label!r}")
+
+    async def rerun(self, trigger=None, fragment_id=""):
+        back = BackMsg()
+        back.rerun_script.widget_states.widgets.extend(self.states.values())
+        if trigger is not None:
+            back.rerun_script.widget_states.widgets.append(trigger)
+        back.rerun_script.fragment_id = fragment_id
+        await self.ws.send(back.SerializeToString())
+        await self.receive()
+
+    async def upload(self, port, pdf_bytes):
+        widget_id, fragment_id = self.find("file_uploader")
+        back = BackMsg()
+        back.file_urls_request.request_id = "bench"
+        back.file_urls_request.file_names.append("policy.pdf")
+        back.file_urls_request.session_id = self.session_id
+        await self.ws.send(back.SerializeToString())
+        urls = (await self.receive()).file_urls[0]
+
+        boundary = "policylens-bench"
+        body = (f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; "
+                f"filename=\"policy.pdf\"\r\nContent-Type: application/pdf\r\n\r\n"
+                ).encode() + pdf_bytes + f"\r\n--{boundary}--\r\n".encode()
+        url = urls.upload_url
+        if url.startswith("/"):
+            url = f"http://127.0.0.1:{port}{url}"
+        request = urllib.request.Request(url, data=body, method="PUT", headers={
+            "Content-Type": f"multipart/form-data; boundary={boundary}"})
+        urllib.request.urlopen(request).close()
+
+        state = WidgetState(id=widget_id)
+        info = state.file_uploader_state_value.uploaded_file_info.add()
+        info.name, info.size, info.file_id = "policy.pdf", len(pdf_bytes), urls.file_id
+        info.file_urls.CopyFrom(urls)
+        self.states[widget_id] = state
+        await self.rerun(fragment_id=fragment_id)
+
+
+async def run_session(port, pid, turns, pdf_bytes):
+    async with websockets.connect(f"ws://127.0.0.1:{port}/_stcore/stream",
+                                  subprotocols=["streamlit"], max_size=None) as ws:
+        browser = Browser(ws)
+        await browser.rerun()
+        await browser.upload(port, pdf_bytes)
+        for label in ("Analyze", "Start Chat"):
+            widget_id, fragment_id = browser.find("button", label)
+            await browser.rerun(WidgetState(id=widget_id, trigger_value=True), fragment_id)
+
+        chat_id, chat_fragment = browser.find("chat_input")
+        start = process_cpu(pid)
+        for turn in range(turns):
+            answer = WidgetState(id=chat_id)
+            answer.chat_input_value.data = ANSWERS[turn % len(ANSWERS)]
+            await browser.rerun(answer, chat_fragment)
+        results = {"chat turn": (process_cpu(pid) - start) / turns}
+
+        for label, fragment_id in (("chat fragment rerun", chat_fragment), ("full page run", "")):
+            start = process_cpu(pid)
+            for _ in range(turns):
+                await browser.rerun(fragment_id=fragment_id)
+            results[label] = (process_cpu(pid) - start) / turns
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark server CPU per rerun")
+    parser.add_argument("--app", default=os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                      "app.py"))
+    parser.add_argument("--turns", type=int, default=30)
+    args = parser.parse_args()
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    env = dict(os.environ, POLICYLENS_LLM_STUB="1")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", args.app, "--server.headless", "true",
+         "--server.port", str(port), "--server.enableXsrfProtection", "false",
+         "--server.fileWatcherType", "none", "--browser.gatherUsageStats", "false"],
+        env=env, cwd=os.path.dirname(args.app),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        for _ in range(100):
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health").close()
+                break
+            except OSError:
+                time.sleep(0.2)
+        pdf_bytes = make_policy_pdf(8)
+        # First session warms imports, caches and the pre-warm thread
+        asyncio.run(run_session(port, server.pid, 3, pdf_bytes))
+        results = asyncio.run(run_session(port, server.pid, args.turns, pdf_bytes))
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f"server CPU per interaction ({args.turns} runs each, stub LLM)")
+    for label, seconds in results.items():
+        print(f"  {label:<22}{seconds * 1000:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
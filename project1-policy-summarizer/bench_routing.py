@@ -0,0 +1,111 @@
+import argparse
+import os
+import sys
+
+import llm_router
+from llm_router import LARGE_MODEL
+from policy_engine import (
+    extract_text_from_pdf,
+    validate_policy_text,
+    summarize_policy,
+    recommend_alternatives,
+    chat_reply,
+    generate_quote,
+)
+
+
+# ─────────────────────────────────────────
+# Routing benchmark — runs every routed task on a corpus of policies,
+# once with the tiered routing and once with everything on the large model,
+# and prints latency and token savings per task.
+#
+#   python bench_routing.py path/to/corpus   (folder of .pdf / .txt files)
+# ─────────────────────────────────────────
+CHAT_SCRIPT = [
+    {"role": "assistant", "content": "Hello! 👋 Let's start! **What is your name?**"},
+    {"role": "user", "content": "Priya, I am 34 and live in Pune."},
+]
+
+
+def load_corpus(folder):
+    docs = []
+    for name in sorted(os.listdir(folder)):
+        path = os.path.join(folder, name)
+        if name.lower().endswith(".pdf"):
+            with open(path, "rb") as f:
+                docs.append((name, extract_text_from_pdf(f)))
+        elif name.lower().endswith(".txt"):
+            with open(path, encoding="utf-8") as f:
+                docs.append((name, f.read()))
+    return docs
+
+
+def run_tasks(docs):
+    llm_router.reset_stats()
+    for name, text in docs:
+        print(f"  {name}", file=sys.stderr)
+        validate_policy_text(text)
+        summarize_policy(text)
+        reco = recommend_alternatives(text)
+        alternatives = reco.get("alternatives") or [{"insurer": "Star Health"}]
+        generate_quote(alternatives[0].get("insurer", ""), reco.get("extracted", {}))
+        chat_reply(CHAT_SCRIPT)
+    return llm_router.get_stats()
+
+
+def totals(task_stats):
+    tokens = 0
+    large_tokens = 0
+    for model, values in task_stats["models"].items():
+        used = values["prompt_tokens"] + values["completion_tokens"]
+        tokens += used
+        if model == LARGE_MODEL:
+            large_tokens += used
+    return tokens, large_tokens
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark tiered model routing")
+    parser.add_argument("corpus", help="folder with .pdf / .txt policy documents")
+    args = parser.parse_args()
+
+    docs = load_corpus(args.corpus)
+    if not docs:
+        sys.exit(f"No .pdf or .txt files found in {args.corpus}")
+
+    print("Routed run...", file=sys.stderr)
+    routed = run_tasks(docs)
+
+    saved_models = dict(llm_router.TASK_MODELS)
+    for task in saved_models:
+        llm_router.set_task_model(task, LARGE_MODEL)
+    print("Baseline run (large model only)...", file=sys.stderr)
+    try:
+        baseline = run_tasks(docs)
+    finally:
+        for task, model in saved_models.items():
+            llm_router.set_task_model(task, model)
+
+    header = (f"{'task':<16}{'model':<26}{'esc%':>6}"
+              f"{'lat routed':>12}{'lat base':>10}{'lat saved':>11}"
+              f"{'70B tok routed':>16}{'70B tok base':>14}")
+    print(header)
+    print("-" * len(header))
+    for task in llm_router.TASK_MODELS:
+        if task not in routed or task not in baseline:
+            continue
+        r, b = routed[task], baseline[task]
+        calls = len(docs)
+        lat_r = r["latency_s"] / calls
+        lat_b = b["latency_s"] / calls
+        _, large_r = totals(r)
+        _, large_b = totals(b)
+        esc = 100.0 * r["escalations"] / calls
+        saved = 100.0 * (1 - lat_r / lat_b) if lat_b else 0.0
+        print(f"{task:<16}{saved_models[task]:<26}{esc:>5.0f}%"
+              f"{lat_r:>11.2f}s{lat_b:>9.2f}s{saved:>10.0f}%"
+              f"{large_r:>16,}{large_b:>14,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import argparse
+import random
+import time
+
+from similarity_index import SimilarityIndex, minhash_signature, changed_lines, entry_text
+
+
+# ─────────────────────────────────────────
+# Near-duplicate benchmark on a synthetic corpus. No LLM calls.
+#
+#   python bench_similarity.py --products 200 --variants 5
+#
+# Positives are the same product wording with new personal fields,
+# hard negatives are the same product with a share of clauses rewritten,
+# and unrelated negatives are products that were never indexed.
+# ─────────────────────────────────────────
+WORDS = (
+    "insured hospitalisation expenses room rent icu charges sum insured "
+    "pre existing disease waiting period months days cover benefit claim "
+    "cashless network hospital reimbursement deductible copayment maternity "
+    "newborn daycare procedure ambulance domiciliary ayush organ donor "
+    "exclusion cosmetic treatment dental accident critical illness renewal "
+    "grace period free look cancellation premium installment policy year "
+    "nominee portability migration sub limit cataract knee replacement "
+    "bonus cumulative restoration no claim discount wellness checkup opd "
+    "consultation pharmacy diagnostics company shall pay reasonable customary "
+    "subject to terms conditions within notified intimation documents"
+).split()
+FIRST_NAMES = ["Aarav", "Priya", "Rohan", "Ananya", "Vikram", "Meera",
+               "Arjun", "Kavya", "Rahul", "Sneha", "Karan", "Isha"]
+LAST_NAMES = ["Sharma", "Iyer", "Patel", "Reddy", "Nair", "Gupta",
+              "Singh", "Menon", "Das", "Kulkarni"]
+
+
+def random_clause(rng):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(10, 22))) + "."
+
+
+def make_product(rng, clauses=150):
+    return [random_clause(rng) for _ in range(clauses)]
+
+
+def personal_header(rng):
+    return [
+        f"Policyholder: {rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+        f"Policy Number: {rng.randint(10**9, 10**10 - 1)}",
+        f"Period: {rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/2025 to "
+        f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/2026",
+        f"Annual Premium: Rs. {rng.randint(8, 60) * 1000:,}",
+        f"Sum Insured: Rs. {rng.choice([3, 5, 10, 15, 25])} Lakhs",
+    ]
+
+
+def render(rng, clauses):
+    return "\n".join(personal_header(rng) + clauses)
+
+
+def rewrite(rng, clauses, share):
+    rewritten = list(clauses)
+    for i in rng.sample(range(len(clauses)), int(len(clauses) * share)):
+        rewritten[i] = random_clause(rng)
+    return rewritten
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark near-duplicate detection")
+    parser.add_argument("--products", type=int, default=200)
+    parser.add_argument("--variants", type=int, default=5)
+    parser.add_argument("--rewrite-share", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    products = [make_product(rng) for _ in range(args.products)]
+    index = SimilarityIndex(max_entries=args.products)
+
+    start = time.perf_counter()
+    for product_id, clauses in enumerate(products):
+        index.add(product_id, render(rng, clauses), {"summary": ""})
+    add_s = time.perf_counter() - start
+
+    queries = []   # (text, expected product id or None)
+    for product_id, clauses in enumerate(products):
+        for _ in range(args.variants):
+            queries.append((render(rng, clauses), product_id))
+        queries.append((render(rng, rewrite(rng, clauses, args.rewrite_share)), None))
+    for _ in range(args.products):
+        queries.append((render(rng, make_product(rng)), None))
+
+    tp = fp = fn = tn = 0
+    signature_s = 0.0
+    lookup_s = 0.0
+    patch_lines = []
+    for text, expected in queries:
+        t0 = time.perf_counter()
+        signature = minhash_signature(text)
+        t1 = time.perf_counter()
+        match = index.find(signature=signature)
+        t2 = time.perf_counter()
+        signature_s += t1 - t0
+        lookup_s += t2 - t1
+
+        if match is not None and match[0] == expected:
+            tp += 1
+            added, removed = changed_lines(text, entry_text(match[2]))
+            patch_lines.append(len(added) + len(removed))
+        elif match is not None:
+            fp += 1
+            if expected is not None:
+                fn += 1
+        elif expected is not None:
+            fn += 1
+        else:
+            tn += 1
+
+    positives = args.products * args.variants
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / positives if positives else 0.0
+    print(f"indexed products      {args.products}  "
+          f"({add_s / args.products * 1000:.2f} ms per add)")
+    print(f"queries               {len(queries)}  "
+          f"({positives} near-duplicates, {len(queries) - positives} negatives)")
+    print(f"precision             {precision:.3f}")
+    print(f"recall                {recall:.3f}")
+    print(f"false positives       {fp}   true negatives {tn}")
+    print(f"hit rate              {(tp + fp) / len(queries):.3f}")
+    print(f"signature time        {signature_s / len(queries) * 1000:.3f} ms per doc")
+    print(f"lookup time           {lookup_s / len(queries) * 1000:.3f} ms per doc")
+    if patch_lines:
+        print(f"lines sent to patch   {sum(patch_lines) / len(patch_lines):.1f} avg "
+              f"(of {len(products[0]) + 5} per document)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+import importlib.util
+
+
+# ─────────────────────────────────────────
+# Startup benchmark. Imports each module the app loads at startup in a
+# fresh interpreter with -X importtime and reports the median cumulative
+# import time with a breakdown by direct child import, then the cost of the
+# modules that are deferred to first use / pre-warm. --record appends the
+# result as one JSON line so startup time can be tracked across commits.
+#
+#   python bench_startup.py --runs 7
+#   python bench_startup.py --record startup_history.jsonl
+# ─────────────────────────────────────────
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+STARTUP_MODULES = ["streamlit", "policy_engine", "artifact_store",
+                   "history_store", "admission"]
+DEFERRED_MODULES = ["groq", "fitz", "reportlab.platypus", "smtplib",
+                    "email.mime.multipart"]
+
+
+def _parse(line):
+    # "import time: self | cumulative | <2 spaces per level>name"
+    _, cumulative, name = line.split("|")
+    name = name[1:]
+    return (len(name) - len(name.lstrip())) // 2, name.strip(), int(cumulative)
+
+
+def import_times(module):
+    # {name: cumulative_us} for the module and its direct child imports
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, cwd=HERE,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    entries = [_parse(line) for line in result.stderr.splitlines()
+               if line.startswith("import time:") and line.split("|")[1].strip().isdigit()]
+    # importtime prints children before their parent
+    index = max(i for i, (depth, name, _) in enumerate(entries)
+                if depth == 0 and name == module)
+    times = {module: entries[index][2]}
+    for depth, name, cumulative in reversed(entries[:index]):
+        if depth == 0:
+            break
+        if depth == 1:
+            times[name] = cumulative
+    return times
+
+
+def median_times(module, runs):
+    samples = [import_times(module) for _ in range(runs)]
+    names = set().union(*samples)
+    return {name: statistics.median(s.get(name, 0) for s in samples) / 1000
+            for name in names}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PolicyLens import-time startup")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=5,
+                        help="child imports to list per module")
+    parser.add_argument("--record", help="append the results as a JSON line to this file")
+    args = parser.parse_args()
+
+    report = {"startup": {}, "deferred": {}}
+    print(f"{'startup import':<34}{'median ms':>10}")
+    for module in STARTUP_MODULES:
+        if importlib.util.find_spec(module) is None:
+            print(f"{module:<34}{'not installed':>10}")
+            continue
+        times = median_times(module, args.runs)
+        total = times.pop(module)
+        report["startup"][module] = {"total_ms": total, "children": times}
+        print(f"{module:<34}{total:>10.1f}")
+        for name, ms in sorted(times.items(), key=lambda kv: -kv[1])[:args.top]:
+            print(f"  {name:<32}{ms:>10.1f}")
+
+    print(f"\n{'deferred to first use / pre-warm':<34}{'median ms':>10}")
+    for module in DEFERRED_MODULES:
+        if importlib.util.find_spec(module.split(".")[0]) is None:
+            continue
+        total = median_times(module, args.runs)[module]
+        report["deferred"][module] = total
+        print(f"{module:<34}{total:>10.1f}")
+
+    if args.record:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                                capture_output=True, text=True, cwd=HERE).stdout.strip()
+        with open(args.record, "a") as f:
+            f.write(json.dumps({"time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                                "commit": commit, "python": sys.version.split()[0],
+                                **report}) + "\n")
+
+
+if __name__ == "__main__":
+    main()
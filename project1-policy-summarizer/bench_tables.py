@@ -0,0 +1,183 @@
+import os
+import sys
+import random
+import argparse
+
+import fitz
+
+from pdf_tables import page_text_with_tables, table_fields
+
+
+# ─────────────────────────────────────────
+# Table extraction benchmark. Builds synthetic policy schedules — the
+# policyholder's schedule (label/value), a plan comparison, an age-band rate
+# chart and sub-limits — and measures cell accuracy, field accuracy (the
+# schedule's values, never a plan or rate-chart row) and prompt size of the
+# flattened vs table-aware text.
+#
+#   python bench_tables.py --docs 30
+#   python bench_tables.py --folder path/to/real/schedules   (size only)
+# ─────────────────────────────────────────
+PLANS = ["Silver", "Gold", "Platinum", "Diamond", "Essential", "Supreme"]
+NAMES = ["Aarav Sharma", "Priya Iyer", "Rohan Patel", "Meera Nair", "Kavya Reddy"]
+AGE_BANDS = ["18-35", "36-45", "46-55", "56-65", "66-80"]
+SUB_LIMITS = ["Room rent", "ICU charges", "Cataract (per eye)", "Knee replacement",
+              "Ambulance", "AYUSH treatment", "Maternity", "Day care"]
+PROSE = ("The Company shall indemnify the Insured for medically necessary "
+         "expenses incurred during the Policy Period, subject to the terms, "
+         "conditions and exclusions of this Policy. ")
+
+
+def rupees(value):
+    # Indian grouping: 12,34,567
+    digits = str(value)
+    if len(digits) <= 3:
+        return digits
+    head, tail = digits[:-3], digits[-3:]
+    groups = []
+    while len(head) > 2:
+        groups.insert(0, head[-2:])
+        head = head[:-2]
+    groups.insert(0, head)
+    return ",".join(groups) + "," + tail
+
+
+def draw_table(page, rows, x0, y0, widths, row_height=18):
+    for r, row in enumerate(rows):
+        x = x0
+        for c, cell in enumerate(row):
+            page.insert_text((x + 4, y0 + r * row_height + 13), cell, fontsize=9)
+            x += widths[c]
+    total_width = sum(widths)
+    for r in range(len(rows) + 1):
+        y = y0 + r * row_height
+        page.draw_line((x0, y), (x0 + total_width, y))
+    x = x0
+    for width in [0] + widths:
+        x += width
+        page.draw_line((x, y0), (x, y0 + len(rows) * row_height))
+    return y0 + len(rows) * row_height
+
+
+def make_schedule(rng):
+    plans = rng.sample(PLANS, rng.randint(2, 4))
+    premium_rows = [["Plan", "Sum Insured", "Base Premium", "GST", "Total Premium"]]
+    for plan in plans:
+        sum_insured = rng.choice([3, 5, 7, 10, 15, 25, 50]) * 100000
+        base = rng.randint(60, 400) * 100
+        gst = base * 18 // 100
+        premium_rows.append([plan, rupees(sum_insured), rupees(base),
+                             rupees(gst), rupees(base + gst)])
+    limit_rows = [["Benefit", "Sub-limit", "Waiting Period"]]
+    for benefit in rng.sample(SUB_LIMITS, rng.randint(3, 6)):
+        limit_rows.append([benefit, f"Rs. {rupees(rng.randint(1, 100) * 1000)}",
+                           f"{rng.choice([0, 30, 90, 365, 730])} days"])
+    rate_rows = [["Age Band", "Premium"]] + [
+        [band, f"Rs. {rupees(rng.randint(40, 300) * 100)}"] for band in AGE_BANDS]
+    # The customer's own schedule — usually not the first plan listed
+    own = rng.choice(premium_rows[1:])
+    schedule_rows = [["Policyholder", rng.choice(NAMES)],
+                     ["Age", str(rng.randint(19, 79))],
+                     ["Plan", own[0]],
+                     ["Sum Insured", own[1]],
+                     ["Total Premium", own[4]]]
+
+    # Brochure-style documents put the plan comparison and rate chart
+    # before the customer's schedule
+    blocks = [(schedule_rows, [150, 200]), (premium_rows, [90, 100, 100, 80, 110]),
+              (rate_rows, [150, 150])]
+    if rng.random() < 0.5:
+        blocks.reverse()
+
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((50, 50), "SCHEDULE OF BENEFITS", fontsize=13)
+    page.insert_textbox(fitz.Rect(50, 60, 545, 110), PROSE * 2, fontsize=9)
+    y = 120
+    for rows, widths in blocks:
+        y = draw_table(page, rows, 50, y, widths) + 15
+    page.insert_textbox(fitz.Rect(50, y, 545, y + 50), PROSE, fontsize=9)
+    draw_table(page, limit_rows, 50, y + 60, [180, 140, 140])
+
+    truth = {
+        "tables": [schedule_rows, premium_rows, limit_rows, rate_rows],
+        "fields": {"current_premium": own[4],
+                   "current_sum_insured": own[1],
+                   "policyholder_age": schedule_rows[1][1]},
+    }
+    return doc, truth
+
+
+def cell_accuracy(true_rows, found_tables):
+    best = 0.0
+    total = sum(len(row) for row in true_rows)
+    for table in found_tables:
+        found = table["rows"]
+        correct = sum(
+            1
+            for r, row in enumerate(true_rows) if r < len(found)
+            for c, cell in enumerate(row) if c < len(found[r]) and found[r][c] == cell
+        )
+        best = max(best, correct / total)
+    return best
+
+
+def document_sizes(doc):
+    flat = "".join(page.get_text() for page in doc)
+    aware = "".join(page_text_with_tables(page)[0] for page in doc)
+    return len(flat), len(aware)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark table-aware PDF extraction")
+    parser.add_argument("--docs", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=3)
+    parser.add_argument("--folder", help="measure prompt size on real PDFs instead")
+    args = parser.parse_args()
+
+    flat_total = aware_total = 0
+    if args.folder:
+        for name in sorted(os.listdir(args.folder)):
+            if name.lower().endswith(".pdf"):
+                with fitz.open(os.path.join(args.folder, name)) as doc:
+                    flat, aware = document_sizes(doc)
+                flat_total += flat
+                aware_total += aware
+                print(f"{name:<40}{flat:>10,}{aware:>10,} chars")
+        if not flat_total:
+            sys.exit(f"No PDFs found in {args.folder}")
+    else:
+        rng = random.Random(args.seed)
+        cell_scores = []
+        field_hits = field_total = wrong_fills = 0
+        for _ in range(args.docs):
+            doc, truth = make_schedule(rng)
+            page = doc[0]
+            _, tables = page_text_with_tables(page)
+            for true_rows in truth["tables"]:
+                cell_scores.append(cell_accuracy(true_rows, tables))
+            fields = table_fields(tables)
+            for field, value in truth["fields"].items():
+                field_total += 1
+                field_hits += fields.get(field) == value
+                wrong_fills += field in fields and fields[field] != value
+            wrong_fills += "policy_type" in fields
+            flat, aware = document_sizes(doc)
+            flat_total += flat
+            aware_total += aware
+            doc.close()
+
+        print(f"documents             {args.docs}")
+        print(f"table cell accuracy   {sum(cell_scores) / len(cell_scores):.3f}")
+        print(f"field accuracy        {field_hits / field_total:.3f} "
+              f"(premium, sum insured, age from the schedule)")
+        print(f"wrong fields filled   {wrong_fills} (values from plan or rate-chart rows)")
+
+    print(f"flattened text        {flat_total:,} chars (~{flat_total // 4:,} tokens)")
+    print(f"table-aware text      {aware_total:,} chars (~{aware_total // 4:,} tokens)")
+    if flat_total:
+        print(f"prompt size change    {100.0 * (aware_total - flat_total) / flat_total:+.1f}%")
+
+
+if __name__ == "__main__":
+    main()
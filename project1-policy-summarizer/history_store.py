@@ -0,0 +1,367 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import threading
+
+from reco_cache import parse_rupees
+
+
+# ─────────────────────────────────────────
+# ANALYSIS HISTORY — SQLite + FTS5
+# Every analyzed policy, its summary, extracted fields, recommendations and
+# quotes are kept on disk so past analyses reopen without new LLM calls.
+# Structured filters (insurer, policy type, sum insured) use B-tree indexes;
+# free text goes through an FTS5 index over summary, insurer, type and a
+# policy excerpt.
+# Rows belong to the browser or signed-in user that saved them (`owner`)
+# and reads are scoped to that owner; owner=None reads every row, for
+# operator deployments that set POLICYLENS_HISTORY_SHARED=1. Rows not
+# updated for RETENTION_DAYS are pruned, so analyses of owners who never
+# come back do not pile up.
+# ─────────────────────────────────────────
+HISTORY_DB = os.getenv("POLICYLENS_HISTORY_DB", "policylens_history.db")
+HISTORY_SHARED = os.getenv("POLICYLENS_HISTORY_SHARED", "0") == "1"
+RETENTION_DAYS = float(os.getenv("POLICYLENS_HISTORY_RETENTION_DAYS", 180))
+PRUNE_EVERY_SECONDS = 60 * 60
+EXCERPT_CHARS = 20000
+
+KNOWN_INSURERS = [
+    "Star Health", "HDFC Ergo", "Niva Bupa", "Max Bupa", "Care Health",
+    "Religare", "Bajaj Allianz", "ICICI Lombard", "Tata AIG",
+    "Aditya Birla Health", "New India Assurance", "United India",
+    "National Insurance", "Oriental Insurance", "SBI General", "SBI Life",
+    "Reliance General", "Digit", "Acko", "ManipalCigna", "Future Generali",
+    "Kotak Mahindra", "IFFCO Tokio", "Cholamandalam", "Royal Sundaram",
+    "LIC", "HDFC Life", "ICICI Prudential", "Max Life", "Tata AIA",
+]
+POLICY_TYPE_KEYWORDS = {
+    "Health": ["health", "hospitalisation", "hospitalization", "mediclaim"],
+    "Life": ["life insurance", "term plan", "sum assured", "death benefit"],
+    "Vehicle": ["motor", "vehicle", "car insurance", "two wheeler", "own damage"],
+    "Home": ["home insurance", "householder", "dwelling", "building and contents"],
+}
+
+ANALYSES_TABLE = """
+CREATE TABLE IF NOT EXISTS {name} (
+    id INTEGER PRIMARY KEY,
+    owner TEXT NOT NULL DEFAULT '',
+    content_hash TEXT NOT NULL,
+    created REAL NOT NULL,
+    updated REAL NOT NULL,
+    insurer TEXT,
+    policy_type TEXT,
+    sum_insured TEXT,
+    sum_insured_rupees REAL,
+    premium TEXT,
+    summary TEXT NOT NULL,
+    extracted TEXT,
+    recommendations TEXT,
+    quotes TEXT NOT NULL DEFAULT '[]',
+    UNIQUE(owner, content_hash)
+);
+"""
+
+SCHEMA = ANALYSES_TABLE.format(name="analyses") + """
+CREATE INDEX IF NOT EXISTS idx_analyses_insurer
+    ON analyses(insurer, policy_type, sum_insured_rupees);
+CREATE INDEX IF NOT EXISTS idx_analyses_type
+    ON analyses(policy_type, sum_insured_rupees);
+CREATE INDEX IF NOT EXISTS idx_analyses_sum ON analyses(sum_insured_rupees);
+CREATE INDEX IF NOT EXISTS idx_analyses_owner ON analyses(owner, id);
+
+-- Full policy text lives apart so analyses rows stay a few KB and
+-- filter scans touch as few pages as possible
+CREATE TABLE IF NOT EXISTS analysis_texts (
+    id INTEGER PRIMARY KEY REFERENCES analyses(id) ON DELETE CASCADE,
+    policy_text TEXT NOT NULL
+);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS analyses_fts USING fts5(
+    owner, summary, insurer, policy_type, policy_excerpt, prefix='2 3'
+);
+"""
+
+LIST_COLUMNS = ("a.id, a.created, a.updated, a.insurer, a.policy_type, "
+                "a.sum_insured, a.premium, substr(a.summary, 1, 240) AS preview")
+
+
+def detect_insurer(text):
+    head = text[:5000].lower()
+    for name in KNOWN_INSURERS:
+        if name.lower() in head:
+            return name
+    return None
+
+
+def detect_policy_type(text):
+    head = text[:5000].lower()
+    scores = {kind: sum(head.count(word) for word in words)
+              for kind, words in POLICY_TYPE_KEYWORDS.items()}
+    best = max(scores, key=scores.get)
+    return best if scores[best] else None
+
+
+def _fts_query(text, owner=None):
+    # Quote each word so user input cannot break FTS5 syntax; only the last
+    # word is prefix-matched (search-as-you-type) since short prefixes
+    # expand to many terms
+    words = re.findall(r"\w+", text)
+    if not words:
+        return None
+    query = " ".join(f'"{word}"' for word in words[:-1]) + f' "{words[-1]}"*'
+    if owner is None:
+        return query
+    # The owner term keeps FTS5 on one session's short doclist instead of
+    # walking every session's matches
+    owner = owner.replace('"', '""')
+    return (f'owner : "{owner}" AND '
+            f'{{summary insurer policy_type policy_excerpt}} : ({query})')
+
+
+class HistoryStore:
+
+    def __init__(self, path=HISTORY_DB, retention_days=RETENTION_DAYS):
+        self.path = path
+        self.retention_seconds = retention_days * 24 * 3600
+        self._local = threading.local()
+        self._last_prune = None
+        conn = self._conn()
+        migrated = self._add_owner_column(conn)
+        conn.executescript(SCHEMA)
+        try:
+            conn.executescript(FTS_SCHEMA)
+            self.has_fts = True
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5 — fall back to LIKE search
+            self.has_fts = False
+        if migrated:
+            with conn:
+                for (analysis_id,) in conn.execute("SELECT id FROM analyses").fetchall():
+                    self._index(conn, analysis_id)
+        conn.commit()
+        self._maybe_prune()
+
+    def _conn(self):
+        # One connection per thread; WAL lets readers run during a write
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    def _add_owner_column(self, conn):
+        # Stores from before rows had an owner: rebuild the table keyed on
+        # (owner, content_hash) and the FTS index with an owner column. Old
+        # rows get owner '' and are only listed in the shared view.
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(analyses)")]
+        if not columns or "owner" in columns:
+            return False
+        copied = ", ".join(columns)
+        # Off so dropping the old table does not cascade to analysis_texts
+        conn.execute("PRAGMA foreign_keys=OFF")
+        conn.executescript(
+            "BEGIN;"
+            + ANALYSES_TABLE.format(name="analyses_owned")
+            + f"INSERT INTO analyses_owned ({copied}) SELECT {copied} FROM analyses;"
+            "DROP TABLE analyses;"
+            "ALTER TABLE analyses_owned RENAME TO analyses;"
+            "DROP TABLE IF EXISTS analyses_fts;"
+            "COMMIT;")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return True
+
+    def _index(self, conn, analysis_id, policy_text=None):
+        if not self.has_fts:
+            return
+        row = conn.execute("SELECT owner, summary, insurer, policy_type FROM analyses "
+                           "WHERE id = ?", (analysis_id,)).fetchone()
+        if policy_text is None:
+            policy_text = conn.execute(
+                "SELECT policy_text FROM analysis_texts WHERE id = ?",
+                (analysis_id,)).fetchone()[0]
+        conn.execute("DELETE FROM analyses_fts WHERE rowid = ?", (analysis_id,))
+        conn.execute(
+            "INSERT INTO analyses_fts(rowid, owner, summary, insurer, policy_type, "
+            "policy_excerpt) VALUES (?, ?, ?, ?, ?, ?)",
+            (analysis_id, row["owner"], row["summary"], row["insurer"],
+             row["policy_type"], policy_text[:EXCERPT_CHARS]))
+
+    # ── writes ──
+    def save_analysis(self, content_hash, policy_text, summary, fields=None, owner=""):
+        fields = fields or {}
+        sum_insured = fields.get("current_sum_insured")
+        now = time.time()
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                """INSERT INTO analyses (owner, content_hash, created, updated,
+                       insurer, policy_type, sum_insured, sum_insured_rupees,
+                       premium, summary, extracted)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(owner, content_hash) DO UPDATE SET
+                       updated = excluded.updated,
+                       summary = excluded.summary""",
+                (owner, content_hash, now, now, detect_insurer(policy_text),
+                 fields.get("policy_type") or detect_policy_type(policy_text),
+                 sum_insured, parse_rupees(sum_insured) if sum_insured else None,
+                 fields.get("current_premium"), summary,
+                 json.dumps(fields) if fields else None))
+            analysis_id = conn.execute(
+                "SELECT id FROM analyses WHERE owner = ? AND content_hash = ?",
+                (owner, content_hash)).fetchone()[0]
+            conn.execute("INSERT OR REPLACE INTO analysis_texts (id, policy_text) "
+                         "VALUES (?, ?)", (analysis_id, policy_text))
+            self._index(conn, analysis_id, policy_text)
+        self._maybe_prune()
+        return analysis_id
+
+    def prune(self, max_age_seconds=None):
+        # Delete analyses not updated within the retention window; their
+        # texts go with them (ON DELETE CASCADE). 0 keeps everything.
+        max_age_seconds = max_age_seconds or self.retention_seconds
+        if not max_age_seconds:
+            return 0
+        cutoff = time.time() - max_age_seconds
+        self._last_prune = time.monotonic()
+        conn = self._conn()
+        with conn:
+            if self.has_fts:
+                conn.execute("DELETE FROM analyses_fts WHERE rowid IN "
+                             "(SELECT id FROM analyses WHERE updated < ?)", (cutoff,))
+            return conn.execute("DELETE FROM analyses WHERE updated < ?",
+                                (cutoff,)).rowcount
+
+    def _maybe_prune(self):
+        if self._last_prune is None or \
+                time.monotonic() - self._last_prune > PRUNE_EVERY_SECONDS:
+            self.prune()
+
+    def save_recommendations(self, analysis_id, reco):
+        extracted = reco.get("extracted", {})
+        sum_insured = extracted.get("current_sum_insured")
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                """UPDATE analyses SET
+                       updated = ?,
+                       recommendations = ?,
+                       extracted = ?,
+                       policy_type = COALESCE(?, policy_type),
+                       sum_insured = COALESCE(?, sum_insured),
+                       sum_insured_rupees = COALESCE(?, sum_insured_rupees),
+                       premium = COALESCE(?, premium)
+                   WHERE id = ?""",
+                (time.time(), json.dumps(reco), json.dumps(extracted),
+                 extracted.get("policy_type") or None,
+                 sum_insured or None,
+                 parse_rupees(sum_insured) if sum_insured else None,
+                 extracted.get("current_premium") or None,
+                 analysis_id))
+            if extracted.get("policy_type"):
+                self._index(conn, analysis_id)
+
+    def add_quote(self, analysis_id, insurer, quote_text):
+        conn = self._conn()
+        with conn:
+            row = conn.execute("SELECT quotes FROM analyses WHERE id = ?",
+                               (analysis_id,)).fetchone()
+            if row is None:
+                return
+            quotes = json.loads(row["quotes"])
+            quotes.append({"insurer": insurer, "quote": quote_text,
+                           "created": time.time()})
+            conn.execute("UPDATE analyses SET quotes = ?, updated = ? WHERE id = ?",
+                         (json.dumps(quotes), time.time(), analysis_id))
+
+    # ── reads ──
+    def _decode(self, row):
+        record = dict(row)
+        for column in ("extracted", "recommendations", "quotes"):
+            if record.get(column):
+                record[column] = json.loads(record[column])
+        return record
+
+    def _fetch(self, where, value, owner):
+        sql = (f"SELECT a.*, t.policy_text FROM analyses a "
+               f"LEFT JOIN analysis_texts t ON t.id = a.id WHERE {where} = ?")
+        params = [value]
+        if owner is not None:
+            sql += " AND a.owner = ?"
+            params.append(owner)
+        row = self._conn().execute(sql, params).fetchone()
+        return self._decode(row) if row else None
+
+    def get(self, analysis_id, owner=None):
+        return self._fetch("a.id", analysis_id, owner)
+
+    def find_by_hash(self, content_hash, owner=None):
+        return self._fetch("a.content_hash", content_hash, owner)
+
+    def search(self, text=None, insurer=None, policy_type=None,
+               min_sum=None, max_sum=None, owner=None, limit=20):
+        where = []
+        params = []
+        if owner is not None:
+            where.append("a.owner = ?")
+            params.append(owner)
+        if insurer:
+            where.append("a.insurer = ?")
+            params.append(insurer)
+        if policy_type:
+            where.append("a.policy_type = ?")
+            params.append(policy_type)
+        if min_sum is not None:
+            where.append("a.sum_insured_rupees >= ?")
+            params.append(min_sum)
+        if max_sum is not None:
+            where.append("a.sum_insured_rupees <= ?")
+            params.append(max_sum)
+
+        query = text and _fts_query(text, owner)
+        if query and self.has_fts:
+            sql = (f"SELECT {LIST_COLUMNS} FROM analyses_fts "
+                   f"JOIN analyses a ON a.id = analyses_fts.rowid "
+                   f"WHERE analyses_fts MATCH ?")
+            params.insert(0, query)
+            # Newest first: FTS5 walks its doclists in rowid order and stops
+            # at LIMIT, where bm25 ranking would score every match
+            order = "ORDER BY analyses_fts.rowid DESC"
+        else:
+            # One session's rows are few; without the hint SQLite picks the
+            # filter indexes and scans every session's matches
+            hint = "INDEXED BY idx_analyses_owner" if owner is not None else ""
+            sql = f"SELECT {LIST_COLUMNS} FROM analyses a {hint} WHERE 1=1"
+            order = "ORDER BY a.id DESC"
+            if query:
+                where.append("a.summary LIKE ?")
+                params.append(f"%{text}%")
+        if where:
+            sql += " AND " + " AND ".join(where)
+        sql += f" {order} LIMIT ?"
+        params.append(limit)
+        return [dict(row) for row in self._conn().execute(sql, params)]
+
+    def facets(self, owner=None):
+        scope, params = ("AND owner = ?", (owner,)) if owner is not None else ("", ())
+        conn = self._conn()
+        insurers = [r[0] for r in conn.execute(
+            f"SELECT DISTINCT insurer FROM analyses WHERE insurer IS NOT NULL {scope} "
+            f"ORDER BY insurer", params)]
+        types = [r[0] for r in conn.execute(
+            f"SELECT DISTINCT policy_type FROM analyses WHERE policy_type IS NOT NULL {scope} "
+            f"ORDER BY policy_type", params)]
+        return insurers, types
+
+    def count(self, owner=None):
+        if owner is None:
+            return self._conn().execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
+        return self._conn().execute("SELECT COUNT(*) FROM analyses WHERE owner = ?",
+                                    (owner,)).fetchone()[0]
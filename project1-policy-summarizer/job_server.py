@@ -0,0 +1,433 @@
+import os
+import json
+import math
+import time
+import uuid
+import hashlib
+import argparse
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+
+# ─────────────────────────────────────────
+# POLICYLENS JOB SERVER
+# HTTP API for partner apps and the agent portal. Every endpoint submits an
+# async job to a pool of worker processes that run the same policy_engine
+# functions as the Streamlit page.
+#
+#   POST /jobs/analyze        JSON {"policy_text"} or a raw application/pdf body
+#   POST /jobs/alternatives   JSON {"policy_text"}
+#   POST /jobs/quote          JSON {"insurer", "extracted"}
+#   POST /jobs/pdf            JSON {"text", "title"}
+#   POST /jobs/renewal        JSON {"old_text", "new_text"}
+#   GET  /jobs/<id>           status and result (?wait=<seconds> long-polls)
+#   GET  /jobs/<id>/events    server-sent events until the job finishes
+#   GET  /jobs/<id>/pdf       PDF produced by analyze / quote / pdf jobs
+#   GET  /health              worker and queue counters
+#
+# Submissions get 503 + Retry-After once queued + running jobs reach
+# workers + queue size. Scale by raising --workers or running more servers
+# behind a load balancer.
+#
+# LLM admission limits and POLICYLENS_USER_TOKEN_BUDGET apply per caller:
+# partners send an X-API-Key header, anything else counts by client address.
+#
+#   python job_server.py --port 8600 --workers 4 --queue 32
+#   POLICYLENS_LLM_STUB=1 python job_server.py   (no Groq calls)
+# ─────────────────────────────────────────
+JOB_KINDS = ("analyze", "alternatives", "quote", "pdf", "renewal")
+JOB_TTL_SECONDS = 15 * 60
+MAX_WAIT_SECONDS = 60
+MAX_JSON_BYTES = 10 * 1024 * 1024
+
+
+# ─────────────────────────────────────────
+# WORKER SIDE — runs in the pool processes
+# ─────────────────────────────────────────
+def run_job(kind, payload, client="job-api"):
+    import admission
+    import policy_engine as engine
+
+    # Pool processes are shared by every caller — bind this job's caller
+    admission.set_user(client)
+
+    if kind == "analyze":
+        text = payload.get("policy_text", "")
+        pdf_path = payload.get("pdf_path")
+        if pdf_path:
+            try:
+                text = engine.extract_text_from_path(pdf_path)
+            finally:
+                os.remove(pdf_path)
+        is_valid, reason = engine.validate_policy_text(text)
+        if not is_valid:
+            return {"valid": False, "reason": reason}
+        summary = engine.summarize_with_reuse(text)
+        return {
+            "valid": True,
+            "summary": summary,
+            "pdf": engine.create_summary_pdf(summary),
+        }
+
+    if kind == "alternatives":
+        return engine.recommend_alternatives(payload.get("policy_text", ""))
+
+    if kind == "quote":
+        insurer = payload.get("insurer", "")
+        quote_text = engine.generate_quote(insurer, payload.get("extracted", {}))
+        return {
+            "insurer": insurer,
+            "quote": quote_text,
+            "pdf": engine.create_summary_pdf(quote_text, f"Quote — {insurer}"),
+        }
+
+    if kind == "pdf":
+        return {"pdf": engine.create_summary_pdf(
+            payload.get("text", ""),
+            payload.get("title", "Insurance Policy Summary"))}
+
+    if kind == "renewal":
+        diff, explanation = engine.explain_renewal(payload.get("old_text", ""),
+                                                   payload.get("new_text", ""))
+        return {"diff": diff, "explanation": explanation}
+
+    raise ValueError(f"Unknown job kind: {kind}")
+
+
+# ─────────────────────────────────────────
+# JOB QUEUE — bounded, in the server process
+# ─────────────────────────────────────────
+class QueueFull(Exception):
+    pass
+
+
+class Job:
+
+    def __init__(self, kind, key=None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.key = key
+        self.status = "queued"
+        self.result = None
+        self.pdf = None
+        self.error = None
+        self.created = time.time()
+        self.finished = None
+        self.done = threading.Event()
+
+    def to_dict(self):
+        data = {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "created": self.created,
+            "finished": self.finished,
+        }
+        if self.status == "done":
+            data["result"] = self.result
+            if self.pdf is not None:
+                data["pdf_url"] = f"/jobs/{self.id}/pdf"
+        if self.status == "failed":
+            data["error"] = self.error
+        return data
+
+
+class JobQueue:
+
+    def __init__(self, workers, queue_size):
+        self.workers = workers
+        self.capacity = workers + queue_size
+        self._pool = ProcessPoolExecutor(max_workers=workers)
+        self._pool_lock = threading.Lock()
+        self._jobs = {}
+        self._in_flight = {}
+        self._active = 0
+        self._lock = threading.Lock()
+        self._counters = {"submitted": 0, "rejected": 0, "coalesced": 0,
+                          "done": 0, "failed": 0, "pool_restarts": 0}
+
+    def submit(self, kind, payload, client="job-api"):
+        # Identical requests in flight from one caller share one job
+        # (single-flight) — worker processes cannot see each other's
+        # in-memory coalescing. Callers are kept apart so nobody's job runs
+        # on, or fails with, another caller's token budget.
+        key = (kind, client, payload.get("content_hash") or hashlib.sha256(
+            json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest())
+        with self._lock:
+            running = self._in_flight.get(key)
+            if running is not None:
+                self._counters["coalesced"] += 1
+                if "pdf_path" in payload:
+                    os.remove(payload["pdf_path"])
+                return running
+            if self._active >= self.capacity:
+                self._counters["rejected"] += 1
+                raise QueueFull()
+            self._active += 1
+            self._counters["submitted"] += 1
+            job = Job(kind, key)
+            self._jobs[job.id] = job
+            self._in_flight[key] = job
+        self._sweep()
+
+        try:
+            future = self._submit_to_pool(kind, payload, client)
+        except Exception as e:
+            # Release the slot and the key, and fail the job for any
+            # request that coalesced onto it in the meantime
+            job.error = str(e) or type(e).__name__
+            job.status = "failed"
+            job.finished = time.time()
+            self._release(job)
+            job.done.set()
+            raise
+        future.add_done_callback(lambda f: self._finish(job, f))
+        return job
+
+    def _submit_to_pool(self, kind, payload, client):
+        pool = self._pool
+        try:
+            return pool.submit(run_job, kind, payload, client)
+        except BrokenProcessPool:
+            # A worker died (crash, OOM kill) — replace the pool once
+            with self._pool_lock:
+                if self._pool is pool:
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers)
+                    self._counters["pool_restarts"] += 1
+            return self._pool.submit(run_job, kind, payload, client)
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "capacity": self.capacity,
+                "active": self._active,
+                "stored_jobs": len(self._jobs),
+                **self._counters,
+            }
+
+    def shutdown(self):
+        with self._pool_lock:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _finish(self, job, future):
+        try:
+            result = future.result()
+            if isinstance(result, dict) and "pdf" in result:
+                job.pdf = result.pop("pdf")
+            job.result = result
+            job.status = "done"
+        except Exception as e:
+            job.error = str(e)
+            job.status = "failed"
+        job.finished = time.time()
+        self._release(job)
+        job.done.set()
+
+    def _release(self, job):
+        with self._lock:
+            if self._in_flight.get(job.key) is job:
+                del self._in_flight[job.key]
+            self._active -= 1
+            self._counters[job.status] += 1
+
+    def _sweep(self):
+        cutoff = time.time() - JOB_TTL_SECONDS
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items()
+                       if job.finished is not None and job.finished < cutoff]
+            for job_id in expired:
+                del self._jobs[job_id]
+
+
+# ─────────────────────────────────────────
+# HTTP HANDLER
+# ─────────────────────────────────────────
+class _BodyReader:
+    # Reads at most `remaining` bytes from the request stream
+    def __init__(self, stream, length):
+        self.stream = stream
+        self.remaining = length
+        self.size = length
+
+    def read(self, n):
+        n = min(n, self.remaining)
+        if n <= 0:
+            return b""
+        chunk = self.stream.read(n)
+        self.remaining -= len(chunk)
+        return chunk
+
+
+class JobHandler(BaseHTTPRequestHandler):
+    server_version = "PolicyLensJobs/1.0"
+    jobs = None
+
+    # ── responses ──
+    def _send_json(self, status, data, headers=None):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status, message, headers=None):
+        self._send_json(status, {"error": message}, headers)
+
+    def log_message(self, format, *args):
+        if os.getenv("POLICYLENS_JOB_SERVER_LOG") == "1":
+            super().log_message(format, *args)
+
+    # ── POST /jobs/<kind> ──
+    def do_POST(self):
+        parts = urlparse(self.path).path.strip("/").split("/")
+        if len(parts) != 2 or parts[0] != "jobs" or parts[1] not in JOB_KINDS:
+            return self._error(404, "Unknown endpoint")
+        kind = parts[1]
+
+        content_type = self.headers.get("Content-Type", "")
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            return self._error(400, "Invalid Content-Length")
+        try:
+            if kind == "analyze" and content_type.startswith("application/pdf"):
+                payload = self._spool_pdf(length)
+            else:
+                if length > MAX_JSON_BYTES:
+                    return self._error(413, "Request body too large")
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                if not isinstance(payload, dict):
+                    raise ValueError("Request body must be a JSON object")
+        except ValueError as e:
+            return self._error(400, str(e))
+
+        try:
+            job = self.jobs.submit(kind, payload, self._client_id())
+        except QueueFull:
+            if "pdf_path" in payload:
+                os.remove(payload["pdf_path"])
+            return self._error(503, "Server busy, retry later",
+                               {"Retry-After": "2"})
+        except Exception:
+            if "pdf_path" in payload and os.path.exists(payload["pdf_path"]):
+                os.remove(payload["pdf_path"])
+            return self._error(503, "Workers unavailable, retry later",
+                               {"Retry-After": "2"})
+        self._send_json(202, job.to_dict(), {"Location": f"/jobs/{job.id}"})
+
+    def _client_id(self):
+        # Only a digest of the API key is kept, it never reaches the workers
+        api_key = self.headers.get("X-API-Key")
+        if api_key:
+            return "api:" + hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+        return "ip:" + self.client_address[0]
+
+    def _spool_pdf(self, length):
+        from policy_engine import spool_upload
+        reader = _BodyReader(self.rfile, length)
+        path, content_hash = spool_upload(reader)
+        return {"pdf_path": path, "content_hash": content_hash}
+
+    # ── GET ──
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = url.path.strip("/").split("/")
+
+        if parts == ["health"]:
+            return self._send_json(200, self.jobs.stats())
+        if len(parts) < 2 or parts[0] != "jobs":
+            return self._error(404, "Unknown endpoint")
+
+        job = self.jobs.get(parts[1])
+        if job is None:
+            return self._error(404, "Unknown job")
+
+        if len(parts) == 2:
+            try:
+                wait = float(parse_qs(url.query).get("wait", ["0"])[0])
+            except ValueError:
+                wait = math.nan
+            if not math.isfinite(wait):
+                return self._error(400, "wait must be a number of seconds")
+            job.done.wait(min(max(wait, 0), MAX_WAIT_SECONDS))
+            return self._send_json(200, job.to_dict())
+        if parts[2] == "events":
+            return self._stream_events(job)
+        if parts[2] == "pdf":
+            if job.pdf is None:
+                return self._error(404, "No PDF for this job (yet)")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/pdf")
+            self.send_header("Content-Length", str(len(job.pdf)))
+            self.send_header("ETag", hashlib.sha256(job.pdf).hexdigest()[:16])
+            self.end_headers()
+            self.wfile.write(job.pdf)
+            return
+        return self._error(404, "Unknown endpoint")
+
+    def _stream_events(self, job):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        self._event(job)
+        # Heartbeat comments keep proxies from closing the stream
+        while not job.done.wait(15):
+            self.wfile.write(b": keep-alive\n\n")
+            self.wfile.flush()
+        self._event(job)
+
+    def _event(self, job):
+        line = "data: " + json.dumps(job.to_dict()) + "\n\n"
+        self.wfile.write(line.encode("utf-8"))
+        self.wfile.flush()
+
+
+def make_server(host="127.0.0.1", port=8600, workers=2, queue_size=16):
+    handler = type("BoundJobHandler", (JobHandler,),
+                   {"jobs": JobQueue(workers, queue_size)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PolicyLens async job server")
+    parser.add_argument("--host", default=os.getenv("POLICYLENS_JOB_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("POLICYLENS_JOB_PORT", 8600)))
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--queue", type=int, default=32,
+                        help="jobs allowed to wait beyond the busy workers")
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, args.workers, args.queue)
+    print(f"PolicyLens job server on http://{args.host}:{args.port} "
+          f"({args.workers} workers, queue {args.queue})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.RequestHandlerClass.jobs.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
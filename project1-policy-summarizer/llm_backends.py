@@ -0,0 +1,118 @@
+import os
+import json
+import threading
+import urllib.error
+import urllib.request
+from types import SimpleNamespace
+
+
+# ─────────────────────────────────────────
+# LLM BACKENDS
+# Every backend exposes the Groq SDK shape, client.chat.completions.create,
+# so the router can send any task to any of them:
+#   groq  — Groq cloud (GROQ_API_KEY)
+#   local — any OpenAI-compatible server, e.g. llama.cpp's llama-server,
+#           at POLICYLENS_LOCAL_URL; runs air-gapped on CPU
+#   stub  — canned answers for offline runs (POLICYLENS_LLM_STUB=1)
+# ─────────────────────────────────────────
+LOCAL_URL = os.getenv("POLICYLENS_LOCAL_URL", "http://127.0.0.1:8080/v1")
+LOCAL_MODEL = os.getenv("POLICYLENS_LOCAL_MODEL", "")
+LOCAL_SLOTS = int(os.getenv("POLICYLENS_LOCAL_SLOTS", "4"))
+LOCAL_TIMEOUT = float(os.getenv("POLICYLENS_LOCAL_TIMEOUT", "120"))
+
+# Request fields passed through to an OpenAI-compatible server
+_PASSTHROUGH = ("temperature", "max_tokens", "top_p", "stop", "seed",
+                "response_format")
+
+
+class LocalBackendError(RuntimeError):
+    pass
+
+
+def _response(data):
+    choices = [SimpleNamespace(message=SimpleNamespace(
+        content=choice["message"].get("content") or ""))
+        for choice in data.get("choices", [])]
+    usage = data.get("usage") or {}
+    return SimpleNamespace(choices=choices, usage=SimpleNamespace(
+        prompt_tokens=usage.get("prompt_tokens", 0),
+        completion_tokens=usage.get("completion_tokens", 0),
+        total_tokens=usage.get("total_tokens", 0),
+    ))
+
+
+# llama-server batches concurrent requests across its parallel slots
+# (--parallel N, continuous batching), so up to `slots` requests are sent at
+# once to fill a batch; further callers wait here for a free slot instead of
+# queueing inside the server.
+class OpenAICompatClient:
+
+    def __init__(self, base_url=LOCAL_URL, model=LOCAL_MODEL, api_key=None,
+                 slots=LOCAL_SLOTS, timeout=LOCAL_TIMEOUT):
+        self.base_url = base_url.rstrip("/")
+        # llama-server serves one model and ignores the name; other servers
+        # (vLLM, Ollama) need it, so it replaces the router's Groq model
+        self.model_override = model or None
+        self.api_key = api_key or os.getenv("POLICYLENS_LOCAL_API_KEY")
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(slots)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages, **kwargs):
+        body = {"model": self.model_override or model, "messages": messages}
+        body.update({key: kwargs[key] for key in _PASSTHROUGH if key in kwargs})
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        request = urllib.request.Request(
+            f"{self.base_url}/chat/completions",
+            data=json.dumps(body).encode("utf-8"),
+            headers=headers,
+        )
+        with self._slots:
+            try:
+                with urllib.request.urlopen(request, timeout=self.timeout) as reply:
+                    data = json.load(reply)
+            except urllib.error.HTTPError as e:
+                raise LocalBackendError(
+                    f"Local LLM server returned {e.code}: {e.read()[:200]!r}")
+            except (urllib.error.URLError, TimeoutError) as e:
+                raise LocalBackendError(
+                    f"Local LLM server at {self.base_url} is not reachable: {e}")
+        return _response(data)
+
+
+# ─────────────────────────────────────────
+# REGISTRY — one client per backend, built on first use
+# ─────────────────────────────────────────
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def default_backend():
+    if os.getenv("POLICYLENS_LLM_STUB") == "1":
+        return "stub"
+    return os.getenv("POLICYLENS_BACKEND", "groq")
+
+
+def _build(name):
+    if name == "stub":
+        from llm_stub import StubClient
+        return StubClient()
+    if name == "local":
+        return OpenAICompatClient()
+    if name == "groq":
+        from groq import Groq
+        return Groq(api_key=os.getenv("GROQ_API_KEY"))
+    raise ValueError(f"Unknown LLM backend: {name}")
+
+
+def get_backend(name=None):
+    name = name or default_backend()
+    client = _backends.get(name)
+    if client is None:
+        with _backends_lock:
+            client = _backends.get(name)
+            if client is None:
+                client = _backends[name] = _build(name)
+    return client
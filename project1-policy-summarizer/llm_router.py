@@ -0,0 +1,165 @@
+import os
+import time
+import threading
+
+import admission
+import llm_backends
+
+
+# ─────────────────────────────────────────
+# MODEL TIERS
+# ─────────────────────────────────────────
+SMALL_MODEL = os.getenv("POLICYLENS_SMALL_MODEL", "llama-3.1-8b-instant")
+LARGE_MODEL = os.getenv("POLICYLENS_LARGE_MODEL", "llama-3.3-70b-versatile")
+
+# Cheap, well-structured tasks start on the small model and escalate to the
+# large one only when their output check fails. The summary and both kinds
+# of recommendation (alternatives to an uploaded policy, picks for a chat
+# profile) always go to the large model — ranking insurers is advice, not
+# field extraction.
+TASK_MODELS = {
+    "validation": SMALL_MODEL,
+    "alternatives": LARGE_MODEL,
+    "chat": SMALL_MODEL,
+    "quote": SMALL_MODEL,
+    "patch": SMALL_MODEL,
+    "recommendation": LARGE_MODEL,
+    "summary": LARGE_MODEL,
+    "renewal": LARGE_MODEL,
+}
+
+# Per-task override, e.g. POLICYLENS_MODEL_QUOTE=llama-3.3-70b-versatile
+for _task in TASK_MODELS:
+    _override = os.getenv(f"POLICYLENS_MODEL_{_task.upper()}")
+    if _override:
+        TASK_MODELS[_task] = _override
+
+
+def model_for(task):
+    return TASK_MODELS.get(task, LARGE_MODEL)
+
+
+def set_task_model(task, model):
+    TASK_MODELS[task] = model
+
+
+# ─────────────────────────────────────────
+# BACKENDS — per task, e.g. POLICYLENS_BACKEND_VALIDATION=local sends
+# validation to the local OpenAI-compatible server while everything else
+# stays on the default backend. Escalations go to the default backend.
+# ─────────────────────────────────────────
+TASK_BACKENDS = {}
+for _task in TASK_MODELS:
+    _backend = os.getenv(f"POLICYLENS_BACKEND_{_task.upper()}")
+    if _backend:
+        TASK_BACKENDS[_task] = _backend
+
+
+def backend_for(task):
+    return TASK_BACKENDS.get(task)
+
+
+def set_task_backend(task, backend):
+    if backend:
+        TASK_BACKENDS[task] = backend
+    else:
+        TASK_BACKENDS.pop(task, None)
+
+
+# ─────────────────────────────────────────
+# STATS — latency and tokens per task/model
+# ─────────────────────────────────────────
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def _record(task, model, seconds, usage, escalated=False):
+    prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+    completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+    with _stats_lock:
+        task_stats = _stats.setdefault(task, {
+            "calls": 0,
+            "escalations": 0,
+            "latency_s": 0.0,
+            "models": {},
+        })
+        task_stats["calls"] += 1
+        task_stats["latency_s"] += seconds
+        if escalated:
+            task_stats["escalations"] += 1
+        model_stats = task_stats["models"].setdefault(model, {
+            "calls": 0,
+            "latency_s": 0.0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+        })
+        model_stats["calls"] += 1
+        model_stats["latency_s"] += seconds
+        model_stats["prompt_tokens"] += prompt_tokens
+        model_stats["completion_tokens"] += completion_tokens
+
+
+def get_stats():
+    with _stats_lock:
+        return {
+            task: {
+                **values,
+                "models": {m: dict(v) for m, v in values["models"].items()},
+            }
+            for task, values in _stats.items()
+        }
+
+
+def reset_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+# ─────────────────────────────────────────
+# ROUTED COMPLETION
+# ─────────────────────────────────────────
+def _complete(client, task, model, messages, escalated=False, **kwargs):
+    estimate = admission.estimate_tokens(messages, kwargs.get("max_tokens"))
+    # Raises admission.Busy instead of queueing without bound
+    with admission.controller.admit(estimate=estimate) as ticket:
+        start = time.perf_counter()
+        response = client.chat.completions.create(
+            model=model,
+            messages=messages,
+            **kwargs
+        )
+        usage = getattr(response, "usage", None)
+        ticket["tokens"] = getattr(usage, "total_tokens", None) or estimate
+    _record(task, model, time.perf_counter() - start, usage, escalated)
+    return response.choices[0].message.content
+
+
+def route_completion(client, task, messages, check=None, **kwargs):
+    task_client = client
+    if backend_for(task):
+        task_client = llm_backends.get_backend(backend_for(task))
+    model = getattr(task_client, "model_override", None) or model_for(task)
+    try:
+        content = _complete(task_client, task, model, messages, **kwargs)
+    except llm_backends.LocalBackendError:
+        if task_client is client:
+            raise
+        # Local server down — the default backend answers instead
+        task_client, model = client, model_for(task)
+        content = _complete(client, task, model, messages, **kwargs)
+
+    # Escalate once to the default backend's large model if the cheap
+    # answer fails its check (never to the model that just answered)
+    large_model = getattr(client, "model_override", None) or LARGE_MODEL
+    if check is not None and (task_client, model) != (client, large_model):
+        try:
+            passed = check(content)
+        except Exception:
+            passed = False
+        if not passed:
+            try:
+                content = _complete(client, task, large_model, messages,
+                                    escalated=True, **kwargs)
+            except admission.Busy:
+                pass    # saturated — the cheap answer beats no answer
+    return content
@@ -0,0 +1,148 @@
+import os
+import json
+import time
+import random
+
+
+# ─────────────────────────────────────────
+# STUB LLM CLIENT
+# Drop-in for the Groq client (client.chat.completions.create) that returns
+# canned answers in the formats the prompts ask for. Used when
+# POLICYLENS_LLM_STUB=1, to run the job server, loadtest.py and the
+# benchmarks end-to-end without Groq.
+# POLICYLENS_STUB_LATENCY_MS adds a simulated model latency.
+# ─────────────────────────────────────────
+STUB_LATENCY_MS = float(os.getenv("POLICYLENS_STUB_LATENCY_MS", 0))
+
+STUB_SUMMARY = """📋 POLICY OVERVIEW
+A family floater health insurance policy covering hospitalisation.
+
+✅ WHAT YOU ARE COVERED FOR
+- Hospital stays, ICU and room rent
+- Day-care procedures and ambulance
+
+❌ WHAT IS NOT COVERED
+- Cosmetic treatment and non-medical items
+
+💰 COSTS YOU SHOULD KNOW
+- Annual premium Rs. 18,000, no deductible
+
+🏥 HOW TO MAKE A CLAIM
+1. Inform the insurer within 24 hours
+2. Use a network hospital for cashless claims
+
+⚠️ IMPORTANT DATES & LIMITS
+- 30 day initial waiting period, 3 years for pre-existing diseases"""
+
+STUB_ALTERNATIVE = {
+    "insurer": "Star Health",
+    "product": "Family Health Optima",
+    "why_perfect": "Covers your family with a low premium.",
+    "estimated_premium": "Rs. 16,500",
+    "sum_insured": "Rs. 10 Lakhs",
+    "advantages": ["No room rent cap", "Restore benefit"],
+    "weakness": "Two year waiting period for some illnesses",
+    "rating": 4.5,
+    "claim_settlement_ratio": "90%",
+}
+
+STUB_PROFILE = {
+    "name": "Test User", "age": "34", "city": "Pune",
+    "occupation": "Engineer", "income": "10-15 Lakhs",
+    "dependents": "Spouse, 1 child", "health_conditions": "None",
+    "insurance_type": "Health", "coverage_needed": "10 Lakhs",
+    "budget": "Rs. 20,000 per year", "special_requirements": "None",
+}
+
+
+class _Usage:
+    def __init__(self, prompt_tokens, completion_tokens):
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        self.total_tokens = prompt_tokens + completion_tokens
+
+
+class _Message:
+    def __init__(self, content):
+        self.content = content
+
+
+class _Choice:
+    def __init__(self, content):
+        self.message = _Message(content)
+
+
+class _Response:
+    def __init__(self, content, prompt):
+        self.choices = [_Choice(content)]
+        # Rough token estimate, four characters per token
+        self.usage = _Usage(len(prompt) // 4, len(content) // 4)
+
+
+def _alternatives(names):
+    return [dict(STUB_ALTERNATIVE, insurer=name) for name in names]
+
+
+def stub_reply(messages):
+    prompt = messages[-1]["content"]
+    system = messages[0]["content"]
+
+    if "VALID: [YES or NO]" in prompt:
+        return "VALID: YES\nCONFIDENCE: HIGH\nREASON: Stub insurance policy"
+    if "PROFILE_COMPLETE" in system:
+        user_turns = sum(1 for m in messages if m["role"] == "user")
+        if user_turns >= 4:
+            return ("Thanks, that's everything!\nPROFILE_COMPLETE\n"
+                    + json.dumps(STUB_PROFILE))
+        return "Great, thank you! How old are you, and which city do you live in?"
+    if '"extracted"' in prompt:
+        return json.dumps({
+            "extracted": {
+                "policy_type": "Health",
+                "current_sum_insured": "Rs. 5 Lakhs",
+                "current_premium": "Rs. 18,000",
+                "policyholder_age": "34",
+                "key_coverages": ["Hospitalisation", "Day care"],
+            },
+            "alternatives": _alternatives(
+                ["Star Health", "HDFC Ergo", "Niva Bupa", "Care Health"]),
+        })
+    if '"customer_name"' in prompt:
+        return json.dumps({
+            "customer_name": "Test User",
+            "insurance_type": "Health",
+            "alternatives": _alternatives(
+                ["Niva Bupa", "ICICI Lombard", "Tata AIG", "Care Health"]),
+        })
+    if "RENEWAL CHANGES" in prompt:
+        return ("💰 PREMIUM CHANGES\n- Premium goes up from Rs. 18,000 to "
+                "Rs. 19,800.\n\n✅ COVERAGE CHANGES\n- Room rent limit "
+                "raised.\n\n❌ EXCLUSION CHANGES\n- No change.\n\n"
+                "📋 OTHER CHANGES\n- No change.")
+    if "detailed insurance quote" in prompt:
+        return ("INSURANCE QUOTE\n\nBase premium: Rs. 14,000\n"
+                "Add-on covers: Rs. 2,500\nDiscounts: -Rs. 1,000\n"
+                "Final premium: Rs. 15,500 per year\n\n"
+                "Payment options: monthly Rs. 1,350, quarterly Rs. 3,950, "
+                "annual Rs. 15,500\n\n" + "Key terms apply. " * 20)
+    return STUB_SUMMARY
+
+
+class _Completions:
+    def create(self, model, messages, **kwargs):
+        if STUB_LATENCY_MS:
+            # +/- 20% jitter so load tests see a latency spread
+            time.sleep(STUB_LATENCY_MS * random.uniform(0.8, 1.2) / 1000)
+        content = stub_reply(messages)
+        prompt = "".join(m["content"] for m in messages)
+        return _Response(content, prompt)
+
+
+class _Chat:
+    def __init__(self):
+        self.completions = _Completions()
+
+
+class StubClient:
+    def __init__(self):
+        self.chat = _Chat()
@@ -0,0 +1,399 @@
+import os
+import io
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+import socketserver
+from concurrent.futures import ThreadPoolExecutor
+
+# The stub LLM must be selected before policy_engine is imported
+os.environ.setdefault("POLICYLENS_LLM_STUB", "1")
+
+
+# ─────────────────────────────────────────
+# CONCURRENT-SESSION LOAD TEST
+# Simulates PolicyLens sessions — PDF upload, analyze, alternatives, quote,
+# email and a multi-turn chat — against the backend functions in this
+# process, with the stub LLM and a local stub SMTP server. Concurrency is
+# ramped level by level; each level reports throughput, p50/p95/p99 latency
+# per stage, process RSS and CPU use.
+#
+#
+# Every session uploads its own policy wording and chats with its own
+# profile, so the near-duplicate index, recommendation cache and in-flight
+# coalescing only see the repeats real traffic has: --duplicate-ratio of
+# sessions upload one of --shared-docs popular brochures and reuse one
+# common profile.
+#
+#   python loadtest.py --levels 1,4,16,32 --duration 20 --llm-latency-ms 800
+#   python loadtest.py --fail-p95 5     (exit 1 if any stage p95 > 5 s)
+#   python loadtest.py --duplicate-ratio 0.5 --shared-docs 3
+# ─────────────────────────────────────────
+STAGES = ["upload", "analyze", "alternatives", "quote", "email", "chat"]
+
+CITIES = ["Pune", "Mumbai", "Delhi", "Jaipur", "Indore", "Kochi", "Nashik",
+          "Hubli", "Siliguri", "Bengaluru", "Lucknow", "Guntur"]
+CONDITIONS = ["no health issues", "diabetes", "high blood pressure", "asthma",
+              "a thyroid condition", "no health issues", "no health issues"]
+INSURANCE_NEEDS = ["health", "health", "health", "life", "vehicle", "home"]
+COMMON_PROFILE = {"age": 34, "city": "Pune", "condition": "no health issues",
+                  "insurance": "health", "cover_lakhs": 10, "budget": 20000}
+
+
+# ─────────────────────────────────────────
+# STUB SMTP SERVER — accepts and discards mail
+# ─────────────────────────────────────────
+class _SMTPHandler(socketserver.StreamRequestHandler):
+
+    def _reply(self, line):
+        self.wfile.write(line.encode("ascii") + b"\r\n")
+
+    def handle(self):
+        self._reply("220 stub ESMTP")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode("ascii", "replace").strip().upper()
+            if command.startswith(("EHLO", "HELO")):
+                self.wfile.write(b"250-stub\r\n250 AUTH PLAIN\r\n")
+            elif command.startswith("AUTH"):
+                self._reply("235 Authentication successful")
+            elif command.startswith(("MAIL", "RCPT", "RSET", "NOOP")):
+                self._reply("250 OK")
+            elif command == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                while self.rfile.readline() not in (b".\r\n", b""):
+                    pass
+                self._reply("250 Queued")
+            elif command == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Not implemented")
+
+
+def start_stub_smtp():
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _SMTPHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ["SMTP_HOST"] = "127.0.0.1"
+    os.environ["SMTP_PORT"] = str(server.server_address[1])
+    os.environ["SMTP_SSL"] = "0"
+    os.environ.setdefault("GMAIL_ADDRESS", "loadtest@example.com")
+    os.environ.setdefault("GMAIL_APP_PASSWORD", "loadtest")
+    return server
+
+
+# ─────────────────────────────────────────
+# SAMPLE POLICY PDF
+# ─────────────────────────────────────────
+def make_policy_pdf(pages=8, rng=None):
+    # With an rng, every clause is random policy wording, so each document
+    # is a different product as far as the near-duplicate index can tell
+    import fitz
+    from bench_similarity import random_clause
+    doc = fitz.open()
+    for page_number in range(pages):
+        page = doc.new_page()
+        lines = [f"Section {page_number + 1} — Hospitalisation Benefits"]
+        for i in range(1, 30):
+            if rng is None:
+                lines.append(f"{i}. The Company shall pay reasonable and customary "
+                             f"charges for in-patient care, subject to the sum "
+                             f"insured and sub-limits.")
+            else:
+                lines.append(f"{i}. " + random_clause(rng)[:110])
+        page.insert_text((40, 50), "\n".join(lines), fontsize=8)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+# ─────────────────────────────────────────
+# ONE SIMULATED SESSION
+# ─────────────────────────────────────────
+class Recorder:
+
+    def __init__(self):
+        self.samples = {stage: [] for stage in STAGES}
+        self.errors = {stage: 0 for stage in STAGES}
+        self.shed = {stage: 0 for stage in STAGES}
+        self.sessions = 0
+        self._lock = threading.Lock()
+
+    def timed(self, stage, fn, *args):
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        except Exception as e:
+            with self._lock:
+                if type(e).__name__ == "Busy":
+                    self.shed[stage] += 1
+                else:
+                    self.errors[stage] += 1
+            raise
+        finally:
+            with self._lock:
+                self.samples[stage].append(time.perf_counter() - start)
+
+
+def random_profile(rng):
+    return {
+        "age": rng.randint(19, 70),
+        "city": rng.choice(CITIES),
+        "condition": rng.choice(CONDITIONS),
+        "insurance": rng.choice(INSURANCE_NEEDS),
+        "cover_lakhs": rng.choice([3, 5, 7, 10, 15, 25, 50, 100]),
+        "budget": rng.choice([8000, 12000, 18000, 25000, 40000, 60000]),
+    }
+
+
+def chat_answers(name, profile):
+    return [
+        f"My name is {name}",
+        f"I am {profile['age']} and live in {profile['city']}",
+        "I work as an engineer and earn 12 lakhs",
+        f"Married with one child, {profile['condition']}, need "
+        f"{profile['insurance']} cover of {profile['cover_lakhs']} lakhs "
+        f"within {profile['budget']:,} a year",
+    ]
+
+
+class Workload:
+    # Per-session documents and profiles; a share of sessions repeat a
+    # popular brochure and the common profile
+    def __init__(self, pdf_pages, duplicate_ratio, shared_docs, seed):
+        self.pdf_pages = pdf_pages
+        self.duplicate_ratio = duplicate_ratio
+        rng = random.Random(seed)
+        self.shared = [make_policy_pdf(pdf_pages, rng) for _ in range(max(shared_docs, 1))]
+
+    def next_session(self, rng):
+        if rng.random() < self.duplicate_ratio:
+            return rng.choice(self.shared), dict(COMMON_PROFILE)
+        return make_policy_pdf(self.pdf_pages, rng), random_profile(rng)
+
+
+def run_session(engine, recorder, workload, rng):
+    name = rng.choice(['Aarav', 'Priya', 'Rohan', 'Meera'])
+    customer = f"{name} {rng.randint(1, 10**6)}"
+    pdf_bytes, profile = workload.next_session(rng)
+
+    text, _, _ = recorder.timed("upload", engine.read_uploaded_pdf, io.BytesIO(pdf_bytes))
+    text = f"Policyholder: {customer}\n" + text
+
+    def analyze():
+        is_valid, _ = engine.validate_policy_text(text)
+        summary = engine.summarize_with_reuse(text) if is_valid else ""
+        return summary, engine.create_summary_pdf(summary)
+    summary, summary_pdf = recorder.timed("analyze", analyze)
+
+    reco = recorder.timed("alternatives", engine.recommend_alternatives, text)
+
+    def quote():
+        insurer = reco["alternatives"][0]["insurer"]
+        quote_text = engine.generate_quote(insurer, reco["extracted"])
+        return engine.create_summary_pdf(quote_text, f"Quote — {insurer}")
+    recorder.timed("quote", quote)
+
+    recorder.timed("email", engine.send_email,
+                   "customer@example.com", summary, summary_pdf)
+
+    def chat():
+        messages = [{"role": "assistant", "content": "Hello! What is your name?"}]
+        extracted = None
+        for answer in chat_answers(name, profile):
+            messages.append({"role": "user", "content": answer})
+            reply = engine.chat_reply(messages)
+            messages.append({"role": "assistant", "content": reply})
+            extracted = engine.parse_chat_reply(reply)[1] or extracted
+        if extracted is not None:
+            # The stub LLM returns one fixed profile — use the session's own
+            engine.recommend_for_profile_cached(dict(
+                extracted, name=name, age=str(profile["age"]), city=profile["city"],
+                health_conditions=profile["condition"],
+                insurance_type=profile["insurance"],
+                coverage_needed=f"{profile['cover_lakhs']} lakhs",
+                budget=f"Rs. {profile['budget']:,} per year"))
+    recorder.timed("chat", chat)
+
+    with recorder._lock:
+        recorder.sessions += 1
+
+
+# ─────────────────────────────────────────
+# RESOURCE SAMPLING
+# ─────────────────────────────────────────
+def rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class ResourceSampler(threading.Thread):
+
+    def __init__(self, interval=0.5):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak_rss = rss_mb()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.peak_rss = max(self.peak_rss, rss_mb())
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+# ─────────────────────────────────────────
+# RAMP
+# ─────────────────────────────────────────
+def reuse_counters(engine):
+    # LLM work answered from earlier sessions instead of a model call
+    return {
+        "near_duplicate": engine.similar_policies.stats()["hits"],
+        "reco_cache": engine.reco_cache.stats()["hits"],
+        "coalesced": engine.analyses_in_flight.stats()["coalesced"],
+    }
+
+
+def run_level(engine, users, duration, workload, seed):
+    import admission
+    recorder = Recorder()
+    deadline = time.monotonic() + duration
+    admitted_before = admission.controller.stats()["admitted"]
+    reuse_before = reuse_counters(engine)
+
+    def virtual_user(user_id):
+        admission.set_user(f"user-{user_id}")
+        # Seeded per level too, so a level never replays an earlier one's documents
+        rng = random.Random(f"{seed}-{users}-{user_id}")
+        while time.monotonic() < deadline:
+            try:
+                run_session(engine, recorder, workload, rng)
+            except Exception:
+                pass
+
+    sampler = ResourceSampler()
+    sampler.start()
+    cpu_start = os.times()
+    wall_start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=users) as pool:
+        list(pool.map(virtual_user, range(users)))
+    wall = time.monotonic() - wall_start
+    cpu_end = os.times()
+    sampler.stop()
+
+    cpu = (cpu_end.user - cpu_start.user) + (cpu_end.system - cpu_start.system)
+    llm = admission.controller.stats()
+    return {
+        "users": users,
+        "wall_s": wall,
+        "sessions": recorder.sessions,
+        "sessions_per_s": recorder.sessions / wall if wall else 0.0,
+        "cpu_percent": 100.0 * cpu / wall if wall else 0.0,
+        "peak_rss_mb": sampler.peak_rss,
+        "llm_admitted": llm["admitted"] - admitted_before,
+        "llm_peak_waiting": llm["peak_waiting"],
+        "reuse": {name: value - reuse_before[name]
+                  for name, value in reuse_counters(engine).items()},
+        "stages": {
+            stage: {
+                "count": len(samples),
+                "errors": recorder.errors[stage],
+                "shed": recorder.shed[stage],
+                "p50": percentile(samples, 50),
+                "p95": percentile(samples, 95),
+                "p99": percentile(samples, 99),
+            }
+            for stage, samples in recorder.samples.items()
+        },
+    }
+
+
+def print_level(result):
+    print(f"\n▶ {result['users']} concurrent users — "
+          f"{result['sessions']} sessions in {result['wall_s']:.1f}s "
+          f"({result['sessions_per_s']:.2f}/s), "
+          f"CPU {result['cpu_percent']:.0f}%, peak RSS {result['peak_rss_mb']:.0f} MB")
+    print(f"  LLM calls admitted {result['llm_admitted']}, "
+          f"peak queue {result['llm_peak_waiting']}; reused: "
+          f"{result['reuse']['near_duplicate']} near-duplicate summaries, "
+          f"{result['reuse']['reco_cache']} cached recommendations, "
+          f"{result['reuse']['coalesced']} coalesced calls")
+    print(f"  {'stage':<14}{'count':>7}{'errors':>8}{'shed':>6}"
+          f"{'p50':>10}{'p95':>10}{'p99':>10}")
+    for stage, values in result["stages"].items():
+        print(f"  {stage:<14}{values['count']:>7}{values['errors']:>8}{values['shed']:>6}"
+              f"{values['p50']:>9.3f}s{values['p95']:>9.3f}s{values['p99']:>9.3f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PolicyLens concurrent-session load test")
+    parser.add_argument("--levels", default="1,2,4,8,16",
+                        help="comma-separated concurrent user counts to ramp through")
+    parser.add_argument("--duration", type=float, default=15,
+                        help="seconds to run each level")
+    parser.add_argument("--llm-latency-ms", type=float, default=300,
+                        help="simulated latency of each stub LLM call")
+    parser.add_argument("--pdf-pages", type=int, default=8)
+    parser.add_argument("--duplicate-ratio", type=float, default=0.1,
+                        help="share of sessions that upload a shared brochure and "
+                             "use the common profile")
+    parser.add_argument("--shared-docs", type=int, default=3,
+                        help="number of shared brochures")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--fail-p95", type=float,
+                        help="exit 1 if any stage p95 exceeds this many seconds")
+    args = parser.parse_args()
+
+    os.environ["POLICYLENS_STUB_LATENCY_MS"] = str(args.llm_latency_ms)
+    start_stub_smtp()
+    import policy_engine as engine
+    import llm_stub
+    llm_stub.STUB_LATENCY_MS = args.llm_latency_ms
+
+    workload = Workload(args.pdf_pages, args.duplicate_ratio, args.shared_docs, args.seed)
+    print(f"{args.duplicate_ratio:.0%} of sessions repeat one of "
+          f"{args.shared_docs} shared brochures; the rest upload distinct policies")
+    results = []
+    for users in [int(level) for level in args.levels.split(",")]:
+        result = run_level(engine, users, args.duration, workload, args.seed)
+        print_level(result)
+        results.append(result)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.fail_p95 is not None:
+        worst = max(values["p95"] for result in results
+                    for values in result["stages"].values())
+        if worst > args.fail_p95:
+            print(f"\n✗ worst stage p95 {worst:.3f}s exceeds {args.fail_p95}s")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+import re
+
+
+# ─────────────────────────────────────────
+# TABLE-AWARE PAGE EXTRACTION
+# Premium schedules, sum-insured tiers and sub-limits sit in tables that
+# page.get_text() flattens into one cell per line. PyMuPDF's table finder
+# (1.23+) gives us rows and columns instead; the table's text blocks are
+# replaced by a compact "a|b|c" rendering in reading order, with a unit
+# shared by a whole column ("Rs.", "days", "%") moved into its header. The
+# rows are kept so the policy's own schedule values can be read directly.
+# The finder (~70 ms a page) only runs on pages with ruling lines or boxes,
+# which its default "lines" strategy needs anyway; plain wording pages cost
+# one get_cdrawings() call (~0.3 ms).
+# ─────────────────────────────────────────
+FIELD_HEADERS = {
+    "current_premium": ["total premium", "annual premium", "premium"],
+    "current_sum_insured": ["sum insured", "sum assured", "cover amount", "coverage"],
+    "policyholder_age": ["age"],
+    "policy_type": ["policy type", "plan type"],
+}
+# A value has to look like the field, e.g. "18-35" is an age band, not an age
+FIELD_VALUES = {
+    "current_premium": re.compile(r"\d"),
+    "current_sum_insured": re.compile(r"\d"),
+    "policyholder_age": re.compile(r"^\d{1,3}(?:\s*(?:years?|yrs?))?$", re.IGNORECASE),
+    "policy_type": re.compile(r"[A-Za-z]"),
+}
+COLUMN_PREFIXES = ["Rs. ", "Rs.", "₹ ", "₹", "INR "]
+COLUMN_SUFFIXES = [" days", " months", " years", "%"]
+
+
+def _clean_cell(cell):
+    return " ".join(str(cell).split()) if cell is not None else ""
+
+
+def may_hold_table(page):
+    lines = 0
+    for path in page.get_cdrawings():
+        for item in path["items"]:
+            if item[0] in ("re", "qu"):
+                return True
+            if item[0] == "l":
+                lines += 1
+                if lines >= 2:
+                    return True
+    return False
+
+
+def find_page_tables(page):
+    if not hasattr(page, "find_tables") or not may_hold_table(page):
+        return []
+    tables = []
+    for table in page.find_tables().tables:
+        rows = [[_clean_cell(cell) for cell in row] for row in table.extract()]
+        rows = [row for row in rows if any(row)]
+        if len(rows) < 2 or max(len(row) for row in rows) < 2:
+            continue
+        tables.append({
+            "page": page.number + 1,
+            "bbox": tuple(table.bbox),
+            "rows": rows,
+        })
+    return tables
+
+
+def _shared_unit(cells, units, test):
+    for unit in units:
+        if all(test(cell, unit) for cell in cells):
+            return unit
+    return None
+
+
+def compact_rows(rows):
+    # "Rs. 12,000" in every data cell of a column becomes "Sub-limit (Rs.)"
+    # in the header and "12,000" in the cells
+    if len(rows) < 3:
+        return rows
+    rows = [list(row) for row in rows]
+    width = max(len(row) for row in rows)
+    for col in range(width):
+        cells = [row[col] for row in rows[1:] if col < len(row) and row[col]]
+        if len(cells) < 2 or col >= len(rows[0]):
+            continue
+        prefix = _shared_unit(cells, COLUMN_PREFIXES, str.startswith)
+        suffix = _shared_unit(cells, COLUMN_SUFFIXES, str.endswith)
+        for unit, strip in ((prefix, lambda c, u: c[len(u):]),
+                            (suffix, lambda c, u: c[:-len(u)])):
+            if unit is None:
+                continue
+            rows[0][col] = f"{rows[0][col]} ({unit.strip()})"
+            for row in rows[1:]:
+                if col < len(row) and row[col]:
+                    row[col] = strip(row[col], unit).strip()
+    return rows
+
+
+def table_to_text(table):
+    # One row per line, cells joined by "|": rows and columns stay visible
+    # to the LLM, with per-column units stated once
+    return "\n".join("|".join(row) for row in compact_rows(table["rows"])) + "\n"
+
+
+def _inside(block, bbox):
+    x0, y0, x1, y1 = block[:4]
+    cx, cy = (x0 + x1) / 2, (y0 + y1) / 2
+    return bbox[0] <= cx <= bbox[2] and bbox[1] <= cy <= bbox[3]
+
+
+def page_text_with_tables(page):
+    # Returns (text, tables) with each table rendered compactly in place
+    tables = find_page_tables(page)
+    if not tables:
+        return page.get_text(), []
+
+    parts = []
+    placed = set()
+    for block in page.get_text("blocks"):
+        if block[6] != 0:   # image block
+            continue
+        owner = next((i for i, t in enumerate(tables)
+                      if _inside(block, t["bbox"])), None)
+        if owner is None:
+            parts.append(block[4])
+        elif owner not in placed:
+            parts.append(table_to_text(tables[owner]))
+            placed.add(owner)
+    for i, table in enumerate(tables):
+        if i not in placed:
+            parts.append(table_to_text(table))
+    return "".join(parts), tables
+
+
+# ─────────────────────────────────────────
+# TABLES → extracted fields
+# ─────────────────────────────────────────
+def _match_field(label):
+    label = label.lower()
+    for field, names in FIELD_HEADERS.items():
+        if any(re.search(rf"\b{re.escape(name)}\b", label) for name in names):
+            return field
+    return None
+
+
+def _header_index(header, names):
+    # Most specific name first, e.g. "total premium" before "premium"
+    for name in names:
+        for index, label in enumerate(header):
+            if re.search(rf"\b{re.escape(name)}\b", label.lower()):
+                return index
+    return None
+
+
+def _field_value(field, value):
+    value = value.strip()
+    return value if value and FIELD_VALUES[field].search(value) else None
+
+
+def table_fields(tables):
+    # Only values that belong to this policy: label/value schedule rows, or
+    # a header row over a single data row. A rate chart or plan comparison
+    # (several data rows) says nothing about which row is the customer's.
+    fields = {}
+    for table in tables:
+        rows = table["rows"]
+
+        # Key/value layout: label in the first cell, value in the next. A
+        # row whose "value" is itself a label is a header, not a pair.
+        for row in rows:
+            if len(row) < 2 or _match_field(row[1]):
+                continue
+            field = _match_field(row[0])
+            if field and field not in fields:
+                value = _field_value(field, row[1])
+                if value:
+                    fields[field] = value
+
+        # Column layout: header row over exactly one data row
+        data_rows = [row for row in rows[1:] if any(row)]
+        if len(data_rows) != 1:
+            continue
+        header, values = rows[0], data_rows[0]
+        for field, names in FIELD_HEADERS.items():
+            index = _header_index(header, names)
+            if field not in fields and index is not None and index < len(values):
+                value = _field_value(field, values[index])
+                if value:
+                    fields[field] = value
+    return fields
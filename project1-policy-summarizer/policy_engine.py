@@ -0,0 +1,799 @@
+from dotenv import load_dotenv
+import os
+import json
+import re
+import hashlib
+import tempfile
+
+from admission import Busy
+from llm_backends import LocalBackendError, get_backend
+from llm_router import route_completion
+from pdf_tables import page_text_with_tables, table_fields
+from reco_cache import (
+    RecoCache,
+    bucket_profile,
+    bucket_key,
+    bucket_from_key,
+    representative_profile,
+    personalize,
+)
+from renewal_diff import align_clauses, word_diff
+from single_flight import SingleFlight, coalesce
+from similarity_index import (
+    SimilarityIndex,
+    minhash_signature,
+    changed_lines,
+    entry_text,
+)
+
+load_dotenv()
+
+
+# ─────────────────────────────────────────
+# LLM CLIENT — Groq by default, POLICYLENS_BACKEND=local for an
+# OpenAI-compatible local server, POLICYLENS_LLM_STUB=1 for canned answers
+# groq, PyMuPDF, smtplib/MIME and ReportLab are imported where they are
+# used, so importing this module stays cheap; prewarm() loads them ahead
+# of the first request.
+# ─────────────────────────────────────────
+def get_client():
+    # Default backend; the router may send a task elsewhere (llm_backends)
+    return get_backend()
+
+
+def prewarm():
+    # Import heavy modules and build the client off the request path
+    import fitz
+    import smtplib
+    import email.mime.multipart
+    import reportlab.platypus
+    get_client()
+
+
+# ─────────────────────────────────────────
+# IN-FLIGHT COALESCING — the same document analyzed by several sessions or
+# threads at once shares one validation, summary and alternatives call
+# ─────────────────────────────────────────
+analyses_in_flight = SingleFlight(os.getenv("POLICYLENS_COALESCE", "1") == "1")
+
+
+# ─────────────────────────────────────────
+# HELPER — Parse a JSON reply from the LLM
+# ─────────────────────────────────────────
+def parse_json_reply(raw):
+    raw = raw.strip()
+    raw = raw.replace("```json", "").replace("```", "").strip()
+    return json.loads(raw)
+
+
+# ─────────────────────────────────────────
+# FUNCTION 1 — Extract text from PDF
+# Uploads are spooled to a temp file in chunks (hashed on the way) and
+# PyMuPDF opens that file, so pages are read from disk on demand instead
+# of holding another full copy of the PDF in memory.
+# ─────────────────────────────────────────
+MAX_UPLOAD_BYTES = int(os.getenv("POLICYLENS_MAX_UPLOAD_MB", 200)) * 1024 * 1024
+MAX_PDF_PAGES = int(os.getenv("POLICYLENS_MAX_PDF_PAGES", 500))
+SPOOL_CHUNK_BYTES = 1024 * 1024
+EXTRACT_TABLES = os.getenv("POLICYLENS_PDF_TABLES", "1") == "1"
+
+
+class UploadRejected(ValueError):
+    pass
+
+
+def spool_upload(uploaded_file, max_bytes=MAX_UPLOAD_BYTES):
+    # Returns (temp_path, sha256_hex); the caller removes temp_path
+    declared_size = getattr(uploaded_file, "size", None)
+    if declared_size is not None and declared_size > max_bytes:
+        raise UploadRejected(
+            f"File is {declared_size / 1e6:.0f} MB — the limit is "
+            f"{max_bytes / 1e6:.0f} MB.")
+
+    if hasattr(uploaded_file, "seek"):
+        uploaded_file.seek(0)
+    digest = hashlib.sha256()
+    size = 0
+    spool = tempfile.NamedTemporaryFile(prefix="policylens-upload-",
+                                        suffix=".pdf", delete=False)
+    try:
+        with spool:
+            while True:
+                chunk = uploaded_file.read(SPOOL_CHUNK_BYTES)
+                if not chunk:
+                    break
+                if size == 0 and not chunk.startswith(b"%PDF-"):
+                    raise UploadRejected("This file is not a PDF document.")
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadRejected(
+                        f"File is larger than the {max_bytes / 1e6:.0f} MB limit.")
+                digest.update(chunk)
+                spool.write(chunk)
+    except BaseException:
+        os.remove(spool.name)
+        raise
+    return spool.name, digest.hexdigest()
+
+
+def extract_document_from_path(path, max_pages=MAX_PDF_PAGES):
+    # Returns (text, tables); tables appear in the text in compact form
+    import fitz
+    try:
+        pdf_document = fitz.open(path)
+    except fitz.FileDataError:
+        raise UploadRejected("This PDF is damaged or could not be read.")
+    with pdf_document:
+        # Reject huge bundles before extracting any page text
+        if pdf_document.page_count > max_pages:
+            raise UploadRejected(
+                f"PDF has {pdf_document.page_count} pages — the limit is "
+                f"{max_pages}.")
+        if not EXTRACT_TABLES:
+            return "".join(page.get_text() for page in pdf_document), []
+        texts = []
+        tables = []
+        for page in pdf_document:
+            page_text, page_tables = page_text_with_tables(page)
+            texts.append(page_text)
+            tables.extend(page_tables)
+        return "".join(texts), tables
+
+
+def extract_text_from_path(path, max_pages=MAX_PDF_PAGES):
+    return extract_document_from_path(path, max_pages)[0]
+
+
+def read_uploaded_pdf(uploaded_file, max_pages=MAX_PDF_PAGES):
+    # Returns (text, sha256_hex, tables) — the hash is the upload's cache key
+    path, content_hash = spool_upload(uploaded_file)
+    try:
+        # The same file uploaded by several sessions at once is parsed once
+        text, tables = analyses_in_flight.do(
+            ("extract", content_hash, max_pages),
+            extract_document_from_path, path, max_pages)
+        return text, content_hash, tables
+    finally:
+        os.remove(path)
+
+
+def extract_text_from_pdf(uploaded_file):
+    return read_uploaded_pdf(uploaded_file)[0]
+
+
+# ─────────────────────────────────────────
+# FUNCTION 2 — Validate insurance document
+# ─────────────────────────────────────────
+def _validation_ok(result):
+    well_formed = "VALID: YES" in result or "VALID: NO" in result
+    return well_formed and "CONFIDENCE: HIGH" in result
+
+
+POLICY_KEYWORDS = ["policy", "insured", "insurer", "premium", "sum insured",
+                   "coverage", "cover", "claim", "exclusion", "policyholder",
+                   "waiting period", "deductible", "co-payment", "nominee"]
+
+
+def validate_policy_heuristic(text):
+    # Keyword check used when the LLM is saturated
+    lowered = text[:5000].lower()
+    hits = [word for word in POLICY_KEYWORDS if word in lowered]
+    if len(hits) >= 4:
+        return True, "Valid insurance document"
+    return False, "Document does not appear to be an insurance policy"
+
+
+@coalesce(analyses_in_flight, "validate")
+def validate_policy_text(text):
+    if len(text.strip()) < 100:
+        return False, "The text is too short to be an insurance policy."
+
+    validation_prompt = f"""
+    You are an insurance document validator.
+    Look at the following text and determine if it is a genuine insurance
+    policy document or insurance-related content.
+
+    Answer ONLY in this exact format:
+    VALID: [YES or NO]
+    CONFIDENCE: [HIGH or LOW]
+    REASON: [one line explanation]
+
+    Text to validate:
+    {text[:1000]}
+    """
+
+    try:
+        result = route_completion(
+            get_client(), "validation",
+            messages=[
+                {"role": "system", "content": "You are a strict insurance document validator."},
+                {"role": "user", "content": validation_prompt}
+            ],
+            check=_validation_ok,
+            temperature=0.1
+        ).strip()
+    except (Busy, LocalBackendError):
+        # Shed, or POLICYLENS_BACKEND=local with the server down
+        return validate_policy_heuristic(text)
+
+    if "VALID: YES" in result:
+        return True, "Valid insurance document"
+    else:
+        reason = "Document does not appear to be an insurance policy"
+        for line in result.split('\n'):
+            if line.startswith("REASON:"):
+                reason = line.replace("REASON:", "").strip()
+                break
+        return False, reason
+
+
+# ─────────────────────────────────────────
+# FUNCTION 3 — Summarize policy
+# ─────────────────────────────────────────
+def summarize_policy(policy_text):
+    prompt = f"""
+    You are an expert insurance advisor. Analyze the following insurance policy
+    and provide a clear, simple summary any common person can understand.
+
+    Structure your response exactly like this:
+
+    📋 POLICY OVERVIEW
+    [2-3 lines about what this policy is]
+
+    ✅ WHAT YOU ARE COVERED FOR
+    [List key coverages in simple language]
+
+    ❌ WHAT IS NOT COVERED
+    [List exclusions in simple language]
+
+    💰 COSTS YOU SHOULD KNOW
+    [Premium, deductible, copayment explained simply]
+
+    🏥 HOW TO MAKE A CLAIM
+    [Simple step by step claim process]
+
+    ⚠️ IMPORTANT DATES & LIMITS
+    [Key limits and waiting periods]
+
+    Keep language simple. Avoid jargon.
+    Write as if explaining to someone who never read a policy before.
+
+    POLICY TEXT:
+    {policy_text}
+    """
+    return route_completion(
+        get_client(), "summary",
+        messages=[
+            {"role": "system", "content": "You are a helpful insurance expert."},
+            {"role": "user", "content": prompt}
+        ]
+    )
+
+
+# ─────────────────────────────────────────
+# FUNCTION 3b — Summarize, reusing near-identical policies
+# The same product wording for another customer only differs in personal
+# fields, so the earlier summary is patched with the changed lines instead
+# of summarizing the whole document again.
+# ─────────────────────────────────────────
+MAX_PATCH_LINES = 60
+SUMMARY_SECTIONS = ["POLICY OVERVIEW", "WHAT YOU ARE COVERED FOR",
+                    "WHAT IS NOT COVERED", "COSTS YOU SHOULD KNOW",
+                    "HOW TO MAKE A CLAIM", "IMPORTANT DATES & LIMITS"]
+
+similar_policies = SimilarityIndex()
+
+
+def _patch_ok(summary):
+    return all(section in summary for section in SUMMARY_SECTIONS)
+
+
+def patch_summary(base_summary, added, removed=()):
+    added_text = "\n".join(added) or "(none)"
+    removed_text = "\n".join(removed) or "(none)"
+    prompt = f"""
+    Below is a summary of an insurance policy, followed by the only lines
+    that differ in a new copy of the same policy wording (a different
+    policyholder, policy number, dates, premium or sum insured, or a clause
+    added or dropped).
+
+    Update the summary so it matches the new document. Change only the
+    details the differing lines affect: use the new lines, and remove
+    anything that relied only on a removed line. Keep everything else,
+    including the section headings, exactly as it is. Return the full
+    updated summary only.
+
+    SUMMARY:
+    {base_summary}
+
+    LINES ONLY IN THE NEW DOCUMENT:
+    {added_text}
+
+    LINES REMOVED FROM THE NEW DOCUMENT:
+    {removed_text}
+    """
+    return route_completion(
+        get_client(), "patch",
+        messages=[
+            {"role": "system", "content": "You are a careful insurance editor."},
+            {"role": "user", "content": prompt}
+        ],
+        check=_patch_ok,
+        temperature=0.1
+    )
+
+
+@coalesce(analyses_in_flight, "summary")
+def summarize_with_reuse(policy_text):
+    signature = minhash_signature(policy_text)
+    match = similar_policies.find(signature=signature)
+    if match is not None:
+        _, _, entry = match
+        added, removed = changed_lines(policy_text, entry_text(entry))
+        if not added and not removed:
+            return entry["payload"]["summary"]
+        if len(added) + len(removed) <= MAX_PATCH_LINES:
+            # Busy propagates: the unpatched summary carries another
+            # customer's name, policy number and premium
+            return patch_summary(entry["payload"]["summary"], added, removed)
+
+    summary = summarize_policy(policy_text)
+    doc_id = hashlib.sha256(policy_text.encode("utf-8")).hexdigest()
+    similar_policies.add(doc_id, policy_text, {"summary": summary}, signature)
+    return summary
+
+
+# ─────────────────────────────────────────
+# FUNCTION 4 — Create PDF from summary
+# ─────────────────────────────────────────
+def create_summary_pdf(summary_text, title="Insurance Policy Summary"):
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, HRFlowable
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib import colors
+    import io
+
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter,
+                            rightMargin=60, leftMargin=60,
+                            topMargin=60, bottomMargin=60)
+    styles = getSampleStyleSheet()
+
+    title_style = ParagraphStyle('Title', parent=styles['Title'],
+        fontSize=20, textColor=colors.HexColor('#1a3a5c'), spaceAfter=6)
+    normal_style = ParagraphStyle('Normal', parent=styles['Normal'],
+        fontSize=11, leading=18, spaceAfter=6)
+    footer_style = ParagraphStyle('Footer', parent=styles['Normal'],
+        fontSize=8, textColor=colors.grey, alignment=1)
+
+    story = []
+    story.append(Paragraph(title, title_style))
+    story.append(HRFlowable(width="100%", thickness=2,
+                            color=colors.HexColor('#1a3a5c'), spaceAfter=12))
+
+    for line in summary_text.split('\n'):
+        if line.strip() == "":
+            story.append(Spacer(1, 6))
+        else:
+            story.append(Paragraph(line, normal_style))
+
+    story.append(Spacer(1, 20))
+    story.append(HRFlowable(width="100%", thickness=1,
+                            color=colors.grey, spaceAfter=8))
+    story.append(Paragraph(
+        "Generated by PolicyLens AI | For reference only",
+        footer_style))
+
+    doc.build(story)
+    buffer.seek(0)
+    return buffer.getvalue()
+
+
+# ─────────────────────────────────────────
+# FUNCTION 5 — Send email via Gmail SMTP
+# ─────────────────────────────────────────
+def send_email(recipient_email, summary_text, pdf_bytes):
+    import smtplib
+    from email.mime.multipart import MIMEMultipart
+    from email.mime.text import MIMEText
+    from email.mime.base import MIMEBase
+    from email import encoders
+
+    sender_email = os.getenv("GMAIL_ADDRESS")
+    app_password = os.getenv("GMAIL_APP_PASSWORD")
+
+    msg = MIMEMultipart()
+    msg['From'] = sender_email
+    msg['To'] = recipient_email
+    msg['Subject'] = "Your Insurance Policy Summary — PolicyLens AI"
+
+    body = f"""
+    <html>
+    <body style="font-family:Arial,sans-serif;padding:20px;background:#f5f5f5;">
+        <div style="max-width:600px;margin:0 auto;background:white;
+                    border-radius:16px;padding:30px;">
+            <h2 style="color:#1a3a5c;">Your Insurance Policy Summary</h2>
+            <p>Hello,</p>
+            <p>Your AI-generated insurance policy summary is attached as PDF.</p>
+            <div style="background:#f0f7ff;border-radius:10px;
+                        padding:20px;margin:20px 0;border-left:4px solid #4fc3f7;">
+                <h3 style="color:#1a3a5c;margin-top:0;">Quick Preview:</h3>
+                <pre style="font-size:13px;white-space:pre-wrap;color:#333;">
+{summary_text[:600]}...
+                </pre>
+            </div>
+            <p style="color:#888;font-size:12px;border-top:1px solid #eee;padding-top:15px;">
+                Generated by PolicyLens AI | For reference only.
+            </p>
+        </div>
+    </body>
+    </html>
+    """
+    msg.attach(MIMEText(body, 'html'))
+
+    attachment = MIMEBase('application', 'octet-stream')
+    attachment.set_payload(pdf_bytes)
+    encoders.encode_base64(attachment)
+    attachment.add_header('Content-Disposition', 'attachment',
+                          filename='policy_summary.pdf')
+    msg.attach(attachment)
+
+    smtp_host = os.getenv("SMTP_HOST", "smtp.gmail.com")
+    smtp_port = int(os.getenv("SMTP_PORT", 465))
+    smtp_class = smtplib.SMTP_SSL if os.getenv("SMTP_SSL", "1") == "1" else smtplib.SMTP
+    with smtp_class(smtp_host, smtp_port) as server:
+        server.login(sender_email, app_password)
+        server.sendmail(sender_email, recipient_email, msg.as_string())
+
+
+# ─────────────────────────────────────────
+# FUNCTION 6 — Recommend alternatives
+# ─────────────────────────────────────────
+def _alternatives_ok(raw):
+    data = parse_json_reply(raw)
+    alternatives = data.get("alternatives", [])
+    if not isinstance(data.get("extracted"), dict) or len(alternatives) < 4:
+        return False
+    for alt in alternatives:
+        if not alt.get("insurer"):
+            return False
+        float(alt.get("rating", 0))
+    return True
+
+
+@coalesce(analyses_in_flight, "alternatives")
+def recommend_alternatives(policy_text, tables=None):
+    prompt = f"""
+    You are an expert Indian insurance advisor.
+
+    Analyze this insurance policy and:
+
+    STEP 1 — Extract:
+    - Policy type (Health/Life/Vehicle/Home)
+    - Current sum insured
+    - Current annual premium
+    - Policyholder age (if mentioned)
+    - Key coverages
+
+    STEP 2 — Recommend exactly 4 alternatives from:
+    Star Health, HDFC Ergo, Niva Bupa, Care Health,
+    Bajaj Allianz, ICICI Lombard, Tata AIG, Aditya Birla Health
+
+    Respond in valid JSON only:
+    {{
+        "extracted": {{
+            "policy_type": "",
+            "current_sum_insured": "",
+            "current_premium": "",
+            "policyholder_age": "",
+            "key_coverages": []
+        }},
+        "alternatives": [
+            {{
+                "insurer": "",
+                "product": "",
+                "estimated_premium": "",
+                "sum_insured": "",
+                "advantages": [],
+                "weakness": "",
+                "rating": 0.0,
+                "claim_settlement_ratio": ""
+            }}
+        ]
+    }}
+
+    POLICY TEXT:
+    {policy_text[:3000]}
+    """
+
+    # Schedule values read from the policy's tables, as hints — the LLM
+    # still decides what belongs in "extracted"
+    known = table_fields(tables or [])
+    if known:
+        prompt += ("\n    VALUES FOUND IN THE POLICY SCHEDULE TABLES (use them for "
+                   "STEP 1 if the policy text agrees):\n")
+        prompt += "".join(f"    - {field}: {value}\n" for field, value in known.items())
+
+    raw = route_completion(
+        get_client(), "alternatives",
+        messages=[
+            {"role": "system", "content": "Expert Indian insurance advisor. Respond with valid JSON only."},
+            {"role": "user", "content": prompt}
+        ],
+        check=_alternatives_ok,
+        temperature=0.2
+    )
+    return parse_json_reply(raw)
+
+
+# ─────────────────────────────────────────
+# FUNCTION 7 — Chat agent turn
+# ─────────────────────────────────────────
+CHAT_SYSTEM_PROMPT = """You are a friendly, professional Indian insurance advisor chatbot.
+
+Your job is to collect information from users to recommend the best insurance policy.
+
+Collect these details one or two questions at a time (never more than 2 at once):
+1. Full name
+2. Age
+3. City in India
+4. Occupation
+5. Annual income range
+6. Marital status and dependents
+7. Pre-existing health conditions
+8. Type of insurance needed (Health/Life/Vehicle/Home)
+9. Coverage amount needed
+10. Monthly/annual budget
+11. Specific requirements (maternity, OPD, etc.)
+
+Rules:
+- Be conversational, warm and friendly
+- Ask maximum 2 questions at a time
+- Acknowledge previous answer before asking next
+- Use simple English, avoid jargon
+- Once you have all details, say exactly: "PROFILE_COMPLETE" on a new line,
+  then provide JSON:
+  {
+    "name": "",
+    "age": "",
+    "city": "",
+    "occupation": "",
+    "income": "",
+    "dependents": "",
+    "health_conditions": "",
+    "insurance_type": "",
+    "coverage_needed": "",
+    "budget": "",
+    "special_requirements": ""
+  }"""
+
+
+def parse_chat_reply(ai_reply):
+    # Returns (display_message, profile) — profile is None until complete
+    if "PROFILE_COMPLETE" not in ai_reply:
+        return ai_reply, None
+    parts = ai_reply.split("PROFILE_COMPLETE")
+    display_message = parts[0].strip()
+    json_match = re.search(r'\{.*\}', parts[1], re.DOTALL)
+    if json_match:
+        try:
+            return display_message, json.loads(json_match.group())
+        except ValueError:
+            pass
+    return display_message, None
+
+
+def _chat_reply_ok(ai_reply):
+    if not ai_reply.strip():
+        return False
+    if "PROFILE_COMPLETE" in ai_reply:
+        return parse_chat_reply(ai_reply)[1] is not None
+    return True
+
+
+def chat_reply(chat_messages):
+    conversation_history = [{"role": "system", "content": CHAT_SYSTEM_PROMPT}]
+    for msg in chat_messages:
+        conversation_history.append({
+            "role": msg['role'],
+            "content": msg['content']
+        })
+
+    return route_completion(
+        get_client(), "chat",
+        messages=conversation_history,
+        check=_chat_reply_ok,
+        temperature=0.7
+    )
+
+
+# ─────────────────────────────────────────
+# FUNCTION 8 — Recommend policies for a chat profile
+# ─────────────────────────────────────────
+def recommend_for_profile(profile):
+    chat_reco_prompt = f"""
+    You are an expert Indian insurance advisor.
+
+    Based on this customer profile, recommend exactly 4 best
+    insurance products from: Star Health, HDFC Ergo, Niva Bupa,
+    Care Health, Bajaj Allianz, ICICI Lombard, Tata AIG, Aditya Birla Health
+
+    Customer Profile:
+    - Name: {profile.get('name', 'Customer')}
+    - Age: {profile.get('age', 'N/A')}
+    - City: {profile.get('city', 'India')}
+    - Occupation: {profile.get('occupation', 'N/A')}
+    - Income: {profile.get('income', 'N/A')}
+    - Dependents: {profile.get('dependents', 'N/A')}
+    - Health Conditions: {profile.get('health_conditions', 'None')}
+    - Insurance Type: {profile.get('insurance_type', 'Health')}
+    - Coverage Needed: {profile.get('coverage_needed', 'N/A')}
+    - Budget: {profile.get('budget', 'N/A')}
+    - Special Requirements: {profile.get('special_requirements', 'None')}
+
+    Respond in valid JSON only:
+    {{
+        "customer_name": "",
+        "insurance_type": "",
+        "alternatives": [
+            {{
+                "insurer": "",
+                "product": "",
+                "why_perfect": "",
+                "estimated_premium": "",
+                "sum_insured": "",
+                "advantages": [],
+                "weakness": "",
+                "rating": 0.0,
+                "claim_settlement_ratio": ""
+            }}
+        ]
+    }}
+    """
+
+    raw = route_completion(
+        get_client(), "recommendation",
+        messages=[
+            {"role": "system", "content": "Expert Indian insurance advisor. Respond with valid JSON only."},
+            {"role": "user", "content": chat_reco_prompt}
+        ],
+        temperature=0.2
+    )
+    return parse_json_reply(raw)
+
+
+# ─────────────────────────────────────────
+# FUNCTION 8b — Bucketed recommendations for a chat profile
+# Ranked alternatives are shared by every profile in the same bucket;
+# only the name and "why_perfect" line are personalized.
+# ─────────────────────────────────────────
+reco_cache = RecoCache(os.getenv("POLICYLENS_RECO_CACHE"))
+
+
+def recommend_for_profile_cached(profile):
+    key = bucket_key(bucket_profile(profile))
+    reco = reco_cache.get(key)
+    if reco is None:
+        reco = recommend_for_profile(representative_profile(bucket_from_key(key)))
+        reco_cache.put(key, reco)
+    return personalize(reco, profile)
+
+
+# ─────────────────────────────────────────
+# FUNCTION 9 — Generate detailed quote
+# ─────────────────────────────────────────
+def _quote_ok(quote_text):
+    has_prices = "Rs" in quote_text or "₹" in quote_text or "INR" in quote_text
+    return has_prices and len(quote_text) >= 400
+
+
+def generate_quote(selected_insurer, extracted):
+    quote_prompt = f"""
+    Generate a detailed insurance quote for:
+    - Insurer: {selected_insurer}
+    - Policy Type: {extracted.get('policy_type', 'Health')}
+    - Sum Insured: {extracted.get('current_sum_insured', '5 Lakhs')}
+    - Age: {extracted.get('policyholder_age', '35 years')}
+
+    Include:
+    - Base premium breakdown
+    - Add-on covers with costs
+    - Applicable discounts
+    - Final premium calculation
+    - Payment options (monthly/quarterly/annual)
+    - Key policy terms
+    - How to apply
+
+    Use realistic Indian market pricing in Rs.
+    Make it look like an actual insurance quote document.
+    """
+
+    return route_completion(
+        get_client(), "quote",
+        messages=[
+            {"role": "system", "content": "Expert Indian insurance agent generating detailed quotes."},
+            {"role": "user", "content": quote_prompt}
+        ],
+        check=_quote_ok
+    )
+
+
+# ─────────────────────────────────────────
+# FUNCTION 10 — Explain renewal changes
+# Last year's and this year's wording are aligned clause by clause
+# locally; only the changed clauses are sent to the LLM.
+# ─────────────────────────────────────────
+MAX_RENEWAL_CHARS = 12000
+RENEWAL_SECTIONS = ["PREMIUM CHANGES", "COVERAGE CHANGES",
+                    "EXCLUSION CHANGES", "OTHER CHANGES"]
+NO_RENEWAL_CHANGES = "✅ The two versions have the same wording — nothing changed."
+
+
+def _renewal_ok(explanation):
+    return all(section in explanation for section in RENEWAL_SECTIONS)
+
+
+def _describe_change(change):
+    if change["type"] == "added":
+        return f"[{change['category']}] NEW CLAUSE:\n{change['new']}"
+    if change["type"] == "removed":
+        return f"[{change['category']}] REMOVED CLAUSE:\n{change['old']}"
+    return (f"[{change['category']}] CHANGED CLAUSE "
+            f"([-removed-] {{+added+}}):\n{word_diff(change['old'], change['new'])}")
+
+
+def explain_renewal(old_text, new_text):
+    # Returns (diff, explanation)
+    diff = align_clauses(old_text, new_text)
+    if not diff["changes"]:
+        return diff, NO_RENEWAL_CHANGES
+
+    # Premium, coverage and exclusion changes first, so they survive the cap
+    order = {"premium": 0, "exclusion": 1, "coverage": 2, "other": 3}
+    described = []
+    used = 0
+    for change in sorted(diff["changes"], key=lambda c: order[c["category"]]):
+        text = _describe_change(change)
+        if used + len(text) > MAX_RENEWAL_CHARS:
+            described.append(f"... {len(diff['changes']) - len(described)} "
+                             f"more changed clauses not shown")
+            break
+        described.append(text)
+        used += len(text)
+    diff["sent_chars"] = used
+
+    prompt = f"""
+    You are an expert insurance advisor. A customer is renewing their policy.
+    Below are ONLY the clauses that differ between last year's wording and
+    this year's renewal wording (every other clause is word-for-word the same).
+
+    Explain what changed and what it means for the customer, exactly like this:
+
+    💰 PREMIUM CHANGES
+    [Premium, taxes, loadings, discounts — old vs new]
+
+    ✅ COVERAGE CHANGES
+    [Sum insured, benefits, limits, sub-limits — better or worse]
+
+    ❌ EXCLUSION CHANGES
+    [New, removed or changed exclusions and waiting periods]
+
+    📋 OTHER CHANGES
+    [Anything else worth knowing; write "No change." for empty sections]
+
+    Keep language simple. Say clearly whether each change is good or bad
+    for the customer.
+
+    RENEWAL CHANGES:
+    {chr(10).join(described)}
+    """
+    explanation = route_completion(
+        get_client(), "renewal",
+        messages=[
+            {"role": "system", "content": "You are a helpful insurance expert."},
+            {"role": "user", "content": prompt}
+        ],
+        check=_renewal_ok,
+        temperature=0.2
+    )
+    return diff, explanation
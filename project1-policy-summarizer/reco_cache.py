@@ -0,0 +1,360 @@
+import os
+import re
+import copy
+import json
+import time
+import atexit
+import argparse
+import itertools
+import threading
+from collections import OrderedDict, Counter
+
+
+# ─────────────────────────────────────────
+# PROFILE-BUCKETED RECOMMENDATION CACHE
+# Most chat profiles fall into a few buckets (age band, city tier,
+# insurance type, coverage band, budget band, key conditions). Ranked
+# alternatives are generated once per bucket; only the customer name and
+# the "why_perfect" line are filled in per user, from a template.
+#
+# The cache can be backed by a JSON file (POLICYLENS_RECO_CACHE) so the
+# warm-up job below can precompute popular buckets for the app:
+#
+#   python reco_cache.py --warm 25
+# ─────────────────────────────────────────
+MAX_ENTRIES = 500
+TTL_SECONDS = 7 * 24 * 3600
+# The JSON file is rewritten after this many puts or this many seconds
+# since the last save, whichever comes first — not on every put
+SAVE_EVERY_PUTS = 20
+SAVE_INTERVAL_SECONDS = 30
+
+AGE_BANDS = [(0, 24, "18-24"), (25, 34, "25-34"), (35, 44, "35-44"),
+             (45, 54, "45-54"), (55, 64, "55-64"), (65, 200, "65+")]
+# Sum insured / coverage, in lakhs
+COVER_BANDS = [(0, 5, "upto-5L"), (5, 10, "5-10L"), (10, 25, "10-25L"),
+               (25, 50, "25-50L"), (50, 100, "50L-1Cr"), (100, 10**6, "1Cr+")]
+# Annual budget, in rupees
+BUDGET_BANDS = [(0, 10000, "upto-10k"), (10000, 20000, "10-20k"),
+                (20000, 35000, "20-35k"), (35000, 50000, "35-50k"),
+                (50000, 10**9, "50k+")]
+
+TIER1_CITIES = {"mumbai", "delhi", "new delhi", "bengaluru", "bangalore",
+                "chennai", "kolkata", "hyderabad", "pune", "ahmedabad",
+                "gurgaon", "gurugram", "noida", "navi mumbai", "thane"}
+TIER2_CITIES = {"jaipur", "lucknow", "kanpur", "nagpur", "indore", "bhopal",
+                "chandigarh", "kochi", "coimbatore", "surat", "vadodara",
+                "visakhapatnam", "patna", "nashik", "mysuru", "mysore",
+                "thiruvananthapuram", "bhubaneswar", "guwahati", "ludhiana",
+                "madurai", "rajkot", "varanasi", "agra", "dehradun", "mangaluru"}
+
+INSURANCE_TYPES = ["health", "life", "vehicle", "home"]
+CONDITION_KEYWORDS = {
+    "diabetes": ["diabet", "sugar"],
+    "hypertension": ["hypertension", "blood pressure", "bp"],
+    "heart": ["heart", "cardiac"],
+    "asthma": ["asthma"],
+    "thyroid": ["thyroid"],
+    "cancer": ["cancer"],
+    "kidney": ["kidney", "renal"],
+}
+REQUIREMENT_KEYWORDS = {"maternity": ["maternity", "pregnan"], "opd": ["opd", "outpatient"]}
+
+_BAND_LABELS = {
+    "city": {"tier1": "a Tier 1 metro city", "tier2": "a Tier 2 city",
+             "tier3": "a Tier 3 city or town"},
+}
+
+
+# ─────────────────────────────────────────
+# BUCKETING RULES
+# ─────────────────────────────────────────
+def _band(value, bands):
+    if value is None:
+        return "unknown"
+    for low, high, label in bands:
+        if low <= value <= high:
+            return label
+    return bands[-1][2]
+
+
+def parse_rupees(text):
+    # "10 lakhs", "1 crore", "Rs. 20,000", "15k" → rupees
+    match = re.search(
+        r"(\d+(?:,\d+)*(?:\.\d+)?)\s*(crore|cr|lakhs?|lacs?|l\b|k\b|thousand)?",
+        str(text).lower())
+    if not match:
+        return None
+    amount = float(match.group(1).replace(",", ""))
+    unit = match.group(2) or ""
+    if unit.startswith("cr"):
+        amount *= 1e7
+    elif unit.startswith("la") or unit == "l":
+        amount *= 1e5
+    elif unit in ("k", "thousand"):
+        amount *= 1e3
+    return amount
+
+
+def _age(profile):
+    match = re.search(r"\d+", str(profile.get("age", "")))
+    return int(match.group()) if match else None
+
+
+def _city_tier(profile):
+    city = str(profile.get("city", "")).lower()
+    if any(name in city for name in TIER1_CITIES):
+        return "tier1"
+    if any(name in city for name in TIER2_CITIES):
+        return "tier2"
+    return "tier3"
+
+
+def _insurance_type(profile):
+    text = str(profile.get("insurance_type", "")).lower()
+    for kind in INSURANCE_TYPES:
+        if kind in text:
+            return kind
+    if "car" in text or "bike" in text or "motor" in text:
+        return "vehicle"
+    return "health"
+
+
+def _keywords(text, mapping):
+    text = str(text).lower()
+    if not text or text in ("none", "no", "nil", "n/a"):
+        return []
+    return sorted(name for name, words in mapping.items()
+                  if any(word in text for word in words))
+
+
+def bucket_profile(profile):
+    coverage = parse_rupees(profile.get("coverage_needed", ""))
+    budget_text = str(profile.get("budget", "")).lower()
+    budget = parse_rupees(budget_text)
+    if budget is not None and "month" in budget_text:
+        budget *= 12
+
+    return {
+        "age": _band(_age(profile), AGE_BANDS),
+        "city": _city_tier(profile),
+        "type": _insurance_type(profile),
+        "cover": _band(coverage / 1e5 if coverage else None, COVER_BANDS),
+        "budget": _band(budget, BUDGET_BANDS),
+        "conditions": _keywords(profile.get("health_conditions", ""), CONDITION_KEYWORDS),
+        "needs": _keywords(profile.get("special_requirements", ""), REQUIREMENT_KEYWORDS),
+    }
+
+
+def bucket_key(bucket):
+    return "|".join(
+        f"{name}:{','.join(value) if isinstance(value, list) else value}"
+        for name, value in bucket.items())
+
+
+def bucket_from_key(key):
+    bucket = {}
+    for part in key.split("|"):
+        name, _, value = part.partition(":")
+        if name in ("conditions", "needs"):
+            bucket[name] = value.split(",") if value else []
+        else:
+            bucket[name] = value
+    return bucket
+
+
+def representative_profile(bucket):
+    # A nameless profile describing the whole bucket, for the LLM prompt
+    return {
+        "name": "Customer",
+        "age": bucket["age"],
+        "city": _BAND_LABELS["city"].get(bucket["city"], "India"),
+        "occupation": "N/A",
+        "income": "N/A",
+        "dependents": "N/A",
+        "health_conditions": ", ".join(bucket["conditions"]) or "None",
+        "insurance_type": bucket["type"].title(),
+        "coverage_needed": bucket["cover"],
+        "budget": f"Rs. {bucket['budget']} per year",
+        "special_requirements": ", ".join(bucket["needs"]) or "None",
+    }
+
+
+# ─────────────────────────────────────────
+# PER-USER PERSONALIZATION (templated, no LLM call)
+# ─────────────────────────────────────────
+def personalize(reco, profile):
+    reco = copy.deepcopy(reco)
+    name = " ".join(str(profile.get("name") or "").split()) or "Customer"
+    first_name = name.split()[0]
+    reco["customer_name"] = name
+
+    # Only the conditions the shared answer was generated for — free text
+    # outside CONDITION_KEYWORDS never reached the LLM
+    conditions = bucket_profile(profile)["conditions"]
+    condition_note = ""
+    if conditions:
+        condition_note = f", with cover that accounts for {' and '.join(conditions)}"
+
+    for alt in reco.get("alternatives", []):
+        advantages = alt.get("advantages") or []
+        highlight = f" Highlight: {advantages[0]}." if advantages else ""
+        alt["why_perfect"] = (
+            f"{first_name}, at {profile.get('age', 'your age')} in "
+            f"{profile.get('city', 'your city')}, {alt.get('product', 'this plan')} "
+            f"gives you {alt.get('sum_insured', 'solid')} cover for about "
+            f"{alt.get('estimated_premium', 'a fair premium')} a year"
+            f"{condition_note}.{highlight}"
+        )
+    return reco
+
+
+# ─────────────────────────────────────────
+# CACHE
+# ─────────────────────────────────────────
+class RecoCache:
+
+    def __init__(self, path=None, max_entries=MAX_ENTRIES, ttl_seconds=TTL_SECONDS):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()   # key -> {"data", "created"}
+        self._popularity = Counter()    # key -> requests seen
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._unsaved = 0
+        self._last_save = time.monotonic()
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0, "save_errors": 0}
+        if path and os.path.exists(path):
+            self.load()
+        if path:
+            atexit.register(self.flush)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def get(self, key):
+        with self._lock:
+            self._popularity[key] += 1
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry["created"] > self.ttl_seconds:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+            self._counters["hits"] += 1
+            self._entries.move_to_end(key)
+            return entry["data"]
+
+    def put(self, key, data):
+        with self._lock:
+            self._entries[key] = {"data": data, "created": time.time()}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+            self._unsaved += 1
+            due = (self._unsaved >= SAVE_EVERY_PUTS or
+                   time.monotonic() - self._last_save >= SAVE_INTERVAL_SECONDS)
+        if self.path and due:
+            try:
+                self.save()
+            except OSError:
+                # Persistence is best effort — the entry is cached in memory
+                with self._lock:
+                    self._counters["save_errors"] += 1
+
+    def flush(self):
+        if self.path and self._unsaved:
+            self.save()
+
+    def popular(self, n):
+        with self._lock:
+            return [key for key, _ in self._popularity.most_common(n)]
+
+    def stats(self):
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                "entries": len(self._entries),
+                "buckets_seen": len(self._popularity),
+                "hit_rate": self._counters["hits"] / lookups if lookups else 0.0,
+                **self._counters,
+            }
+
+    def save(self):
+        # One writer at a time, and a temp file of its own in case another
+        # process shares the path
+        with self._save_lock:
+            with self._lock:
+                data = {"entries": dict(self._entries),
+                        "popularity": dict(self._popularity)}
+                saved = self._unsaved
+            tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(data, f)
+                os.replace(tmp_path, self.path)
+            except OSError:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            with self._lock:
+                self._unsaved -= saved
+                self._last_save = time.monotonic()
+
+    def load(self):
+        with open(self.path, encoding="utf-8") as f:
+            data = json.load(f)
+        with self._lock:
+            self._entries = OrderedDict(data.get("entries", {}))
+            self._popularity = Counter(data.get("popularity", {}))
+
+
+def default_buckets():
+    # Seed buckets for a cold cache with no popularity data yet
+    for age, city, cover, budget in itertools.product(
+            ["25-34", "35-44", "45-54"], ["tier1", "tier2"],
+            ["5-10L", "10-25L"], ["10-20k", "20-35k"]):
+        yield bucket_key({"age": age, "city": city, "type": "health",
+                          "cover": cover, "budget": budget,
+                          "conditions": [], "needs": []})
+
+
+def warm_up(cache, recommend, count):
+    # Precompute the most requested buckets, topped up with the seed list
+    keys = cache.popular(count)
+    for key in default_buckets():
+        if len(keys) >= count:
+            break
+        if key not in keys:
+            keys.append(key)
+
+    warmed = 0
+    for key in keys:
+        if key in cache:
+            continue
+        cache.put(key, recommend(representative_profile(bucket_from_key(key))))
+        warmed += 1
+    return warmed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm the recommendation cache")
+    parser.add_argument("--warm", type=int, default=25,
+                        help="number of popular buckets to precompute")
+    parser.add_argument("--path", default=os.getenv("POLICYLENS_RECO_CACHE",
+                                                     "reco_cache.json"))
+    args = parser.parse_args()
+
+    from policy_engine import recommend_for_profile
+    cache = RecoCache(args.path)
+    warmed = warm_up(cache, recommend_for_profile, args.warm)
+    cache.flush()
+    print(f"Warmed {warmed} buckets — {cache.stats()['entries']} cached in {args.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+import re
+import difflib
+import hashlib
+
+
+# ─────────────────────────────────────────
+# RENEWAL DIFF — clause-level alignment of two policy wordings
+# Both documents are split into clauses at numbered / titled headings and
+# paragraph breaks. Each clause gets a fingerprint of its normalized text;
+# difflib aligns the two fingerprint sequences, so unchanged clauses cost
+# one hash compare. Inside each changed region clauses are paired by
+# heading, then by text similarity, leaving real additions and removals.
+# Only the changed clauses go to the LLM.
+# ─────────────────────────────────────────
+HEADING = re.compile(
+    r"^\s*(?:(?i:section|clause|article|part|schedule)\s+[\dA-Z]+\b"
+    r"|\d+(?:\.\d+)+[.)]?\s+\S|\d+[.)]\s+\S"      # 4.2 / 4.2.1 / 4. / 4)
+    r"|[A-Z][A-Z0-9 &/,()-]{5,}$)"                    # ALL-CAPS TITLE
+)
+# Page furniture that moves when the wording reflows: "Page 3",
+# "Page 3 of 12", "3 of 12", "3/12", "- 3 -"
+PAGE_FOOTER = re.compile(
+    r"^\s*(?:page\s+\d+(?:\s*(?:/|of)\s*\d+)?|\d+\s*(?:/|of)\s*\d+|-\s*\d+\s*-)\s*$",
+    re.IGNORECASE)
+# A bare number may be a premium or sum insured on its own line — only
+# short ones that count up page by page are treated as page numbers
+BARE_PAGE_NUMBER = re.compile(r"^\s*(\d{1,3})\s*$")
+PAIR_SIMILARITY = 0.5
+
+CATEGORY_WORDS = {
+    "premium": ["premium", "gst", "loading", "discount", "instalment",
+                "installment", "payment"],
+    "exclusion": ["exclusion", "excluded", "not covered", "not payable",
+                  "waiting period", "shall not", "does not cover"],
+    "coverage": ["sum insured", "cover", "benefit", "sub-limit", "room rent",
+                 "co-pay", "copay", "deductible", "limit", "hospitalisation",
+                 "hospitalization"],
+}
+
+
+def _normalize(text):
+    return " ".join(text.lower().split())
+
+
+def _fingerprint(text):
+    return hashlib.blake2b(_normalize(text).encode("utf-8"), digest_size=8).digest()
+
+
+def _heading_key(heading):
+    # Heading without its number, so renumbered sections still pair up
+    words = re.sub(r"[\d.()]+", " ", heading.lower())
+    return " ".join(words.split())[:60]
+
+
+def _page_number_lines(lines):
+    # Indexes of the longest run of bare numbers n, n+1, n+2... in reading
+    # order; a run needs at least two pages
+    runs = {}
+    for index, line in enumerate(lines):
+        match = BARE_PAGE_NUMBER.match(line)
+        if match:
+            value = int(match.group(1))
+            runs[value] = runs.get(value - 1, ()) + (index,)
+    longest = max(runs.values(), key=len, default=())
+    return set(longest) if len(longest) >= 2 else set()
+
+
+def split_clauses(text):
+    clauses = []
+    current = []
+
+    def flush():
+        body = "\n".join(current).strip()
+        if body:
+            heading = body.split("\n", 1)[0].strip()
+            clauses.append({"heading": heading, "text": body,
+                            "fp": _fingerprint(body),
+                            "key": _heading_key(heading)})
+        current.clear()
+
+    lines = text.splitlines()
+    page_numbers = _page_number_lines(lines)
+    for index, line in enumerate(lines):
+        if index in page_numbers or PAGE_FOOTER.match(line):
+            continue
+        if not line.strip():
+            flush()
+        elif HEADING.match(line) and current:
+            flush()
+            current.append(line.rstrip())
+        else:
+            current.append(line.rstrip())
+    flush()
+    return clauses
+
+
+def categorize(text):
+    lowered = text.lower()
+    for category, words in CATEGORY_WORDS.items():
+        if any(word in lowered for word in words):
+            return category
+    return "other"
+
+
+def _pair_block(old_block, new_block):
+    # Pair clauses of one changed region: same heading first, then the most
+    # similar remaining text above PAIR_SIMILARITY
+    pairs = []
+    old_left = list(range(len(old_block)))
+    new_left = list(range(len(new_block)))
+
+    for j in list(new_left):
+        key = new_block[j]["key"]
+        match = next((i for i in old_left if key and old_block[i]["key"] == key), None)
+        if match is not None:
+            pairs.append((match, j))
+            old_left.remove(match)
+            new_left.remove(j)
+
+    for j in list(new_left):
+        best, best_ratio = None, PAIR_SIMILARITY
+        for i in old_left:
+            matcher = difflib.SequenceMatcher(None, old_block[i]["text"],
+                                              new_block[j]["text"], autojunk=False)
+            if matcher.quick_ratio() > best_ratio and matcher.ratio() > best_ratio:
+                best, best_ratio = i, matcher.ratio()
+        if best is not None:
+            pairs.append((best, j))
+            old_left.remove(best)
+            new_left.remove(j)
+    return pairs, old_left, new_left
+
+
+def align_clauses(old_text, new_text):
+    old = split_clauses(old_text)
+    new = split_clauses(new_text)
+    matcher = difflib.SequenceMatcher(None, [c["fp"] for c in old],
+                                      [c["fp"] for c in new], autojunk=False)
+    changes = []
+    unchanged = 0
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            unchanged += i2 - i1
+            continue
+        old_block, new_block = old[i1:i2], new[j1:j2]
+        pairs, removed, added = _pair_block(old_block, new_block)
+        for i, j in pairs:
+            changes.append({"type": "modified", "position": j1 + j,
+                            "heading": new_block[j]["heading"],
+                            "old": old_block[i]["text"], "new": new_block[j]["text"]})
+        for i in removed:
+            changes.append({"type": "removed", "position": j1,
+                            "heading": old_block[i]["heading"],
+                            "old": old_block[i]["text"], "new": ""})
+        for j in added:
+            changes.append({"type": "added", "position": j1 + j,
+                            "heading": new_block[j]["heading"],
+                            "old": "", "new": new_block[j]["text"]})
+
+    changes.sort(key=lambda change: change["position"])
+    for change in changes:
+        change["category"] = categorize(change["old"] + " " + change["new"])
+    changed_chars = sum(len(c["old"]) + len(c["new"]) for c in changes)
+    return {
+        "old_clauses": len(old),
+        "new_clauses": len(new),
+        "unchanged": unchanged,
+        "unchanged_ratio": unchanged / max(len(new), 1),
+        "changes": changes,
+        "changed_chars": changed_chars,
+        "total_chars": len(old_text) + len(new_text),
+    }
+
+
+def word_diff(old, new):
+    # Inline diff for display: [-removed-] {+added+}
+    old_words, new_words = old.split(), new.split()
+    parts = []
+    matcher = difflib.SequenceMatcher(None, old_words, new_words, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            parts.append(" ".join(old_words[i1:i2]))
+            continue
+        if i2 > i1:
+            parts.append("[-" + " ".join(old_words[i1:i2]) + "-]")
+        if j2 > j1:
+            parts.append("{+" + " ".join(new_words[j1:j2]) + "+}")
+    return " ".join(parts)
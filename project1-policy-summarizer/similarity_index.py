@@ -0,0 +1,152 @@
+import re
+import zlib
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+# ─────────────────────────────────────────
+# NEAR-DUPLICATE POLICY INDEX
+# Same insurer wording with a different policyholder, policy number, dates
+# or premium should map to an earlier analysis. Documents are reduced to a
+# MinHash signature over word shingles (one-permutation hashing: one hash
+# per shingle, split into NUM_BINS bins) and indexed with LSH bands, so a
+# lookup is a handful of dict probes.
+# ─────────────────────────────────────────
+SHINGLE_WORDS = 5
+NUM_BINS = 128
+BAND_ROWS = 4
+MATCH_THRESHOLD = 0.85
+MAX_ENTRIES = 5000
+
+_HASH_BITS = 64
+_EMPTY = 1 << _HASH_BITS
+
+
+def clean_text(text):
+    text = text.lower()
+    # Numbers are mostly personal (policy no., dates, premium) — mask them
+    text = re.sub(r"\d+", "0", text)
+    text = re.sub(r"[^\w\s]", " ", text)
+    return text.split()
+
+
+def _hash64(value):
+    return int.from_bytes(
+        hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def minhash_signature(text):
+    words = clean_text(text)
+    bins = [_EMPTY] * NUM_BINS
+    if len(words) < SHINGLE_WORDS:
+        words = words + [""] * (SHINGLE_WORDS - len(words))
+    for i in range(len(words) - SHINGLE_WORDS + 1):
+        h = _hash64(" ".join(words[i:i + SHINGLE_WORDS]))
+        b = h % NUM_BINS
+        v = h // NUM_BINS
+        if v < bins[b]:
+            bins[b] = v
+    # Fill empty bins from the next non-empty one (densification)
+    for b in range(NUM_BINS):
+        if bins[b] == _EMPTY:
+            for step in range(1, NUM_BINS):
+                other = bins[(b + step) % NUM_BINS]
+                if other != _EMPTY:
+                    bins[b] = other
+                    break
+    return tuple(bins)
+
+
+def estimate_similarity(sig_a, sig_b):
+    same = sum(1 for a, b in zip(sig_a, sig_b) if a == b)
+    return same / NUM_BINS
+
+
+def _normalized_lines(text):
+    lines = (" ".join(line.split()) for line in text.splitlines())
+    return [line for line in lines if line]
+
+
+def changed_lines(text, base_text):
+    # (added, removed): lines only in `text`, lines only in the indexed
+    # document. Both must be empty for the stored analysis to apply as is.
+    new_lines = _normalized_lines(text)
+    base_lines = _normalized_lines(base_text)
+    new_fingerprints = {_hash64(line) for line in new_lines}
+    base_fingerprints = {_hash64(line) for line in base_lines}
+    added = [line for line in new_lines if _hash64(line) not in base_fingerprints]
+    removed = [line for line in base_lines if _hash64(line) not in new_fingerprints]
+    return added, removed
+
+
+def entry_text(entry):
+    return zlib.decompress(entry["text"]).decode("utf-8")
+
+
+class SimilarityIndex:
+
+    def __init__(self, threshold=MATCH_THRESHOLD, max_entries=MAX_ENTRIES):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._entries = OrderedDict()   # doc_id -> entry
+        self._bands = {}                # band key -> set(doc_id)
+        self._lock = threading.Lock()
+        self._counters = {"lookups": 0, "hits": 0, "evictions": 0}
+
+    @staticmethod
+    def _band_keys(signature):
+        for start in range(0, NUM_BINS, BAND_ROWS):
+            yield (start, signature[start:start + BAND_ROWS])
+
+    def add(self, doc_id, text, payload, signature=None):
+        signature = signature or minhash_signature(text)
+        entry = {
+            "signature": signature,
+            # Compressed copy, only read back to diff a matching upload
+            "text": zlib.compress(text.encode("utf-8")),
+            "payload": payload,
+        }
+        with self._lock:
+            if doc_id in self._entries:
+                self._remove(doc_id)
+            self._entries[doc_id] = entry
+            for key in self._band_keys(signature):
+                self._bands.setdefault(key, set()).add(doc_id)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._counters["evictions"] += 1
+
+    def find(self, text=None, signature=None):
+        # Returns (doc_id, similarity, entry) for the best match, or None
+        signature = signature or minhash_signature(text)
+        with self._lock:
+            self._counters["lookups"] += 1
+            candidates = set()
+            for key in self._band_keys(signature):
+                candidates |= self._bands.get(key, set())
+            best = None
+            for doc_id in candidates:
+                entry = self._entries[doc_id]
+                similarity = estimate_similarity(signature, entry["signature"])
+                if similarity >= self.threshold and \
+                        (best is None or similarity > best[1]):
+                    best = (doc_id, similarity, entry)
+            if best is not None:
+                self._counters["hits"] += 1
+                self._entries.move_to_end(best[0])
+            return best
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), **self._counters}
+
+    def _remove(self, doc_id):
+        entry = self._entries.pop(doc_id)
+        for key in self._band_keys(entry["signature"]):
+            bucket = self._bands.get(key)
+            if bucket is not None:
+                bucket.discard(doc_id)
+                if not bucket:
+                    del self._bands[key]
@@ -0,0 +1,102 @@
+import hashlib
+import functools
+import threading
+
+from admission import Busy
+
+
+# ─────────────────────────────────────────
+# SINGLE-FLIGHT COALESCING
+# Concurrent calls with the same key share one running computation: the
+# first caller runs it, later callers wait for its result (or a copy of its
+# exception) instead of making their own LLM calls. A failed call is never
+# repeated by its followers, except when the leader was shed by admission
+# control: that is about the leader's session, so followers retry under
+# their own. Nothing is cached once the call returns — that is the
+# similarity index's and the history's job.
+# ─────────────────────────────────────────
+class SingleFlight:
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._stats = {"calls": 0, "executed": 0, "coalesced": 0, "retried": 0}
+
+    def do(self, key, fn, *args, **kwargs):
+        with self._lock:
+            self._stats["calls"] += 1
+        while True:
+            with self._lock:
+                call = self._calls.get(key) if self.enabled else None
+                leader = call is None
+                if leader:
+                    call = {"done": threading.Event(), "result": None, "error": None}
+                    if self.enabled:
+                        self._calls[key] = call
+                    self._stats["executed"] += 1
+            if leader:
+                return self._run(key, call, fn, args, kwargs)
+
+            call["done"].wait()
+            error = call["error"]
+            if error is None:
+                with self._lock:
+                    self._stats["coalesced"] += 1
+                return call["result"]
+            if not isinstance(error, Busy):
+                # Never re-run a call that failed for everyone (rate limit,
+                # outage): each waiter gets its own copy of the error
+                raise _copy_error(error) from error
+            # The leader's budget or queue slot, not ours — try again, as
+            # the next leader or behind one
+            with self._lock:
+                self._stats["retried"] += 1
+
+    def _run(self, key, call, fn, args, kwargs):
+        try:
+            call["result"] = fn(*args, **kwargs)
+            return call["result"]
+        except BaseException as e:
+            call["error"] = e
+            raise
+        finally:
+            with self._lock:
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+            call["done"].set()
+
+    def stats(self):
+        with self._lock:
+            return {**self._stats, "in_flight": len(self._calls)}
+
+
+class CoalescedCallError(RuntimeError):
+    pass
+
+
+def _copy_error(error):
+    # Same class and attributes, so callers' except clauses still match,
+    # but a new object with its own traceback — raising one exception in
+    # several threads mixes their tracebacks. __init__ is skipped: Groq's
+    # errors, for one, cannot be rebuilt from their args.
+    try:
+        copied = type(error).__new__(type(error), *error.args)
+        copied.__dict__.update(error.__dict__)
+        return copied
+    except Exception:
+        return CoalescedCallError(str(error))
+
+
+def text_key(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def coalesce(flight, name):
+    # Decorator: calls whose first argument is the same text share one run
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(text, *args, **kwargs):
+            return flight.do((name, text_key(text)), fn, text, *args, **kwargs)
+        return wrapper
+    return decorator